@@ -1 +1,25 @@
-from attributes.agent import SIGNATURE, DELTA, STEERING_PARAMETERS
+from typing import Any
+
+from attributes import agent
+
+
+def initialize(path: str = agent._ATTRIBUTES_PATH) -> None:
+    """ Reads the main agent's attributes (see ``agent.initialize``) and binds them to this package.
+
+    Once the attributes are bound, accessing them (e.g. ``attributes.SIGNATURE``) is a plain module attribute lookup.
+
+    Args:
+        path: Path of the attributes file (defaults to ``agent.json`` in the root directory of the project).
+    """
+
+    agent.initialize(path)
+    globals().update({name: getattr(agent, name) for name in agent.NAMES})
+
+
+def __getattr__(name: str) -> Any:
+    # read the agent's attributes on first use instead of on import
+    if name in agent.NAMES:
+        initialize()
+        return globals()[name]
+
+    raise AttributeError(f"module {__name__} has no attribute {name}")
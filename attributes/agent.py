@@ -7,48 +7,56 @@ import util
 _ATTRIBUTES_DIR: str = os.path.dirname(os.path.abspath(__file__))
 _ATTRIBUTES_PATH: str = os.path.join(_ATTRIBUTES_DIR, "agent.json")
 _INITIALIZED: bool = False
+_DEFAULT_LANE: int = 0
 
 
 class _Keys:
     SIGNATURE: str = "signature"
     DELTA: str = "delta"
     STEERING_PARAMETERS: str = "steering"
+    LANE: str = "lane"
 
 
+NAMES: List[str] = ["SIGNATURE", "DELTA", "STEERING_PARAMETERS", "LANE"]
+
 SIGNATURE: str
 DELTA: float
 STEERING_PARAMETERS: List[float]
+LANE: int
+
 
-# there must be an attributes file in the root directory of the project
-assert os.path.exists(_ATTRIBUTES_PATH), f"Agent attributes ({_ATTRIBUTES_PATH}) is missing."
+def initialize(path: str = _ATTRIBUTES_PATH) -> None:
+    """ Sets the main agent's signature, delta, steering parameters and lane based on the ``agent.json`` file.
 
+    The lane identifies the partition of the parking area the agent communicates in. It is optional and defaults to
+    ``_DEFAULT_LANE``.
 
-def initialize() -> None:
-    """ Sets the main agent's signature and delta based on the ``agent.json`` file.
+    The attributes are initialized on first use (see ``attributes.__getattr__``) rather than on import. After
+    successful initialization the main initialization flagged with ``INITIALIZED = True``.
 
-    After successful initialization the main initialization flagged with ``INITIALIZED = True``.
+    Args:
+        path: Path of the attributes file (defaults to ``agent.json`` in the root directory of the project).
 
     Raises:
-        AssertionError: If attributes file does not contain the required agent information.
+        AssertionError: If the attributes file is missing or does not contain the required agent information.
     """
 
-    global SIGNATURE, DELTA, STEERING_PARAMETERS, _INITIALIZED
+    global SIGNATURE, DELTA, STEERING_PARAMETERS, LANE, _INITIALIZED
+
+    # there must be an attributes file in the root directory of the project
+    assert os.path.exists(path), f"Agent attributes ({path}) is missing."
 
     # open attributes file
-    with open(_ATTRIBUTES_PATH) as attributes_file:
+    with open(path) as attributes_file:
         # parse json data to dictionary
         attributes = json.load(attributes_file)
 
         # the attributes must include the agent's signature and delta
         util.assert_keys_exist([_Keys.SIGNATURE, _Keys.DELTA, _Keys.STEERING_PARAMETERS], attributes)
 
-        # set the main agent's signature, delta and steering parameters and the initialization flag
+        # set the main agent's signature, delta, steering parameters, lane and the initialization flag
         SIGNATURE = attributes[_Keys.SIGNATURE]
         DELTA = attributes[_Keys.DELTA]
         STEERING_PARAMETERS = attributes[_Keys.STEERING_PARAMETERS]
+        LANE = attributes.get(_Keys.LANE, _DEFAULT_LANE)
         _INITIALIZED = True
-
-
-# always initialize attributes when loaded
-if not _INITIALIZED:
-    initialize()
@@ -0,0 +1,78 @@
+import argparse
+import math
+import time
+from typing import Callable, List
+
+import util
+from control.steering import SteeringActuator
+
+_DURATION: float = 3  # seconds
+_RATE: float = 100  # steering calls per second of the trajectory follower
+_WRITE_DURATION: float = 0.0005  # seconds an I2C write of a PWM value takes
+_FREQUENCIES: List[float] = [math.inf, 50, 20]  # maximum bus frequencies
+
+
+class _FakeI2CDevice:
+    """ PWM controller whose writes block the bus for a fixed duration. """
+
+    def __init__(self, write_duration: float):
+        self.write_duration: float = write_duration
+        self.writes: int = 0
+        self.busy: float = 0  # seconds the bus was busy
+        self.ticks: List[int] = []
+
+    def set_pwm(self, channel: int, on: int, off: int) -> None:
+        start = time.perf_counter()
+        time.sleep(self.write_duration)
+        self.busy += time.perf_counter() - start
+        self.writes += 1
+        self.ticks.append(off)
+
+
+def _trajectory(seconds: float) -> int:
+    # alternately hold the steering angle and steer along a sine for a second each
+    if int(seconds) % 2 == 0:
+        return 307
+
+    return round(307 + 40 * math.sin(2 * math.pi * seconds))
+
+
+def benchmark_actuation(trajectory: Callable[[float], int], duration: float, rate: float, write_duration: float,
+                        max_frequency: float) -> None:
+    """ Measures the I2C writes of a trajectory follower steering at a fixed rate.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the steering calls, the writes issued and suppressed, the share of time the bus was busy and whether the
+        latest target was applied. Without rate limit only unchanged ticks are suppressed while holding the steering
+        angle. With a rate limit the bus is busy for a fraction of the time while the latest target is still applied.
+    """
+
+    device = _FakeI2CDevice(write_duration)
+    actuator = SteeringActuator(util.Backend("fake I2C device", lambda: device), 0, max_frequency)
+    calls = int(duration * rate)
+    start = time.monotonic()
+
+    for call in range(calls):
+        time.sleep(max(0.0, start + call / rate - time.monotonic()))
+        actuator.set(trajectory(call / rate))
+
+    # wait for the trailing write
+    time.sleep(2 / min(max_frequency, rate))
+
+    print(f"max {max_frequency:4.0f}Hz: {calls:5d} calls, {actuator.writes:5d} writes, {actuator.suppressed:5d} "
+          f"suppressed, bus busy {device.busy / duration * 100:5.1f}%, "
+          f"latest target applied: {device.ticks[-1] == trajectory((calls - 1) / rate)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures I2C writes of steering along a trajectory.")
+    parser.add_argument("--duration", type=float, default=_DURATION, help="number of seconds to steer")
+    parser.add_argument("--rate", type=float, default=_RATE, help="steering calls per second")
+    parser.add_argument("--write-duration", type=float, default=_WRITE_DURATION, help="seconds an I2C write takes")
+    arguments = parser.parse_args()
+
+    for frequency in _FREQUENCIES:
+        benchmark_actuation(_trajectory, arguments.duration, arguments.rate, arguments.write_duration, frequency)
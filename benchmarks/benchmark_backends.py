@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List
+
+import interaction
+from interaction import communication, transport
+from interaction.formation import _Member, _MemberRelation, _RelationGraph, _partition_topic
+
+_AGENTS: int = 500
+_LANE_LENGTH: int = 10
+_DURATION: float = 30  # seconds
+_INTERVAL: float = 1  # seconds between two broadcasts of an agent
+
+
+class _SimulatedAgent:
+    def __init__(self, index: int):
+        self.signature: str = f"agent-{index:04d}"
+        self.lane: int = index // _LANE_LENGTH
+        self.ahead: str = f"agent-{index - 1:04d}" if index % _LANE_LENGTH else None
+        self.graph: _RelationGraph = _RelationGraph()
+        self.received: int = 0
+
+    @property
+    def topic(self) -> str:
+        return _partition_topic(interaction.Communication.Topics.FORMATION, self.lane)
+
+    @property
+    def relation(self) -> _MemberRelation.Dictionary:
+        return _MemberRelation(_Member(self.signature, 1.0, None), self.ahead).encode()
+
+    def handle(self, message: interaction.Message) -> None:
+        self.graph.add(_MemberRelation.decode(message.content))
+        self.received += 1
+
+
+def _report(backend: str, agents: List[_SimulatedAgent], cpu: float) -> None:
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    received = sum(agent.received for agent in agents)
+
+    print(f"{backend:7s}: {len(agents)} agents, {threading.active_count():5d} threads, cpu {cpu:6.2f}s, "
+          f"peak memory {memory:7.1f}MiB, {received} messages handled")
+
+
+def run_threads(count: int, duration: float) -> None:
+    """ Simulates agents using one thread based connection each.
+
+    Args:
+        count: Number of simulated agents.
+        duration: Duration of the simulation in seconds.
+    """
+
+    agents = [_SimulatedAgent(index) for index in range(count)]
+    connections = []
+
+    for agent in agents:
+        # every simulated agent needs its own connection with its own signature
+        connection = communication._Connection._cls()
+        connection.signature = agent.signature
+        connection.subscribe(agent.topic, agent.handle, False, True)
+        connections.append(connection)
+
+    start = time.process_time()
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        for agent, connection in zip(agents, connections):
+            connection.send(interaction.Message(agent.signature, agent.topic, agent.relation, datetime.now()))
+
+        time.sleep(_INTERVAL)
+
+    _report("threads", agents, time.process_time() - start)
+
+
+async def _run_asyncio(count: int, duration: float) -> None:
+    agents = [_SimulatedAgent(index) for index in range(count)]
+    connections = []
+
+    for agent in agents:
+        # every simulated agent needs its own connection with its own signature (all driven by the same event loop)
+        connection = communication._Connection._cls(asynchronous=True)
+        connection.signature = agent.signature
+        connection.subscribe(agent.topic, _asynchronous(agent.handle), False, False)
+        connections.append(connection)
+
+    async def broadcast(agent: _SimulatedAgent, connection: communication._Connection) -> None:
+        while time.monotonic() < deadline:
+            connection.send(interaction.Message(agent.signature, agent.topic, agent.relation, datetime.now()))
+            await asyncio.sleep(_INTERVAL)
+
+    start = time.process_time()
+    deadline = time.monotonic() + duration
+
+    await asyncio.gather(*(broadcast(agent, connection) for agent, connection in zip(agents, connections)))
+
+    _report("asyncio", agents, time.process_time() - start)
+
+
+def _asynchronous(handle: Callable[[interaction.Message], None]) -> Callable:
+    async def handle_asynchronously(message: interaction.Message) -> None:
+        handle(message)
+
+    return handle_asynchronously
+
+
+def run_asyncio(count: int, duration: float) -> None:
+    """ Simulates agents sharing a single event loop.
+
+    Args:
+        count: Number of simulated agents.
+        duration: Duration of the simulation in seconds.
+    """
+
+    asyncio.run(_run_asyncio(count, duration))
+
+
+def benchmark_backends(host: str, count: int, duration: float) -> None:
+    """ Compares CPU time and memory of the thread and the asyncio communication backend.
+
+    Every backend runs in its own process so that peak memory can be measured independently.
+
+    Setup:
+        Local MQTT broker (e.g. ``mosquitto -p 1883``) allowing enough connections. Run the benchmark.
+
+    Expected Results:
+        Prints threads, CPU time and peak memory of both backends. The asyncio backend needs a single thread and
+        considerably less memory.
+    """
+
+    for backend in ["threads", "asyncio"]:
+        subprocess.run([sys.executable, "-m", __spec__.name, "--host", host, "--agents", str(count),
+                        "--duration", str(duration), "--backend", backend], check=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the thread and the asyncio communication backend.")
+    parser.add_argument("--host", default="localhost", help="hostname of the MQTT broker")
+    parser.add_argument("--agents", type=int, default=_AGENTS, help="number of simulated agents")
+    parser.add_argument("--duration", type=float, default=_DURATION, help="duration of the simulation in seconds")
+    parser.add_argument("--backend", choices=["threads", "asyncio"], help="only run a single backend")
+    arguments = parser.parse_args()
+
+    # point the connections at the benchmark broker instead of the public one
+    transport._BROKER_URL = arguments.host
+
+    if arguments.backend == "threads":
+        run_threads(arguments.agents, arguments.duration)
+    elif arguments.backend == "asyncio":
+        run_asyncio(arguments.agents, arguments.duration)
+    else:
+        benchmark_backends(arguments.host, arguments.agents, arguments.duration)
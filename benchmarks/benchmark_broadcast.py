@@ -0,0 +1,107 @@
+import argparse
+import heapq
+import random
+from datetime import datetime
+from typing import List, Tuple
+
+import interaction
+import util
+from interaction.formation import _BroadcastPolicy, _Member, _MemberRelation, _partition_topic
+
+_AGENT_COUNTS: List[int] = [10, 50, 200]
+_DURATION: float = 600  # simulated seconds
+
+
+def _payload_size(topic: str, content: interaction.MessageContent) -> int:
+    return len(interaction.Message("agent-0000", topic, content, datetime.now()).encode_binary())
+
+
+def simulate(agents: int, change_interval: float, min_delay: float, max_delay: float,
+             steps: int) -> Tuple[int, int, int]:
+    """ Simulates the formation broadcasts of a number of agents.
+
+    Every agent updates its formation in ticks whose delays back off exponentially while its member relation stays
+    the same, like ``MainAgent._run`` does. Member relations change at random with the given mean interval.
+
+    Args:
+        agents: Number of simulated agents.
+        change_interval: Mean number of seconds between two changes of an agent's member relation.
+        min_delay: Minimum delay between two ticks.
+        max_delay: Maximum delay between two ticks.
+        steps: Number of stable ticks to reach the maximum delay.
+
+    Returns:
+        The number of messages broadcast with the previous scheme as well as the number of relations and heartbeats
+        broadcast with the change-driven scheme.
+    """
+
+    policies = [_BroadcastPolicy(interaction.formation._HEARTBEAT_INTERVAL, interaction.formation._REFRESH_INTERVAL)
+                for _ in range(agents)]
+    aheads = [f"agent-{agent - 1:04d}" if agent > 0 else None for agent in range(agents)]
+    stable_ticks = [0] * agents
+    changes = [random.expovariate(1 / change_interval) for _ in range(agents)]
+    ticks = [(random.uniform(0, min_delay), agent) for agent in range(agents)]
+    heapq.heapify(ticks)
+
+    previous = relations = heartbeats = 0
+
+    while ticks[0][0] < _DURATION:
+        now, agent = heapq.heappop(ticks)
+        stable = True
+
+        # change the relation (e.g. a new car in front) if the next change is due
+        if now >= changes[agent]:
+            aheads[agent] = f"agent-{random.randrange(agents):04d}"
+            changes[agent] = now + random.expovariate(1 / change_interval)
+            stable = False
+
+        # previously every tick broadcast the member relation
+        previous += 1
+
+        relation = _MemberRelation(_Member(f"agent-{agent:04d}", 1.0, None), aheads[agent])
+        decision = policies[agent].decide(relation, now)
+        relations += decision == _BroadcastPolicy.Decision.RELATION
+        heartbeats += decision == _BroadcastPolicy.Decision.HEARTBEAT
+
+        stable_ticks[agent] = stable_ticks[agent] + 1 if stable else 0
+        delay = util.backoff_delay(min_delay, max_delay, steps, stable_ticks[agent])
+        heapq.heappush(ticks, (now + delay, agent))
+
+    return previous, relations, heartbeats
+
+
+def benchmark_broadcast(change_interval: float, min_delay: float, max_delay: float, steps: int) -> None:
+    """ Compares the formation traffic of unconditional and change-driven broadcasts.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints messages and bytes per minute for the previous and the change-driven scheme for growing numbers of
+        agents. The change-driven scheme sends a fraction of the messages in stable formations.
+    """
+
+    relation_size = _payload_size(_partition_topic(interaction.Communication.Topics.FORMATION, 0),
+                                  _MemberRelation(_Member("agent-0000", 1.0, None), "agent-0001").encode())
+    heartbeat_size = _payload_size(_partition_topic(interaction.Communication.Topics.FORMATION_HEARTBEAT, 0), None)
+    minutes = _DURATION / 60
+
+    for agents in _AGENT_COUNTS:
+        previous, relations, heartbeats = simulate(agents, change_interval, min_delay, max_delay, steps)
+        changed = relations + heartbeats
+
+        print(f"{agents:4d} agents: previous {previous / minutes:8.1f} msg/min "
+              f"({previous * relation_size / minutes / 1024:7.1f} KiB/min), "
+              f"change-driven {changed / minutes:8.1f} msg/min "
+              f"({(relations * relation_size + heartbeats * heartbeat_size) / minutes / 1024:7.1f} KiB/min)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates formation broadcast traffic.")
+    parser.add_argument("--change-interval", type=float, default=120, help="mean seconds between relation changes")
+    parser.add_argument("--min-delay", type=float, default=0.2, help="minimum delay between two ticks")
+    parser.add_argument("--max-delay", type=float, default=4, help="maximum delay between two ticks")
+    parser.add_argument("--steps", type=int, default=8, help="stable ticks to reach the maximum delay")
+    arguments = parser.parse_args()
+
+    benchmark_broadcast(arguments.change_interval, arguments.min_delay, arguments.max_delay, arguments.steps)
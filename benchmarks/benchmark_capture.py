@@ -0,0 +1,97 @@
+import argparse
+import time
+import tracemalloc
+from typing import List
+
+import numpy as np
+
+import sensing
+from sensing import scanner
+
+_FRAMES: int = 200
+_RECORDED_FRAMES: int = 4
+
+
+def _source(path: str) -> sensing.FrameSource:
+    if path is not None:
+        return sensing.FileSource(path, scanner.RESOLUTION)
+
+    width, height = scanner.RESOLUTION
+    generator = np.random.default_rng(0)
+    return sensing.ArraySource([generator.integers(0, 256, (height, width, 3), np.uint8)
+                                for _ in range(_RECORDED_FRAMES)])
+
+
+def _report(name: str, frames: int, elapsed: float, allocations: List[int]) -> None:
+    print(f"{name:10s}: {frames / elapsed:8.1f} frames/s, {np.mean(allocations) / 2 ** 20:7.2f}MiB allocated per frame")
+
+
+def benchmark_allocating(source: sensing.FrameSource, frames: int) -> None:
+    """ Measures frames per second and allocations when every frame is captured into a new array.
+
+    This corresponds to capturing into a new ``PiRGBArray`` on every scan.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints frames per second and the memory allocated per frame (a full frame).
+    """
+
+    allocations = []
+
+    def buffers():
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            yield np.empty(source.buffer_shape, np.uint8)
+            allocations.append(tracemalloc.get_traced_memory()[1] - before)
+
+    start = time.perf_counter()
+    source.stream(buffers())
+
+    _report("allocating", frames, time.perf_counter() - start, allocations)
+
+
+def benchmark_ring(source: sensing.FrameSource, frames: int) -> None:
+    """ Measures frames per second and allocations of the continuous capture into the ring buffers.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints frames per second and the memory allocated per frame (a few hundred bytes for the frame's metadata).
+    """
+
+    capture = sensing.Capture(source)
+    allocations = []
+    number = 0
+
+    start = time.perf_counter()
+    capture.start()
+
+    while number < frames:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+
+        with capture.frame(newer_than=number) as frame:
+            number = frame.number
+
+        allocations.append(tracemalloc.get_traced_memory()[1] - before)
+
+    elapsed = time.perf_counter() - start
+    capture.stop()
+
+    _report("ring", number, elapsed, allocations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares allocating frame captures with the ring buffer capture.")
+    parser.add_argument("--file", help="file of raw RGB frames with the scanner's resolution (random frames if unset)")
+    parser.add_argument("--frames", type=int, default=_FRAMES, help="number of frames to capture")
+    arguments = parser.parse_args()
+
+    tracemalloc.start()
+
+    benchmark_allocating(_source(arguments.file), arguments.frames)
+    benchmark_ring(_source(arguments.file), arguments.frames)
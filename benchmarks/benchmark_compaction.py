@@ -0,0 +1,96 @@
+import argparse
+import math
+from typing import List, Optional, Tuple
+
+import control
+import util
+
+_LANE_SIZES: List[int] = [5, 10, 20, 50]
+_LENGTH: float = 200  # mm of a vehicle
+_MINIMUM_DISTANCE: float = 60  # mm between two vehicles
+_START_SPEED: float = 1.25  # mm/s (100 steps/s)
+_MAX_SPEED: float = 5  # mm/s (400 steps/s)
+_ACCELERATION: float = 5  # mm/s² (400 steps/s²)
+_LATENCY: float = 0.05  # seconds until a message of a finished process is received
+_TICK: float = 0.05  # seconds of a simulation step (the sample period of the front sensor)
+
+
+def simulate(vehicles: int, wave: bool) -> Tuple[float, float]:
+    """ Simulates a lane compacting after the second vehicle left it.
+
+    Every remaining vehicle behind the gap runs the gap-closing controller on the exact front distance. The vehicle
+    accelerates and decelerates within the limits of the driving motor and plans to stop at the end of its planned
+    distance. Vehicles either start in a staggered wave or one after another once the vehicle ahead confirmed that it
+    finished closing its gap.
+
+    Args:
+        vehicles: Number of vehicles in the lane (including the leaving vehicle).
+        wave: Boolean whether vehicles start in a staggered wave.
+
+    Returns:
+        The number of seconds until the last vehicle finished and the largest remaining gap in mm.
+    """
+
+    # the first vehicle stands still and the second vehicle left -> the third vehicle faces the gap of the second one
+    positions = [-index * (_LENGTH + _MINIMUM_DISTANCE) for index in range(vehicles)]
+    del positions[1]
+    speeds = [0.0] * len(positions)
+    finished: List[Optional[float]] = [0.0] + [None] * (len(positions) - 1)
+    closers = [control.GapCloser(_MINIMUM_DISTANCE) for _ in positions]
+    now = 0.0
+
+    while None in finished:
+        now += _TICK
+
+        for index in range(1, len(positions)):
+            ahead_finished = finished[index - 1] is not None and finished[index - 1] + _LATENCY <= now
+            start = control.wave_delay(index - 1) if wave else (finished[index - 1] + _LATENCY if ahead_finished
+                                                                else math.inf)
+            if finished[index] is not None or now < start:
+                continue
+
+            gap = positions[index - 1] - positions[index] - _LENGTH
+            distance = closers[index].distance(gap, gap - util.const.Driving.SAFETY_DISTANCE)
+
+            if closers[index].finished(distance, ahead_finished):
+                finished[index] = now
+                continue
+
+            # trapezoidal profile planned to stop at the end of the planned distance
+            if distance > 0:
+                speed = min(_MAX_SPEED, speeds[index] + _ACCELERATION * _TICK,
+                            math.sqrt(_START_SPEED ** 2 + 2 * _ACCELERATION * distance))
+                speeds[index] = max(_START_SPEED, speed)
+                positions[index] += min(distance, speeds[index] * _TICK)
+            else:
+                speeds[index] = 0.0
+
+    gaps = [ahead - behind - _LENGTH for ahead, behind in zip(positions, positions[1:])]
+    return max(finished), max(gaps)
+
+
+def benchmark_compaction(lane_sizes: List[int]) -> None:
+    """ Measures the time a lane takes to compact after a vehicle left it.
+
+    Setup:
+        Run the benchmark (the lane is simulated, so the benchmark takes less time than the simulated compaction).
+
+    Expected Results:
+        Prints the simulated compaction time and the largest remaining gap of lanes of several sizes for vehicles
+        starting one after another and in a staggered wave. The compaction time grows with the number of vehicles
+        when vehicles start one after another but only slightly in a staggered wave. Both leave gaps of about the
+        minimum distance.
+    """
+
+    for vehicles in lane_sizes:
+        for name, wave in [("serial", False), ("wave", True)]:
+            duration, largest_gap = simulate(vehicles, wave)
+            print(f"{vehicles:3d} vehicles, {name:6s}: {duration:8.1f}s, largest remaining gap {largest_gap:5.1f}mm")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates lanes compacting after a vehicle left.")
+    parser.add_argument("--vehicles", type=int, nargs="+", default=_LANE_SIZES, help="numbers of vehicles per lane")
+    arguments = parser.parse_args()
+
+    benchmark_compaction(arguments.vehicles)
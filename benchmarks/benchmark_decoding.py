@@ -0,0 +1,87 @@
+import argparse
+import pathlib
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+import pyzbar.pyzbar as pyzbar
+
+import sensing
+import util
+from sensing import scanner
+
+_RECORDED_FRAMES: int = 300
+
+
+def record(corpus: pathlib.Path, count: int) -> None:
+    """ Records a corpus of consecutive RGB camera frames as ``.npy`` files.
+
+    Args:
+        corpus: Directory the frames are stored in.
+        count: Number of frames to record.
+    """
+
+    corpus.mkdir(parents=True, exist_ok=True)
+    capture = sensing.Capture(sensing.PiCameraSource(scanner.RESOLUTION, scanner.BRIGHTNESS, channels=3))
+    capture.start()
+    number = 0
+
+    for index in range(count):
+        with capture.frame(newer_than=number) as frame:
+            np.save(corpus / f"frame-{index:05d}.npy", frame.image)
+            number = frame.number
+
+    capture.stop()
+
+
+def _decode_full(image: np.ndarray) -> Optional[str]:
+    decoded_objects = pyzbar.decode(image)
+    return decoded_objects[0].data.decode("utf-8") if decoded_objects else None
+
+
+def _strategies() -> List[tuple]:
+    return [("rgb", _decode_full),
+            ("luma", lambda image: _decode_full(image[:, :, 1])),
+            ("roi", sensing.QrDecoder(track=False).decode),
+            ("tracked", sensing.QrDecoder().decode)]
+
+
+def benchmark_strategy(name: str, decode: Callable[[np.ndarray], Optional[str]], frames: List[np.ndarray]) -> None:
+    """ Measures the decode latency and hit rate of a decoding strategy over a corpus of recorded frames.
+
+    Setup:
+        Record a corpus of frames of a QR code on a car ahead (``--record``) and run the benchmark.
+
+    Expected Results:
+        Prints the mean and p99 decode latency as well as the hit rate of the strategy. The region of interest, the
+        downscaled pass and the tracking cut the latency compared to decoding the full RGB frame while keeping the hit
+        rate.
+    """
+
+    latency = util.LatencyStatistics(len(frames))
+    hits = 0
+
+    for frame in frames:
+        start = time.perf_counter()
+        hits += decode(frame) is not None
+        latency.record(time.perf_counter() - start)
+
+    print(f"{name:8s}: mean {latency.mean * 1000:8.3f}ms, p99 {latency.percentile(99) * 1000:8.3f}ms, "
+          f"hit rate {hits / len(frames):6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares QR decoding strategies over a corpus of recorded frames.")
+    parser.add_argument("corpus", type=pathlib.Path, help="directory of frames stored as .npy files")
+    parser.add_argument("--record", action="store_true", help="record the corpus with the camera first")
+    parser.add_argument("--frames", type=int, default=_RECORDED_FRAMES, help="number of frames to record")
+    arguments = parser.parse_args()
+
+    if arguments.record:
+        record(arguments.corpus, arguments.frames)
+
+    corpus = [np.load(path) for path in sorted(arguments.corpus.glob("*.npy"))]
+    assert corpus, f"The corpus {arguments.corpus} does not contain any frames."
+
+    for strategy, decoder in _strategies():
+        benchmark_strategy(strategy, decoder, corpus)
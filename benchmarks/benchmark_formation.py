@@ -0,0 +1,44 @@
+import random
+import time
+from typing import List
+
+from interaction.formation import _Member, _MemberList
+
+_SIZES: List[int] = [10, 100, 1000, 10000]
+_QUERIES: int = 10000
+
+
+def benchmark_member_queries(size: int) -> None:
+    """ Measures positional queries on a member list of a given size.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean time of ``member``, ``comes_before`` and ``distance`` which stays constant for growing member
+        lists as well as the time to rebuild the index.
+    """
+
+    signatures = [f"{index:05d}" for index in range(size)]
+
+    start = time.perf_counter()
+    members = _MemberList([_Member(signature, 1.0, None) for signature in signatures])
+    rebuild = time.perf_counter() - start
+
+    pairs = [(random.choice(signatures), random.choice(signatures)) for _ in range(_QUERIES)]
+    start = time.perf_counter()
+
+    for signature_1, signature_2 in pairs:
+        members.member(signature_1)
+        members.comes_before(signature_1, signature_2)
+
+        if signature_1 != signature_2:
+            members.distance(signature_1, signature_2)
+
+    query = (time.perf_counter() - start) / _QUERIES
+    print(f"{size:6d} members: {query * 1e6:8.3f}µs/query, index rebuilt in {rebuild * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    for formation_size in _SIZES:
+        benchmark_member_queries(formation_size)
@@ -0,0 +1,136 @@
+import argparse
+import bisect
+import csv
+import random
+from typing import Callable, List, Tuple
+
+from control.estimation import GapEstimator
+
+_SAFETY_DISTANCE: float = 50  # mm
+_DURATION: float = 60  # simulated seconds
+_SAMPLE_RATE: float = 20  # samples per second
+_NOISE: float = 5  # standard deviation of the measurement noise in mm
+_SPEED: float = 100  # mm per second while driving
+_CONFIDENCE: float = 2  # standard deviations the estimated gap must exceed the safety distance by
+_NS: int = 1_000_000_000
+
+Trace = Callable[[float], float]  # seconds -> position of the vehicle ahead in mm
+
+
+def synthetic_trace(seconds: float) -> float:
+    """ Vehicle ahead starting 500 mm ahead and moving on by 300 mm every 10 s (like a lane closing gaps). """
+
+    steps, remainder = divmod(seconds, 10)
+    return 500 + 300 * steps + 300 * min(1.0, remainder / 3)
+
+
+def recorded_trace(path: str) -> Trace:
+    """ Loads a trace of ``seconds,position`` rows and interpolates linearly between them. """
+
+    with open(path) as file:
+        rows = sorted((float(seconds), float(position)) for seconds, position in csv.reader(file))
+
+    times = [seconds for seconds, _ in rows]
+
+    def trace(seconds: float) -> float:
+        index = bisect.bisect_right(times, seconds)
+        if index == 0 or index == len(rows):
+            return rows[min(index, len(rows) - 1)][1]
+
+        (start, first), (end, second) = rows[index - 1], rows[index]
+        return first + (second - first) * (seconds - start) / (end - start)
+
+    return trace
+
+
+def simulate(trace: Trace, unit: float, kalman: bool, seed: int = 0) -> Tuple[int, int, float]:
+    """ Simulates a vehicle closing the gap to the vehicle ahead in step units.
+
+    Before every step unit the safety check decides whether the unit can be driven, either based on the latest
+    measurement only (like before) or on the estimated gap. Measurements are taken at a fixed rate, so they may be
+    outdated while the vehicle drives.
+
+    Args:
+        trace: Position of the vehicle ahead over time.
+        unit: Distance of a step unit in mm.
+        kalman: Boolean whether the safety check uses the gap estimator.
+        seed: Seed of the measurement noise.
+
+    Returns:
+        The number of false stops (refused step units that would have kept the safety distance with a margin of three
+        noise deviations), the number of safety violations (driven step units that undercut the safety distance) and
+        the throughput in mm per second.
+    """
+
+    generator = random.Random(seed)
+    estimator = GapEstimator(measurement_variance=_NOISE ** 2)
+    position = seconds = 0.0
+    samples: List[Tuple[float, float]] = []  # time and measured gap
+    false_stops = violations = 0
+
+    # positions of the vehicle over time to measure the gap at the time a sample is taken
+    history: List[Tuple[float, float]] = [(0.0, 0.0)]
+
+    def sample_position(taken: float) -> float:
+        index = bisect.bisect_right(history, (taken, float("inf"))) - 1
+        return history[index][1]
+
+    def measurement(now: float) -> Tuple[float, float]:
+        # take every sample that is due (the vehicle's position was constant since the last decision)
+        while len(samples) <= now * _SAMPLE_RATE:
+            taken = len(samples) / _SAMPLE_RATE
+            samples.append((taken, trace(taken) - sample_position(taken) + generator.gauss(0, _NOISE)))
+
+        return samples[-1]
+
+    while seconds < _DURATION:
+        taken, gap = measurement(seconds)
+
+        if kalman:
+            estimator.measure(gap, int(taken * _NS))
+            predicted = estimator.estimate(int(seconds * _NS)).lower_bound(_CONFIDENCE) - unit
+        else:
+            predicted = gap - unit
+
+        true_gap = trace(seconds) - position - unit
+
+        if predicted >= _SAFETY_DISTANCE:
+            violations += true_gap < _SAFETY_DISTANCE
+            seconds += unit / _SPEED
+            position += unit
+            history.append((seconds, position))
+            estimator.move(unit, int(seconds * _NS))
+        else:
+            false_stops += true_gap >= _SAFETY_DISTANCE + 3 * _NOISE
+            seconds += 1 / _SAMPLE_RATE
+
+    return false_stops, violations, position / _DURATION
+
+
+def benchmark_gap_estimation(trace: Trace, units: List[float]) -> None:
+    """ Compares the safety check based on the latest measurement with the one based on the estimated gap.
+
+    Setup:
+        Run the benchmark (optionally with a recorded trace of the vehicle ahead).
+
+    Expected Results:
+        Prints false stops, safety violations and throughput of both safety checks for several step units. The
+        latest measurement alone violates the safety distance with growing step units as measurements are outdated
+        while driving. The estimated gap keeps the safety distance with larger step units.
+    """
+
+    for unit in units:
+        for name, kalman in [("latest", False), ("estimated", True)]:
+            false_stops, violations, throughput = simulate(trace, unit, kalman)
+            print(f"unit {unit:5.1f}mm, {name:9s}: {false_stops:5d} false stops, {violations:4d} violations, "
+                  f"{throughput:6.1f}mm/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates the safety check of closing the gap to a vehicle ahead.")
+    parser.add_argument("--trace", help="CSV file of seconds,position rows of the vehicle ahead (synthetic if unset)")
+    parser.add_argument("--units", type=float, nargs="+", default=[1, 5, 10, 20], help="step units in mm")
+    arguments = parser.parse_args()
+
+    benchmark_gap_estimation(synthetic_trace if arguments.trace is None else recorded_trace(arguments.trace),
+                             arguments.units)
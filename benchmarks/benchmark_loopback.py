@@ -0,0 +1,97 @@
+import argparse
+import time
+from datetime import datetime
+from threading import Lock
+from typing import List
+
+import interaction
+import util
+from interaction import communication
+from interaction.formation import _Member, _MemberRelation, _RelationGraph, _partition_topic
+
+_AGENT_COUNTS: List[int] = [10, 50, 200]
+_LANE_LENGTH: int = 10
+_MESSAGES: int = 200  # messages sent per agent
+
+
+class _SimulatedAgent:
+    def __init__(self, bus: interaction.LoopbackBus, index: int):
+        self.signature: str = f"agent-{index:04d}"
+        self.lane: int = index // _LANE_LENGTH
+        self.ahead: str = f"agent-{index - 1:04d}" if index % _LANE_LENGTH else None
+        self.graph: _RelationGraph = _RelationGraph()
+        self.graph_lock: Lock = Lock()
+        self.latency: util.LatencyStatistics = util.LatencyStatistics()
+
+        # every simulated agent needs its own connection with its own signature
+        self.connection = communication._Connection._cls(interaction.LoopbackTransport(bus))
+        self.connection.signature = self.signature
+        self.connection.subscribe(self.topic, self.handle, False, False)
+
+    @property
+    def topic(self) -> str:
+        return _partition_topic(interaction.Communication.Topics.FORMATION, self.lane)
+
+    def send(self) -> None:
+        relation = _MemberRelation(_Member(self.signature, 1.0, None), self.ahead).encode()
+
+        # respect backpressure of the outbox
+        while not self.connection.send(interaction.Message(self.signature, self.topic, relation, datetime.now())):
+            time.sleep(0.001)
+
+    def handle(self, message: interaction.Message) -> None:
+        with self.graph_lock:
+            self.graph.add(_MemberRelation.decode(message.content))
+
+        self.latency.record((datetime.now() - message.date).total_seconds())
+
+    @property
+    def handled(self) -> int:
+        return self.latency.count
+
+
+def benchmark_loopback(count: int, messages: int) -> None:
+    """ Load tests the communication stack of many agents exchanging formation messages over the loopback bus.
+
+    Every agent broadcasts its member relation to its lane and adds received relations to its relation graph. As the
+    loopback bus neither encodes messages nor needs a broker, the measurement only covers the communication stack
+    (outbox, routing and dispatching) and the handling of the messages.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the rate of handled messages, the p99 latency from sending until handling a message and the number of
+        messages dropped by the dispatchers.
+    """
+
+    bus = interaction.LoopbackBus()
+    agents = [_SimulatedAgent(bus, index) for index in range(count)]
+    receivers = min(count, _LANE_LENGTH) - 1  # every agent receives the messages of the other agents in its lane
+    expected = count * messages * receivers
+    start = time.perf_counter()
+
+    for _ in range(messages):
+        for agent in agents:
+            agent.send()
+
+    # wait until the dispatchers are idle
+    while sum(agent.handled for agent in agents) + sum(agent.connection.dispatcher.dropped for agent in agents) \
+            < expected:
+        time.sleep(0.001)
+
+    elapsed = time.perf_counter() - start
+    handled = sum(agent.handled for agent in agents)
+    p99 = max(agent.latency.percentile(99) for agent in agents if agent.handled)
+
+    print(f"{count:4d} agents: {handled / elapsed:10.1f} msg/s handled, p99 {p99 * 1000:8.3f}ms, "
+          f"{expected - handled} dropped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load tests the communication stack over the loopback bus.")
+    parser.add_argument("--messages", type=int, default=_MESSAGES, help="number of messages sent per agent")
+    arguments = parser.parse_args()
+
+    for agent_count in _AGENT_COUNTS:
+        benchmark_loopback(agent_count, arguments.messages)
@@ -0,0 +1,46 @@
+import time
+from datetime import datetime
+from typing import Callable
+
+import interaction
+from interaction.formation import _Member, _MemberRelation, _partition_topic
+
+_ITERATIONS: int = 20000
+
+
+def _measure(name: str, encode: Callable[[], bytes], decode: Callable[[bytes], interaction.Message]) -> None:
+    payload = encode()
+
+    start = time.perf_counter()
+    for _ in range(_ITERATIONS):
+        encode()
+    encoding = (time.perf_counter() - start) / _ITERATIONS
+
+    start = time.perf_counter()
+    for _ in range(_ITERATIONS):
+        decode(payload)
+    decoding = (time.perf_counter() - start) / _ITERATIONS
+
+    print(f"{name:6s}: {len(payload):4d} bytes, encode {encoding * 1e6:6.2f}µs, decode {decoding * 1e6:6.2f}µs")
+
+
+def benchmark_formation_message() -> None:
+    """ Compares the JSON and the binary wire format for formation messages.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the payload size and the encoding and decoding time of both formats.
+    """
+
+    relation = _MemberRelation(_Member("agent-0042", 37.5, datetime.now()), "agent-0041")
+    topic = _partition_topic(interaction.Communication.Topics.FORMATION, 0)
+    message = interaction.Message("agent-0042", topic, relation.encode(), datetime.now())
+
+    _measure("json", lambda: message.encode().encode(), interaction.Message.decode_payload)
+    _measure("binary", message.encode_binary, interaction.Message.decode_payload)
+
+
+if __name__ == "__main__":
+    benchmark_formation_message()
@@ -0,0 +1,151 @@
+import argparse
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+import sensing
+import util
+from control.motion import Guard, Motion, MotionEngine, Profile, SimulatedStepper
+from sensing import distance
+
+_TRIALS: int = 5
+_STEP_DURATION: float = 0.01  # seconds a simulated step takes (like two step delays of 5 ms)
+_UNIT: int = 80  # steps between two safety checks
+_DISTANCE_PER_STEP: float = 0.0125  # mm
+_BLOCKED: float = 40  # distance to the obstacle while the path is blocked in mm
+_FREE: float = 1000  # distance to the obstacle once the path is free in mm
+_BLOCKED_SLEEP: float = 1  # seconds the previous driving loop slept whenever the path was blocked
+
+
+class _TimedStepper(SimulatedStepper):
+    """ Simulated stepper remembering when its latest step was done. """
+
+    def __init__(self):
+        super().__init__()
+        self.stepped: Optional[float] = None
+
+    def step(self, forward: bool, interval: float) -> None:
+        super().step(forward, interval)
+        self.stepped = time.monotonic()
+
+
+class _FrontGuard(Guard):
+    """ Safety check against the latest front distance waiting for new samples while the path is blocked. """
+
+    def __init__(self, sensor: distance._UltrasonicSensor):
+        self.sensor: distance._UltrasonicSensor = sensor
+        self.measured: int = 0
+
+    def clearance(self, forward: bool) -> float:
+        reading = self.sensor.read(0.1)
+        self.measured = reading.timestamp
+        return max(0.0, (reading.value - util.const.Driving.SAFETY_DISTANCE) / _DISTANCE_PER_STEP)
+
+    def wait(self, timeout: float) -> None:
+        self.sensor.wait(self.measured, timeout)
+
+
+def _previous_loop(stepper: SimulatedStepper, guard: _FrontGuard, active: Callable[[], bool],
+                   step_duration: float) -> None:
+    # driving loop moving whole units and sleeping for a fixed time while the path is blocked
+    while active():
+        if guard.clearance(True) >= _UNIT:
+            for _ in range(_UNIT):
+                stepper.step(True, step_duration)
+        else:
+            time.sleep(_BLOCKED_SLEEP)
+
+
+def _report(name: str, latencies: List[float]) -> None:
+    print(f"{name:28s}: mean {sum(latencies) / len(latencies) * 1000:7.1f}ms, max {max(latencies) * 1000:7.1f}ms")
+
+
+def benchmark_stop(trials: int, step_duration: float) -> None:
+    """ Measures the latency from stopping a drive until the motor stands still.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean and maximum latency to stop of the previous driving loop (up to a whole step unit) and of the
+        motion engine (up to a single step).
+    """
+
+    generator = random.Random(0)
+    previous, engine_latencies = [], []
+
+    for _ in range(trials):
+        sampler = sensing.Sampler(sensing.SimulatedSource(default=_FREE))
+        guard = _FrontGuard(distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT))
+        stepper = _TimedStepper()
+        active = True
+        thread = threading.Thread(target=_previous_loop, args=(stepper, guard, lambda: active, step_duration))
+        thread.start()
+        time.sleep(generator.uniform(0.1, 1))
+        stopped, active = time.monotonic(), False
+        thread.join()
+        previous.append(stepper.stepped - stopped)
+
+        stepper = _TimedStepper()
+        engine = MotionEngine(util.Backend("stepper", lambda: stepper), Profile(1 / step_duration))
+        motion = engine.submit(Motion(True, guard=guard, unit=_UNIT))
+        time.sleep(generator.uniform(0.1, 1))
+        stopped = time.monotonic()
+        motion.cancel()
+        motion.wait()
+        engine_latencies.append(max(0.0, stepper.stepped - stopped))
+        sampler.stop()
+
+    _report("stop, previous loop", previous)
+    _report("stop, motion engine", engine_latencies)
+
+
+def benchmark_resume(trials: int, step_duration: float) -> None:
+    """ Measures the latency from a blocked path becoming free until the motor moves again.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean and maximum latency to resume of the previous driving loop (up to the fixed sleep of a second)
+        and of the motion engine (about a sample period of the front sensor).
+    """
+
+    generator = random.Random(0)
+    latencies = {"previous loop": [], "motion engine": []}
+
+    for _ in range(trials):
+        for name in latencies:
+            free_at = generator.uniform(0.2, 1)
+            source = sensing.SimulatedSource({sensing.Sensors.FRONT: lambda seconds: _BLOCKED if seconds < free_at
+                                              else _FREE})
+            sampler = sensing.Sampler(source)
+            guard = _FrontGuard(distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT))
+            stepper = _TimedStepper()
+            freed = time.monotonic() + free_at  # approximately the time the source was created plus the delay
+
+            if name == "previous loop":
+                thread = threading.Thread(target=_previous_loop,
+                                          args=(stepper, guard, lambda: stepper.stepped is None, step_duration))
+                thread.start()
+                thread.join()
+            else:
+                engine = MotionEngine(util.Backend("stepper", lambda: stepper), Profile(1 / step_duration))
+                engine.submit(Motion(True, 1, guard=guard, unit=_UNIT)).wait()
+
+            latencies[name].append(stepper.stepped - step_duration - freed)
+            sampler.stop()
+
+    for name, values in latencies.items():
+        _report(f"resume, {name}", values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the latencies to stop and to resume driving.")
+    parser.add_argument("--trials", type=int, default=_TRIALS, help="number of trials per measurement")
+    parser.add_argument("--step-duration", type=float, default=_STEP_DURATION, help="seconds a step takes")
+    arguments = parser.parse_args()
+
+    benchmark_stop(arguments.trials, arguments.step_duration)
+    benchmark_resume(arguments.trials, arguments.step_duration)
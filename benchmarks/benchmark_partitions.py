@@ -0,0 +1,68 @@
+import argparse
+from typing import List
+
+import interaction
+from interaction import formation
+from interaction.formation import _partition_topic
+
+_FLEET_SIZES: List[int] = [10, 100, 1000]
+
+
+def _load(fleet_size: int, lane_length: int, partitioned: bool) -> float:
+    """ Determines the mean number of formation messages each agent receives when every agent broadcasts once.
+
+    Args:
+        fleet_size: Number of agents.
+        lane_length: Number of agents per lane.
+        partitioned: Boolean whether agents use per-lane topics or a single topic.
+
+    Returns:
+        The mean number of received messages per agent.
+    """
+
+    router = interaction.Router()
+    topic = interaction.Communication.Topics.FORMATION
+    lanes = [agent // lane_length for agent in range(fleet_size)]
+
+    # subscribe every agent like its formation does
+    for agent, lane in enumerate(lanes):
+        if partitioned:
+            for neighbour in range(lane - formation._NEIGHBOUR_PARTITIONS, lane + formation._NEIGHBOUR_PARTITIONS + 1):
+                router.add(_partition_topic(topic, neighbour), agent)
+        else:
+            router.add(topic, agent)
+
+    received = 0
+
+    # every agent broadcasts its member relation once
+    for agent, lane in enumerate(lanes):
+        subscribers = router.match(_partition_topic(topic, lane) if partitioned else topic)
+        received += sum(subscriber != agent for subscriber in subscribers)
+
+    return received / fleet_size
+
+
+def benchmark_partitions(lane_length: int) -> None:
+    """ Compares the per-agent message load of a single formation topic with per-lane topics for growing fleets.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean number of messages every agent receives per broadcast round. With a single topic the load grows
+        linearly with the fleet, with per-lane topics it stays flat.
+    """
+
+    for fleet_size in _FLEET_SIZES:
+        single = _load(fleet_size, lane_length, False)
+        partitioned = _load(fleet_size, lane_length, True)
+        print(f"{fleet_size:5d} agents: single topic {single:7.1f} msg/agent, "
+              f"per-lane topics {partitioned:5.1f} msg/agent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates the formation message load per agent.")
+    parser.add_argument("--lane-length", type=int, default=10, help="number of agents per lane")
+    arguments = parser.parse_args()
+
+    benchmark_partitions(arguments.lane_length)
@@ -0,0 +1,57 @@
+import argparse
+from typing import Dict, List
+
+import util
+from control.motion import Guard, Motion, MotionEngine, Profile, SimulatedStepper
+
+_GAPS: List[float] = [60, 100, 200, 500]  # mm
+_DISTANCE_PER_STEP: float = 0.0125  # mm
+_UNIT: int = 80  # steps between two safety checks
+_PROFILES: Dict[str, Profile] = {
+    "constant": Profile(100),
+    "trapezoidal 400": Profile(100, 400, 400),
+    "trapezoidal 800": Profile(100, 800, 1600),
+}
+
+
+class _StaticGap(Guard):
+    """ Gap to a standing vehicle ahead which is known exactly. """
+
+    def __init__(self, gap: float):
+        self.gap: float = gap  # mm
+
+    def clearance(self, forward: bool) -> float:
+        return max(0.0, (self.gap - util.const.Driving.SAFETY_DISTANCE) / _DISTANCE_PER_STEP)
+
+    def moved(self, forward: bool, steps: int) -> None:
+        self.gap -= steps * _DISTANCE_PER_STEP
+
+
+def benchmark_profile(name: str, profile: Profile, gap: float) -> None:
+    """ Measures the time to close a gap to a standing vehicle ahead up to the safety distance.
+
+    Setup:
+        Run the benchmark (the motor is simulated, so the benchmark takes less time than the simulated drives).
+
+    Expected Results:
+        Prints the simulated time to close the gap, the remaining gap and the top speed for every profile. The
+        trapezoidal profiles close gaps faster while the remaining gap never undercuts the safety distance.
+    """
+
+    stepper = SimulatedStepper(realtime=False)
+    engine = MotionEngine(util.Backend("simulated stepper", lambda: stepper), profile)
+    guard = _StaticGap(gap)
+    engine.submit(Motion(True, condition=lambda: guard.clearance(True) >= 1, guard=guard, unit=_UNIT)).wait()
+
+    print(f"gap {gap:5.0f}mm, {name:15s}: {stepper.elapsed:7.2f}s, remaining gap {guard.gap:6.2f}mm, "
+          f"top speed {1 / min(stepper.intervals) * _DISTANCE_PER_STEP:5.2f}mm/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the time to close gaps with different velocity profiles.")
+    parser.add_argument("--gaps", type=float, nargs="+", default=_GAPS, help="gaps to the vehicle ahead in mm")
+    arguments = parser.parse_args()
+
+    for initial_gap in arguments.gaps:
+        for profile_name, velocity_profile in _PROFILES.items():
+            benchmark_profile(profile_name, velocity_profile, initial_gap)
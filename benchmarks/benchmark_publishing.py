@@ -0,0 +1,79 @@
+import argparse
+import time
+from datetime import datetime
+
+from paho.mqtt import publish
+
+import attributes
+import interaction
+import util
+from interaction import communication, transport
+
+_MESSAGE_COUNT: int = 2000
+
+
+def _message() -> interaction.Message:
+    return interaction.Message(attributes.SIGNATURE, "benchmark", {"payload": "x" * 64}, datetime.now())
+
+
+def benchmark_single_publish(count: int) -> None:
+    """ Measures throughput and latency of publishing every message over a new connection.
+
+    Setup:
+        Local MQTT broker (e.g. ``mosquitto -p 1883``). Run the benchmark.
+
+    Expected Results:
+        Prints messages per second and the p99 publish latency of ``publish.single``.
+    """
+
+    latency = util.LatencyStatistics(count)
+    start = time.perf_counter()
+
+    for _ in range(count):
+        sent = time.perf_counter()
+        publish.single(transport._TOPIC_PREFIX + "benchmark", _message().encode(), qos=transport._QOS,
+                       hostname=transport._BROKER_URL, port=transport._BROKER_PORT)
+        latency.record(time.perf_counter() - sent)
+
+    elapsed = time.perf_counter() - start
+    print(f"single:     {count / elapsed:10.1f} msg/s, p99 {latency.percentile(99) * 1000:8.3f}ms")
+
+
+def benchmark_persistent_publish(count: int) -> None:
+    """ Measures throughput and latency of publishing messages over the persistent connection.
+
+    Setup:
+        Local MQTT broker (e.g. ``mosquitto -p 1883``). Run the benchmark.
+
+    Expected Results:
+        Prints messages per second and the p99 latency from queueing a message until the broker acknowledged it.
+    """
+
+    connection = communication._Connection(interaction.MqttTransport())
+    acknowledged = connection.publish_latency.count
+    start = time.perf_counter()
+
+    for _ in range(count):
+        # respect backpressure of the outbox
+        while not connection.send(_message()):
+            time.sleep(0.001)
+
+    # wait for every message to be acknowledged
+    while connection.publish_latency.count - acknowledged < count:
+        time.sleep(0.001)
+
+    elapsed = time.perf_counter() - start
+    print(f"persistent: {count / elapsed:10.1f} msg/s, p99 {connection.publish_latency.percentile(99) * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares per-message connections with the persistent connection.")
+    parser.add_argument("--host", default="localhost", help="hostname of the MQTT broker")
+    parser.add_argument("--count", type=int, default=_MESSAGE_COUNT, help="number of messages to publish")
+    arguments = parser.parse_args()
+
+    # point the connection at the benchmark broker instead of the public one
+    transport._BROKER_URL = arguments.host
+
+    benchmark_single_publish(arguments.count)
+    benchmark_persistent_publish(arguments.count)
@@ -0,0 +1,113 @@
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+import attributes
+from interaction.formation import _Member, _MemberRelation, _RelationGraph
+
+_SIZES: List[int] = [10, 100, 1000, 10000]
+_MESSAGES: int = 1000
+_MAX_REBUILD_SIZE: int = 1000  # the previous algorithm takes too long beyond this size
+
+
+def _lanes(size: int, lane_length: int) -> List[_MemberRelation]:
+    """ Creates member relations of synthetic parking lanes.
+
+    The main agent is the second member of the first lane.
+
+    Args:
+        size: Total number of members.
+        lane_length: Number of members per lane.
+
+    Returns:
+        The member relations of every member.
+    """
+
+    signatures = [f"{index:05d}" for index in range(size)]
+    signatures[min(1, size - 1)] = attributes.SIGNATURE
+    relations = []
+
+    for index, signature in enumerate(signatures):
+        # the first member of every lane has no member in front of it
+        ahead = None if index % lane_length == 0 else signatures[index - 1]
+        relations.append(_MemberRelation(_Member(signature, 1.0, None), ahead))
+
+    return relations
+
+
+def _rebuild(edges: Dict[str, Optional[str]]) -> Optional[List[str]]:
+    """ Traces the transitivity of the main agent from scratch like the formation did before the graph was incremental.
+
+    Args:
+        edges: Edges of the relation graph.
+
+    Returns:
+        The signatures of the transitivity containing the main agent.
+    """
+
+    for starting, ahead in edges.items():
+        if ahead is not None and ahead in edges:
+            continue
+
+        reversed_edges = {ahead: behind for behind, ahead in edges.items() if ahead is not None}
+        transitivity = [starting]
+
+        while transitivity[-1] in reversed_edges:
+            behind = reversed_edges[transitivity[-1]]
+            assert behind not in transitivity
+            transitivity.append(behind)
+
+        if attributes.SIGNATURE in transitivity:
+            return transitivity
+
+    return None
+
+
+def benchmark_relation_graph(size: int, lane_length: int) -> None:
+    """ Measures the time to handle formation messages for a relation graph of a given size.
+
+    Every handled message re-adds a random (unchanged or changed) member relation and then looks up the linear
+    transitivity containing the main agent, just as ``Formation._add`` does.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean time per message which stays roughly constant for growing graphs.
+    """
+
+    relations = _lanes(size, lane_length)
+    graph = _RelationGraph()
+
+    for relation in relations:
+        graph.add(relation)
+
+    start = time.perf_counter()
+
+    for _ in range(_MESSAGES):
+        relation = random.choice(relations)
+        graph.add(relation)
+        graph.linear_transitivity(attributes.SIGNATURE)
+
+    incremental = (time.perf_counter() - start) / _MESSAGES
+    rebuild = float("nan")
+
+    if size <= _MAX_REBUILD_SIZE:
+        start = time.perf_counter()
+
+        for _ in range(_MESSAGES // 10):
+            _rebuild(graph.edges)
+
+        rebuild = (time.perf_counter() - start) / (_MESSAGES // 10)
+
+    print(f"{size:6d} vertices: incremental {incremental * 1e6:10.2f}µs/msg, rebuild {rebuild * 1e6:12.2f}µs/msg")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the scaling of the formation relation graph.")
+    parser.add_argument("--lane-length", type=int, default=10, help="number of members per parking lane")
+    arguments = parser.parse_args()
+
+    for graph_size in _SIZES:
+        benchmark_relation_graph(graph_size, arguments.lane_length)
@@ -0,0 +1,48 @@
+import random
+import time
+from typing import List
+
+from interaction.routing import Router
+
+_SUBSCRIPTION_COUNTS: List[int] = [10, 100, 1000, 10000]
+_MESSAGES: int = 20000
+
+
+def benchmark_dispatch(subscriptions: int) -> None:
+    """ Measures the cost of matching topics against a growing number of subscriptions.
+
+    Subscriptions are spread over per-lane and per-agent topics with a share of wildcard subscriptions.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean time to match a topic which stays roughly constant for growing numbers of subscriptions.
+    """
+
+    router = Router()
+    lanes = max(1, subscriptions // 10)
+
+    for index in range(subscriptions):
+        lane = index % lanes
+
+        if index % 10 == 0:
+            router.add(f"lane/{lane}/+", index)
+        elif index % 10 == 1:
+            router.add(f"lane/{lane}/#", index)
+        else:
+            router.add(f"lane/{lane}/agent/{index}", index)
+
+    topics = [f"lane/{random.randrange(lanes)}/agent/{random.randrange(subscriptions)}" for _ in range(_MESSAGES)]
+    start = time.perf_counter()
+
+    for topic in topics:
+        router.match(topic)
+
+    elapsed = (time.perf_counter() - start) / _MESSAGES
+    print(f"{subscriptions:6d} subscriptions: {elapsed * 1e6:6.2f}µs/match")
+
+
+if __name__ == "__main__":
+    for subscription_count in _SUBSCRIPTION_COUNTS:
+        benchmark_dispatch(subscription_count)
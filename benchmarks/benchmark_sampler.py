@@ -0,0 +1,83 @@
+import argparse
+import math
+import time
+
+import sensing
+import util
+from sensing import distance
+
+_READS: int = 2000
+_DURATION: float = 5  # seconds
+_READ_LATENCY: float = 0.002  # seconds a simulated sensor reading takes
+
+
+def _source(latency: float) -> sensing.SimulatedSource:
+    return sensing.SimulatedSource({sensing.Sensors.FRONT: lambda seconds: 500 + 200 * math.sin(seconds)},
+                                   noise=5, latency=latency)
+
+
+def benchmark_synchronous_read(reads: int, latency: float) -> None:
+    """ Measures the latency of reading a sensor on the caller's thread.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean and p99 read latency which include the sensor I/O.
+    """
+
+    source = _source(latency)
+    statistics = util.LatencyStatistics(reads)
+
+    for _ in range(reads):
+        start = time.perf_counter()
+        source.read(sensing.Sensors.FRONT)
+        statistics.record(time.perf_counter() - start)
+
+    print(f"synchronous: mean {statistics.mean * 1e6:9.1f}µs, p99 {statistics.percentile(99) * 1e6:9.1f}µs")
+
+
+def benchmark_sampler(reads: int, latency: float, duration: float) -> None:
+    """ Measures the read latency and the achieved sample rates of the background sampler.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean and p99 latency of reading the latest value (without sensor I/O) and the median of the latest
+        samples as well as the achieved sample rate of every sensor compared to its configured rate.
+    """
+
+    sampler = sensing.Sampler(_source(latency))
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+    latest, median = util.LatencyStatistics(reads), util.LatencyStatistics(reads)
+    front.value  # start sampling
+
+    for _ in range(reads):
+        start = time.perf_counter()
+        front.value
+        latest.record(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        front.median()
+        median.record(time.perf_counter() - start)
+
+    time.sleep(duration)
+    sampler.stop()
+
+    print(f"latest:      mean {latest.mean * 1e6:9.1f}µs, p99 {latest.percentile(99) * 1e6:9.1f}µs")
+    print(f"median:      mean {median.mean * 1e6:9.1f}µs, p99 {median.percentile(99) * 1e6:9.1f}µs")
+
+    for sensor, buffer in sampler.buffers.items():
+        print(f"{sensor:12s} {buffer.count / duration:6.1f} samples/s (configured {sampler.rates[sensor]:5.1f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares synchronous sensor reads with the background sampler.")
+    parser.add_argument("--reads", type=int, default=_READS, help="number of reads to measure")
+    parser.add_argument("--latency", type=float, default=_READ_LATENCY, help="seconds a sensor reading takes")
+    parser.add_argument("--duration", type=float, default=_DURATION, help="seconds to measure sample rates for")
+    arguments = parser.parse_args()
+
+    benchmark_synchronous_read(arguments.reads, arguments.latency)
+    benchmark_sampler(arguments.reads, arguments.latency, arguments.duration)
@@ -0,0 +1,59 @@
+import argparse
+import pathlib
+import time
+
+import numpy as np
+
+import sensing
+import util
+
+_REPEATS: int = 10  # ticks per recorded frame (a parked lane keeps seeing the same scene)
+_NOISE: int = 2  # maximum sensor noise in luma levels
+
+
+def benchmark_scan_cache(corpus: pathlib.Path, repeats: int) -> None:
+    """ Compares scanning with and without skipping the decoding of unchanged scenes.
+
+    Every recorded frame is scanned several times with added sensor noise, like formation ticks of a parked lane.
+
+    Setup:
+        Record a corpus of frames (see ``benchmark_decoding``) and run the benchmark.
+
+    Expected Results:
+        Prints the mean scan latency of both decoders, the hit rate and time saved of the cache and the number of ticks
+        the cached decoder returned a different signature than decoding every frame (should be zero).
+    """
+
+    frames = [np.load(path) for path in sorted(corpus.glob("*.npy"))]
+    assert frames, f"The corpus {corpus} does not contain any frames."
+
+    generator = np.random.default_rng(0)
+    uncached, cached = sensing.QrDecoder(), sensing.CachedQrDecoder(sensing.QrDecoder())
+    uncached_latency, cached_latency = util.LatencyStatistics(), util.LatencyStatistics()
+    differences = 0
+
+    for frame in frames:
+        for _ in range(repeats):
+            noisy = np.clip(frame.astype(np.int16) + generator.integers(-_NOISE, _NOISE + 1, frame.shape), 0, 255) \
+                .astype(np.uint8)
+
+            start = time.perf_counter()
+            expected = uncached.decode(noisy)
+            uncached_latency.record(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            differences += cached.decode(noisy) != expected
+            cached_latency.record(time.perf_counter() - start)
+
+    print(f"uncached: mean {uncached_latency.mean * 1000:8.3f}ms")
+    print(f"cached:   mean {cached_latency.mean * 1000:8.3f}ms, hit rate {cached.hit_rate:6.1%}, "
+          f"time saved {cached.time_saved:7.3f}s, {differences} differing signatures")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the effect of caching the ahead signature.")
+    parser.add_argument("corpus", type=pathlib.Path, help="directory of frames stored as .npy files")
+    parser.add_argument("--repeats", type=int, default=_REPEATS, help="ticks per recorded frame")
+    arguments = parser.parse_args()
+
+    benchmark_scan_cache(arguments.corpus, arguments.repeats)
@@ -0,0 +1,73 @@
+import argparse
+import threading
+import time
+from typing import Callable, List
+
+import sensing
+import util
+from sensing import distance
+
+_READER_COUNTS: List[int] = [1, 4, 16]
+_READS: int = 5000  # reads per reader
+_SAMPLE_RATE: float = 1000  # samples per second and sensor to stress the writer
+
+
+def _read_sensors(sampler: sensing.Sampler) -> Callable[[], None]:
+    sensors = [distance._UltrasonicSensor(sampler, sensor) for sensor in sampler.rates]
+
+    def read() -> None:
+        # four separate readings taken at different moments
+        for sensor in sensors:
+            sensor.read(1)
+
+    return read
+
+
+def benchmark_readers(name: str, read: Callable[[sensing.Sampler], Callable[[], None]], readers: int,
+                      reads: int) -> None:
+    """ Measures the read latency of all four sensors while several readers read concurrently.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the mean and p99 latency of reading all sensors separately and of reading a snapshot. Reading a
+        snapshot is a single reference read and therefore stays fast with growing numbers of readers.
+    """
+
+    rates = {sensor: _SAMPLE_RATE for sensor in distance.SAMPLE_RATES}
+    sampler = sensing.Sampler(sensing.SimulatedSource(noise=5), rates)
+    sampler.complete_snapshot()
+    statistics = util.LatencyStatistics(readers * reads)
+    function = read(sampler)
+    barrier = threading.Barrier(readers)
+
+    def reader() -> None:
+        barrier.wait()
+
+        for _ in range(reads):
+            start = time.perf_counter()
+            function()
+            statistics.record(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    sampler.stop()
+
+    print(f"{name:8s} {readers:3d} readers: mean {statistics.mean * 1e6:8.2f}µs, "
+          f"p99 {statistics.percentile(99) * 1e6:8.2f}µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares reading all sensors separately with reading a snapshot.")
+    parser.add_argument("--reads", type=int, default=_READS, help="number of reads per reader")
+    arguments = parser.parse_args()
+
+    for reader_count in _READER_COUNTS:
+        benchmark_readers("sensors", _read_sensors, reader_count, arguments.reads)
+        benchmark_readers("snapshot", lambda sampler: sampler.complete_snapshot, reader_count, arguments.reads)
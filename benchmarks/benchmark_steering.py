@@ -0,0 +1,85 @@
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+import attributes
+import control
+from control import driver
+
+_CALLS: int = 100000
+_STEERING_PARAMETERS: List[float] = [0.05, 2.5, 307]  # plausible coefficients of the PWM approximation
+
+
+class _MockPCA9685:
+    """ PWM controller accepting writes without I2C. """
+
+    def __init__(self):
+        self.writes: int = 0
+
+    def set_pwm(self, channel: int, on: int, off: int) -> None:
+        self.writes += 1
+
+
+def _polynomial_pwm(angle: float) -> float:
+    # previous conversion evaluating the polynomial on every call
+    coefficients = reversed(attributes.STEERING_PARAMETERS)
+    return sum(coefficient * (angle ** exponent) for exponent, coefficient in enumerate(coefficients))
+
+
+def benchmark_steering(calls: int, resolution: float) -> None:
+    """ Measures the number of steering calls per second against a mocked PWM controller.
+
+    Setup:
+        Run the benchmark.
+
+    Expected Results:
+        Prints the steering calls per second of evaluating the polynomial on every call, of the PWM table and of the
+        batch path for trajectories. The PWM table is faster than the polynomial (the more so the higher its degree)
+        and the batch path is several times faster than single calls.
+    """
+
+    motor = _MockPCA9685()
+    driver.STEERING_MOTOR.use(lambda: motor)
+    vehicle_driver = control.Driver._cls(resolution, math.inf)  # without rate limit
+    angles = np.random.default_rng(0).uniform(-25, 25, calls).tolist()
+
+    def report(name: str, duration: float) -> None:
+        print(f"{name:10s}: {calls / duration:12,.0f} calls/s")
+
+    start = time.perf_counter()
+    for angle in angles:
+        motor.set_pwm(0, 0, _polynomial_pwm(max(driver._MIN_ANGLE, min(driver._MAX_ANGLE, angle))))
+    report("polynomial", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for angle in angles:
+        vehicle_driver.steer(angle)
+    report("table", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    vehicle_driver.steer_many(angles, 0)
+    report("batch", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures steering calls per second against a mocked PWM controller.")
+    parser.add_argument("--calls", type=int, default=_CALLS, help="number of steering calls per variant")
+    parser.add_argument("--resolution", type=float, default=driver._ANGLE_RESOLUTION,
+                        help="degrees between two angles of the PWM table")
+    arguments = parser.parse_args()
+
+    # steering parameters of a temporary attributes file
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "agent.json")
+        with open(path, "w") as file:
+            json.dump({"signature": "benchmark", "delta": 0, "steering": _STEERING_PARAMETERS}, file)
+
+        attributes.initialize(path)
+
+    benchmark_steering(arguments.calls, arguments.resolution)
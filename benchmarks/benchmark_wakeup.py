@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from threading import Event
+from typing import Optional, Tuple
+
+import attributes
+import interaction
+import sensing
+import util
+from control import agent
+from interaction import communication
+from interaction.formation import Formation, _Member, _MemberRelation, _partition_topic
+from sensing import distance
+
+_TRIALS: int = 10
+_IDLE_WINDOW: float = 2  # seconds the idle CPU usage is measured for
+_NEAR: float = 100  # mm to the vehicle ahead while it is parked
+_FAR: float = 400  # mm to the vehicle ahead once it moved away
+
+
+def simulate(min_delay: float, max_delay: float, steps: int, wake: bool,
+             trials: int) -> Tuple[util.LatencyStatistics, float, float]:
+    """ Simulates the state updates of an idle main agent which relevant changes happen to.
+
+    The state updates run in a ``@stabilized_concurrent`` loop like ``MainAgent._run`` and update a formation on a
+    loopback bus whose sensors are sampled from a simulated source. Once the delay has backed off to the maximum delay,
+    either the neighbour behind the main agent requests to leave the lane or the vehicle ahead moves away at a random
+    time. Both changes either wake up the loop like in the main agent (the formation's and the front distance's wake-up)
+    or wait for the next update. Every change is undone once the loop reacted to it.
+
+    Args:
+        min_delay: Minimum delay between two updates.
+        max_delay: Maximum delay between two updates.
+        steps: Number of stable updates to reach the maximum delay.
+        wake: Boolean whether changes wake up the loop.
+        trials: Number of changes.
+
+    Returns:
+        The reaction latencies, the number of updates per second and the CPU usage while idle.
+    """
+
+    ahead = _NEAR
+    sampler = sensing.Sampler(sensing.SimulatedSource({sensing.Sensors.FRONT: lambda seconds: ahead}))
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+
+    # the main agent and its neighbour behind communicate over a loopback bus
+    bus = interaction.LoopbackBus()
+    communication._Connection._instance = communication._Connection._cls(interaction.LoopbackTransport(bus))
+    neighbour = communication._Connection._cls(interaction.LoopbackTransport(bus))
+    neighbour.signature = "neighbour"
+    formation = Formation._cls()
+
+    def request(filing: bool) -> None:
+        relation = _MemberRelation(_Member(neighbour.signature, 40.0, datetime.now() if filing else None),
+                                   attributes.SIGNATURE)
+        topic = _partition_topic(interaction.Communication.Topics.FORMATION, attributes.LANE)
+        neighbour.send(interaction.Message(neighbour.signature, topic, relation.encode(), datetime.now()))
+
+    wakeup = util.Wakeup()
+
+    if wake:
+        formation.wakeup = wakeup
+        front.watch(agent._AHEAD_DISTANCE, wakeup)
+
+    requested: Optional[float] = None  # time of the pending change
+    state: Tuple[bool, bool] = (False, False)  # whether the neighbour is filing and the vehicle ahead moved away
+    reacted = Event()
+    stopped = Event()
+    latencies = util.LatencyStatistics()
+    updates = 0
+
+    @util.stabilized_concurrent("T-Benchmark", min_delay, max_delay, steps, True, (lambda: wakeup) if wake else None)
+    def update() -> bool:
+        nonlocal requested, state, updates
+
+        # park the loop once the simulation is done
+        if stopped.is_set():
+            Event().wait()
+
+        updates += 1
+        formation._update(None, False)
+        current = (any(member.filing is not None for member in formation), front.value > agent._AHEAD_DISTANCE)
+
+        if current == state:
+            return True
+
+        state = current
+
+        if requested is not None:
+            latencies.record(time.monotonic() - requested)
+            requested = None
+            reacted.set()
+
+        return False
+
+    # the delay backs off to the maximum delay after the given number of stable updates
+    backoff = sum(util.backoff_delay(min_delay, max_delay, steps, stable) for stable in range(steps + 1))
+    sampler.start()
+    update()
+
+    for trial in range(trials):
+        time.sleep(backoff + random.uniform(0, max_delay))
+        reacted.clear()
+        requested = time.monotonic()
+
+        # alternate between a leave request of the neighbour and the vehicle ahead moving away
+        if trial % 2 == 0:
+            request(True)
+        else:
+            ahead = _FAR
+
+        reacted.wait()
+
+        # undo the change which the loop reacts to without recording its latency
+        if trial % 2 == 0:
+            request(False)
+        else:
+            ahead = _NEAR
+
+    # measure the updates and the CPU time of the idle agent (including the sampling of the sensors)
+    time.sleep(backoff + max_delay)
+    start, cpu_start, updates_start = time.monotonic(), time.process_time(), updates
+    time.sleep(_IDLE_WINDOW)
+    elapsed = time.monotonic() - start
+    stopped.set()
+    sampler.stop()
+    formation.stop()
+
+    return latencies, (updates - updates_start) / elapsed, (time.process_time() - cpu_start) / elapsed
+
+
+def benchmark_wakeup(min_delay: float, max_delay: float, steps: int, trials: int) -> None:
+    """ Compares the reaction latency to relevant changes and the idle CPU usage of the main agent's update loop.
+
+    Setup:
+        Run the benchmark (it takes about ``trials`` times the back-off time and the maximum delay per variant).
+        Delays default to a tenth of the main agent's delays to keep the benchmark short.
+
+    Expected Results:
+        Prints the mean and maximum reaction latency, the updates per second and the CPU usage while idle for updates
+        polling with exponential back-off, polling at the minimum delay and waking up on changes. Waking up reacts as
+        soon as the message is handled or the next sample is taken while keeping the idle CPU usage of the back-off,
+        whereas the back-off alone reacts after up to the maximum delay and polling at the minimum delay keeps the CPU
+        busy while idle.
+    """
+
+    variants = [("back-off", min_delay, max_delay, False),
+                ("minimum delay", min_delay, min_delay * (1 + 1e-9), False),
+                ("wake-up", min_delay, max_delay, True)]
+
+    for name, minimum, maximum, wake in variants:
+        latencies, rate, cpu = simulate(minimum, maximum, steps, wake, trials)
+        print(f"{name:13s}: latency mean {latencies.mean * 1e3:7.1f}ms, max {latencies.percentile(100) * 1e3:7.1f}ms, "
+              f"idle {rate:6.1f} updates/s, {cpu * 100:5.2f}% CPU")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures how quickly the main agent reacts to relevant changes.")
+    parser.add_argument("--min-delay", type=float, default=agent._MIN_DELAY / 10,
+                        help="minimum delay between two updates")
+    parser.add_argument("--max-delay", type=float, default=agent._MAX_DELAY / 10,
+                        help="maximum delay between two updates")
+    parser.add_argument("--steps", type=int, default=agent._DELAY_STEPS,
+                        help="stable updates to reach the maximum delay")
+    parser.add_argument("--trials", type=int, default=_TRIALS, help="number of changes")
+    arguments = parser.parse_args()
+
+    # attributes of the main agent in a temporary attributes file
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "agent.json")
+        with open(path, "w") as file:
+            json.dump({"signature": "benchmark", "delta": 40.0, "steering": [0.0]}, file)
+
+        attributes.initialize(path)
+
+    benchmark_wakeup(arguments.min_delay, arguments.max_delay, arguments.steps, arguments.trials)
@@ -1,2 +1,3 @@
 from control.agent import MainAgent
 from control.driver import Driver
+from control.compaction import GapCloser, wave_delay
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 import time
-from typing import Callable
+from typing import Callable, Optional, Set
 
 import attributes
 import control
 import interaction
+import sensing
 import util
 
 _MIN_DELAY: float = 0.2
 _MAX_DELAY: float = 4
 _DELAY_STEPS: int = 8
+_MAX_SENSOR_AGE: float = 0.1  # maximum number of seconds since the front distance used to close the gap was measured
+_AHEAD_DISTANCE: float = 200  # mm of front distance beyond which the vehicle ahead is considered to have moved away
+_FINISH_TIMEOUT: float = 10  # seconds to wait for the agent ahead to confirm that it finished after the last movement
 
 
-def _action(function: Callable[[MainAgent], None]):
+def _action(function: Callable[..., None]):
     """ Decorator managing the ``standby`` state of the main agent.
 
     This function wraps and returns a function that calls a driving ``function``. Before executing the action the main
@@ -30,10 +34,13 @@ def _action(function: Callable[[MainAgent], None]):
         Wrapper function calling the decorated function and handling the main agent's ``standby`` state.
     """
 
-    def wrapper(agent: MainAgent):
+    def wrapper(agent: MainAgent, *args, **kwargs):
         agent.activate()  # activate agent  -> standby = False
-        function(agent)  # execute action
-        agent.deactivate()  # deactivate agent -> standby = True
+
+        try:
+            function(agent, *args, **kwargs)  # execute action
+        finally:
+            agent.deactivate()  # deactivate agent -> standby = True (even if the action failed)
 
     return wrapper
 
@@ -47,22 +54,39 @@ class MainAgent(interaction.Communication):
 
         return self._formation.delta_max / number_agents + util.const.Driving.SAFETY_DISTANCE
 
-    def __init__(self):
-        super().__init__()
+    @property
+    def odometer(self) -> util.Odometer:
+        # distances driven by all drives (the latest drive's odometer is ``self._driver.drive.odometer``)
+        return self._driver.odometer
+
+    def __init__(self, asynchronous: bool = False):
+        # asynchronous agents share the running event loop with their connection (which must not be created before)
+        super().__init__(asynchronous=asynchronous)
         self._standby: bool = True
         self._formation: interaction.Formation = interaction.Formation()
         self._driver: control.Driver = control.Driver()
         self._current_state_hash: int = hash(self)
 
-        self._run()
+        # relevant changes interrupt the delay between two state updates instead of waiting for the next update
+        self._wakeup: util.Wakeup = util.Wakeup()
+        self._formation.wakeup = self._wakeup  # relevant formation messages
+        sensing.Scanner().wakeup = self._wakeup  # changes of the scene ahead (e.g. of the QR code)
+        sensing.Distance.FRONT.watch(_AHEAD_DISTANCE, self._wakeup)  # the vehicle ahead moved away or closed up
 
-    @util.stabilized_concurrent(util.const.ThreadNames.MAIN_AGENT_ACTION, _MIN_DELAY, _MAX_DELAY, _DELAY_STEPS, False)
+        # asynchronous agents are run by awaiting ``run()`` on an event loop instead of in their own thread
+        if not asynchronous:
+            self._run()
+
+    @util.stabilized_concurrent(util.const.ThreadNames.MAIN_AGENT_ACTION, _MIN_DELAY, _MAX_DELAY, _DELAY_STEPS, False,
+                                lambda agent: agent._wakeup)
     def _run(self) -> bool:
         """ Concurrently updates the agent's state.
 
         The state of the agent is only updated if there is no action.
         This is to ensure that the formation remains coherent and complete for every agent in the formation while an
         action is executed.
+        Relevant changes (formation messages, changes of the scene ahead and of the front distance) wake the agent up
+        right away, so that the delays only back off while the agent is idle.
 
         Notes:
             This method runs concurrently with dynamic delays.
@@ -82,6 +106,26 @@ class MainAgent(interaction.Communication):
 
         return self._state_hash_stable()
 
+    @util.stabilized_coroutine(_MIN_DELAY, _MAX_DELAY, _DELAY_STEPS, lambda agent: agent._wakeup)
+    async def run(self) -> bool:
+        """ Updates the agent's state on the running event loop.
+
+        This is the counterpart of ``_run(...)`` for agents created with ``asynchronous=True`` on the running event loop
+        so that the control loop shares the event loop with the agent's connection.
+
+        Notes:
+            This method repeats with dynamic delays as long as it is awaited.
+
+        Returns:
+            Boolean whether the execution was stable which is the case exactly if the state of the agent did not change.
+        """
+
+        # if there is currently no action to perform, update the state
+        if self._standby:
+            await self._formation.update_async()
+
+        return self._state_hash_stable()
+
     def _update_state(self) -> None:
         """ Updates the agents state updating its formation.
 
@@ -120,32 +164,29 @@ class MainAgent(interaction.Communication):
 
         self._standby = True
 
-    # TODO: address driver to leave parking lot
-    @_action
-    def leave(self):
-        pass
-
     @_action
     def create_space(self) -> None:
         """ Creates space for a leaving agent.
 
-        In order to do so, the main agent moves up in the according direction until the agent has left the formation.
+        In order to do so, the main agent moves up in the according direction until the agent confirmed that it
+        finished leaving or has left the formation.
         After the leaving agent finished the leaving process, the main agent minimizes the space again.
 
         See Also:
             For reference regarding minimizing space:
-                - def minimize_space(...)
+                - def _minimize_space(...)
         """
 
         # get the leaving agent from the formation
         filing_member = self._formation.filing_member
 
-        # only create space if the leaving agent is part of the same formation
-        if not filing_member:
+        # only create space if the leaving agent is another agent of the same formation
+        if not filing_member or filing_member.signature == attributes.SIGNATURE:
             return
 
         # initially the leaving process is running
         process_running = True
+        finished: Set[str] = set()  # signatures of all agents that finished a process since
 
         def on_process_finish(message: interaction.Message) -> None:
             """ Flags the leaving process as finished.
@@ -158,25 +199,109 @@ class MainAgent(interaction.Communication):
             """
 
             nonlocal process_running
-            process_running = not message.sender == filing_member.signature
+            process_running = process_running and not message.sender == filing_member.signature
+            finished.add(message.sender)
 
         # listen for finished processes to determine when the leaving agent left the parking lane
-        self.subscribe(interaction.Communication.Topics.PROCESS_FINISHED, on_process_finish)
+        subscription = self.subscribe(interaction.Communication.Topics.PROCESS_FINISHED, on_process_finish)
 
-        # drive in the matching direction as long as the leaving agent has not yet finished the process
+        # the leaving agent may no longer be part of the formation afterwards
         comes_before = self._formation.comes_before(attributes.SIGNATURE, filing_member.signature)  # get direction
+        vehicles_between = self._formation.distance(attributes.SIGNATURE, filing_member.signature)
+
+        # drive in the matching direction as long as the leaving agent has not yet finished the process
         direction = self._driver.forward if comes_before else self._driver.backward  # get driving mode
-        direction.do_while(lambda: process_running)  # drive
+        direction.do_while(lambda: process_running and filing_member.signature in self._formation)  # drive
+
+        # minimize space in a staggered wave starting shortly after the agents closer to the leaving agent
+        time.sleep(control.wave_delay(vehicles_between))
 
-        # minimize space after waiting for other agents closer to the leaving agent
-        delay = self._formation.distance(attributes.SIGNATURE, filing_member.signature)  # determine prior distance
-        time.sleep(delay)  # wait an according amount of time
-        self.minimize_space()  # start minimizing the space again
+        # keep listening until then, as agents closer to the leaving agent may have finished minimizing space already
+        subscription.cancel()
+        self._minimize_space(finished)  # start minimizing the space again within the same action
 
-    # TODO: address driver to minimize the distance to the next agent
     @_action
-    def minimize_space(self):
-        pass
+    def minimize_space(self, finished: Optional[Set[str]] = None) -> None:
+        """ Closes the gap to the vehicle ahead up to the minimum distance.
+
+        See Also:
+            - ``def _minimize_space(...)``
+
+        Args:
+            finished: Signatures of the agents which already confirmed to have finished minimizing space.
+        """
+
+        self._minimize_space(finished)
+
+    def _minimize_space(self, finished: Optional[Set[str]] = None) -> None:
+        """ Closes the gap to the vehicle ahead up to the minimum distance as part of an action.
+
+        The distance to drive is planned from the front distance repeatedly, as the vehicle ahead may be closing its
+        own gap at the same time. Once the gap is closed and the agent ahead has finished (filing agents are skipped as
+        they are leaving), the process is confirmed as finished so that the agent behind can finish as well.
+        The agent ahead is no longer waited for once it left the formation or did not confirm within ``_FINISH_TIMEOUT``
+        seconds since the main agent last moved.
+
+        Args:
+            finished: Signatures of the agents which already confirmed to have finished minimizing space.
+
+        See Also:
+            For reference regarding closing the gap:
+                - ``class GapCloser``
+        """
+
+        # the nearest agent ahead that is not leaving the lane
+        ahead = next((member for member in reversed(self._formation.ahead(attributes.SIGNATURE))
+                      if member.filing is None), None)
+        ahead_finished = ahead is None or ahead.signature in (finished or ())
+
+        def on_process_finish(message: interaction.Message) -> None:
+            """ Flags the agent ahead as finished if it confirmed that it finished closing its gap.
+
+            Args:
+                message: Message sent to confirm that a driving process was finished.
+            """
+
+            nonlocal ahead_finished
+            ahead_finished = ahead_finished or message.sender == ahead.signature
+
+        # listen for the agent ahead to finish before driving, so that its confirmation cannot be missed
+        subscription = self.subscribe(interaction.Communication.Topics.PROCESS_FINISHED, on_process_finish)
+        closer = control.GapCloser(self.minimum_distance)
+        mode = self._driver.forward
+        front = sensing.Distance.FRONT
+        moved = 0  # number of steps driven when the agent ahead was given another ``_FINISH_TIMEOUT`` seconds
+        deadline = time.monotonic() + _FINISH_TIMEOUT
+
+        try:
+            while True:
+                # plan the distance to drive without undercutting the safety distance
+                reading = front.read(_MAX_SENSOR_AGE)
+                distance = closer.distance(reading.value, mode.free_distance)
+
+                # the agent ahead has more time to finish as long as the gap keeps changing
+                if mode.odometer.total_steps != moved:
+                    moved = mode.odometer.total_steps
+                    deadline = time.monotonic() + _FINISH_TIMEOUT
+
+                # stop waiting for an agent ahead that is gone or does not confirm
+                if not ahead_finished and (ahead.signature not in self._formation or time.monotonic() > deadline):
+                    ahead_finished = True
+
+                if closer.finished(distance, ahead_finished):
+                    break
+
+                # drive the planned distance or wait for the gap to change
+                if distance > 0:
+                    # the process is aborted if another driving mode stopped this one
+                    if mode.do_for(distance).cancelled:
+                        return
+                else:
+                    front.wait(reading.timestamp, _MAX_SENSOR_AGE)
+        finally:
+            subscription.cancel()
+
+        self.send(interaction.Communication.Topics.PROCESS_FINISHED, None)
 
     def __hash__(self):
         return hash(repr(self._formation))
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import math
+
+_TOLERANCE: float = 2  # mm the gap may exceed the minimum distance by once it is closed
+_WAVE_STAGGER: float = 0.2  # seconds a vehicle starts closing its gap after the vehicle ahead of it
+
+
+def wave_delay(vehicles_between: int, stagger: float = _WAVE_STAGGER) -> float:
+    """ Determines when a vehicle starts closing its gap after a vehicle left the lane.
+
+    Vehicles start in a staggered wave from the gap left behind outwards. Every vehicle starts shortly after the
+    vehicle next to it, so that the lane compacts in parallel rather than one vehicle after another. The vehicle ahead
+    has already started to move away once a vehicle starts, so that its front distance reflects the opening gap.
+
+    Args:
+        vehicles_between: Number of vehicles between the vehicle and the vehicle that left.
+        stagger: Number of seconds between the starts of two neighbouring vehicles.
+
+    Returns:
+        The number of seconds to wait before closing the gap.
+    """
+
+    return vehicles_between * stagger
+
+
+class GapCloser:
+    """ Controller closing the gap to the vehicle ahead up to the minimum distance.
+
+    The controller repeatedly plans the distance to drive from the latest front distance, as the vehicle ahead may
+    still be moving. The gap is closed once it does not exceed the minimum distance by more than the tolerance or the
+    vehicle cannot drive further without undercutting the safety distance. The vehicle has finished once its gap is
+    closed and the vehicle ahead has finished as well, as the gap reopens as long as the vehicle ahead is moving.
+    """
+
+    def __init__(self, minimum_distance: float, tolerance: float = _TOLERANCE):
+        assert tolerance >= 0, f"The tolerance {tolerance} must not be negative."
+
+        self.minimum_distance: float = minimum_distance  # mm
+        self.tolerance: float = tolerance
+
+    def distance(self, gap: float, free_distance: float = math.inf) -> float:
+        """ Plans the distance to drive towards the vehicle ahead.
+
+        Args:
+            gap: Front distance in mm.
+            free_distance: Distance in mm the vehicle may drive without undercutting the safety distance.
+
+        Returns:
+            The distance to drive in mm (zero if the gap is closed).
+        """
+
+        excess = min(gap - self.minimum_distance, free_distance)
+        return excess if excess > self.tolerance else 0.0
+
+    @staticmethod
+    def finished(distance: float, ahead_finished: bool) -> bool:
+        """ Determines whether the vehicle has finished closing its gap.
+
+        Args:
+            distance: Planned distance to drive in mm.
+            ahead_finished: Boolean whether the vehicle ahead has finished (or there is none).
+
+        Returns:
+            Whether the vehicle has finished.
+        """
+
+        return distance == 0 and ahead_finished
@@ -1,21 +1,29 @@
 from __future__ import annotations
 
 import time
-from typing import Tuple, Callable, Optional, Union
-
-import Adafruit_PCA9685
-from RpiMotorLib import RpiMotorLib
+from typing import Any, Tuple, Callable, Dict, Optional, Sequence, Union
 
 import attributes
 import sensing
 import util
+from control.estimation import GapEstimator
+from control.motion import A4988Stepper, Guard, Motion, MotionEngine, Profile, Stepper
+from control.steering import PwmTable, SteeringActuator
 
 _MIN_ANGLE: float = -20
 _MAX_ANGLE: float = 20
+_ANGLE_RESOLUTION: float = 0.1  # maximum number of degrees between two angles of the PWM table
+_PWM_CHANNEL: int = 0  # channel of the PWM controller the steering motor is connected to
+_MAX_STEERING_FREQUENCY: float = 50  # maximum number of writes to the steering motor per second
 
 _STEP_UNIT: int = 80  # number of steps to do at a time
 _DISTANCE_PER_STEP: float = 0.0125  # movement in mm per step TODO: check if value is correct
 _MOTOR_TYPE: str = "DRV8825"
+_START_SPEED: float = 100  # steps per second the driving motor starts from and stops at
+_MAX_SPEED: float = 400  # steps per second
+_ACCELERATION: float = 400  # steps per second²
+_MAX_SENSOR_AGE: float = 0.1  # maximum number of seconds since the distance used by the safety check was measured
+_CONFIDENCE: float = 2  # number of standard deviations the estimated gap must exceed the safety distance by
 
 
 class _Pins:
@@ -30,29 +38,38 @@ class Direction:
 
 
 _Direction: type = Union[Direction.FORWARD, Direction.BACKWARD]
-_DrivingMotor: type = RpiMotorLib.A4988Nema
-_SteeringMotor: type = Adafruit_PCA9685.PCA9685
+_SteeringMotor: type = Any  # Adafruit_PCA9685.PCA9685 (imported on first use)
+
+
+def _pca9685() -> _SteeringMotor:
+    """ Opens the I2C connection to the PWM controller of the steering motor.
+
+    Returns:
+        The PWM controller.
+    """
 
+    import Adafruit_PCA9685
 
-def _calculate_angle_pwm(angle: float) -> float:
-    """ Converts a steering angle to a pulse width modulation (PWM) value to address the steering motor accordingly.
+    # TODO: factor out magic numbers
+    steering_motor = Adafruit_PCA9685.PCA9685(address=0x40, busnum=1)
+    steering_motor.set_pwm_freq(50)
+    return steering_motor
 
-    Notes:
-        The parameters for the PWM approximation function defined as agent attributes must be in descending exponential
-        order (k0 * x^(n-1) + k1 * x^(n-2) + ... + kn).
 
-    Args:
-      angle: Angle in degrees to be converted to PWM.
+def _a4988() -> Stepper:
+    """ Sets up the GPIO pins of the stepper motor driver of the driving motor.
 
     Returns:
-        The PWM value for the steering angle.
+        The driving motor moving a single step at a time.
     """
 
-    # get steering parameters in reversed order -> k0, ..., kn
-    coefficients = reversed(attributes.STEERING_PARAMETERS)
+    from RpiMotorLib import RpiMotorLib
 
-    # sum up polynomial approximation of the pwm value -> k0 * x^0 + ... kn * x^(n-1)
-    return sum(coefficient * (angle ** exponent) for exponent, coefficient in enumerate(coefficients))
+    return A4988Stepper(RpiMotorLib.A4988Nema(_Pins.DIRECTION, _Pins.STEP, _Pins.MODE, _MOTOR_TYPE), RpiMotorLib.GPIO)
+
+
+STEERING_MOTOR: util.Backend[_SteeringMotor] = util.Backend("steering motor", _pca9685)
+DRIVING_MOTOR: util.Backend[Stepper] = util.Backend("driving motor", _a4988)
 
 
 @util.SingleUse
@@ -65,11 +82,19 @@ class Driver:
     def backward(self) -> _Mode:
         return self._mode(Direction.BACKWARD)
 
-    def __init__(self):
-        # TODO: factor out magic numbers
-        self.steering_motor: _SteeringMotor = Adafruit_PCA9685.PCA9685(address=0x40, busnum=1)
-        self.steering_motor.set_pwm_freq(50)
-        self._driving_motor: _DrivingMotor = RpiMotorLib.A4988Nema(_Pins.DIRECTION, _Pins.STEP, _Pins.MODE, _MOTOR_TYPE)
+    @property
+    def drive(self) -> Optional[_Mode]:
+        # latest driving mode (which may have been stopped already)
+        return self._current_mode
+
+    def __init__(self, resolution: float = _ANGLE_RESOLUTION, max_steering_frequency: float = _MAX_STEERING_FREQUENCY,
+                 max_speed: float = _MAX_SPEED, acceleration: float = _ACCELERATION):
+        # the motors are acquired on their first movement
+        self._pwm_table: PwmTable = PwmTable(_MIN_ANGLE, _MAX_ANGLE, resolution)
+        self.steering: SteeringActuator = SteeringActuator(STEERING_MOTOR, _PWM_CHANNEL, max_steering_frequency)
+        self._gaps: Dict[int, GapEstimator] = {Direction.FORWARD: GapEstimator(), Direction.BACKWARD: GapEstimator()}
+        self._engine: MotionEngine = MotionEngine(DRIVING_MOTOR, Profile(_START_SPEED, max_speed, acceleration))
+        self.odometer: util.Odometer = util.Odometer(_DISTANCE_PER_STEP)  # all drives
 
         self._current_mode: Optional[_Mode] = None
 
@@ -91,109 +116,192 @@ class Driver:
             self._current_mode.stop()
 
         # set and return new driving mode
-        self._current_mode = _Mode(self._driving_motor, direction)
+        self._current_mode = _Mode(self._engine, direction, self._gaps, self.odometer)
         return self._current_mode
 
     def steer(self, angle: float) -> None:
         """ Changes the steering angle of the vehicle.
 
-        The given angle is translated to a PWM value which is then transmitted to the steering motor. It is ensured that
-        the steering angle is within the defined boundaries.
+        The given angle is translated to a PWM tick which is then transmitted to the steering motor. It is ensured that
+        the steering angle is within the defined boundaries. Redundant writes are dropped and writes are rate-limited
+        (see ``SteeringActuator``).
 
         Args:
             angle: Desired steering angle in degrees.
         """
 
-        # ensure that angle is within boundaries
-        angle = max(_MIN_ANGLE, min(_MAX_ANGLE, angle))
+        # the PWM table is only recomputed if the steering parameters changed
+        self._pwm_table.update(attributes.STEERING_PARAMETERS)
+        self.steering.set(self._pwm_table.tick(angle))
+
+    def steer_many(self, angles: Sequence[float], interval: float) -> None:
+        """ Follows a trajectory of steering angles.
+
+        The PWM ticks of all angles are looked up at once before they are transmitted to the steering motor one after
+        another at a fixed interval.
+
+        Args:
+            angles: Desired steering angles in degrees.
+            interval: Number of seconds between two steering angles.
+        """
+
+        self._pwm_table.update(attributes.STEERING_PARAMETERS)
+        deadline = time.monotonic()
+
+        for tick in self._pwm_table.ticks_of(angles).tolist():
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
 
-        # calculate and set pwm value
-        pwm = _calculate_angle_pwm(angle)
-        self.steering_motor.set_pwm(0, 0, pwm)  # TODO: factor out magic numbers
+            self.steering.set(tick)
+            deadline += interval
 
 
-class _Mode:
-    def __init__(self, driving_motor: _DrivingMotor, direction: _Direction):
+class _Mode(Guard):
+    """ Driving mode moving in a single direction while maintaining the safety distance.
+
+    The mode's motions are executed by the driver's motion engine. The mode guards them by determining the clearance up
+    to the safety distance before every step unit and waits for new distance samples while the path is blocked.
+    """
+
+    def __init__(self, engine: MotionEngine, direction: _Direction, gaps: Dict[int, GapEstimator],
+                 odometer: util.Odometer):
         self._active: bool = True
-        self._driving_motor: _DrivingMotor = driving_motor
-        self._forward: direction = self._forward == Direction.FORWARD
+        self._engine: MotionEngine = engine
+        self._forward: bool = direction == Direction.FORWARD
+        self._gaps: Dict[int, GapEstimator] = gaps
+        self.odometer: util.Odometer = util.Odometer(_DISTANCE_PER_STEP, odometer)  # this drive only
+        self._motion: Optional[Motion] = None
+        self._measured: int = 0  # time the distance used by the latest safety check was measured
+
+    @property
+    def free_distance(self) -> float:
+        # distance in mm the mode may drive without undercutting the safety distance
+        return self.clearance(self._forward) * _DISTANCE_PER_STEP
+
+    @property
+    def _sensor(self) -> sensing.distance._UltrasonicSensor:
+        # ultrasonic distance sensor corresponding to the direction
+        return sensing.Distance.FRONT if self._forward else sensing.Distance.REAR
 
     # TODO: add option for maximum distance and maximum duration
-    def do_while(self, condition: Callable[[], bool]) -> None:
+    def do_while(self, condition: Callable[[], bool], block: bool = True) -> Motion:
         """ Drives as long as the mode is active and the given condition is met.
 
         Args:
             condition: Function defining the condition.
+            block: Boolean whether to return only once the motion is done.
+
+        Returns:
+            The motion which can be waited for.
         """
 
-        while self._active and condition():
-            self._go(_STEP_UNIT)
+        return self._drive(Motion(self._forward, condition=condition, guard=self, unit=_STEP_UNIT), block)
 
-    def do_for(self, distance: float) -> None:
+    def do_for(self, distance: float, block: bool = True) -> Motion:
         """ Drives a given distance.
 
         Args:
             distance: Distance to drive (in mm).
+            block: Boolean whether to return only once the motion is done.
+
+        Returns:
+            The motion which can be waited for.
         """
 
-        # calculate number of steps corresponding to the distance.
-        steps = int(round(_STEP_UNIT * distance, 0))
-        self._go(steps)
+        # calculate number of steps corresponding to the distance
+        steps = int(round(distance / _DISTANCE_PER_STEP))
+        return self._drive(Motion(self._forward, steps, guard=self, unit=_STEP_UNIT), block)
 
-    def _go(self, steps: int) -> None:
-        """ Addresses the driving motor to drive a given number of steps.
+    def _drive(self, motion: Motion, block: bool) -> Motion:
+        """ Lets the motion engine execute a motion of the mode.
 
         Args:
-            steps: Number of steps to drive.
+            motion: Motion to be executed.
+            block: Boolean whether to wait for the motion to be done.
+
+        Returns:
+            The motion.
         """
 
-        # divide steps into single step units and execute them separately
-        while self._active and steps >= _STEP_UNIT:
-            # if possible, drive for a single step unit and decrement the remaining number of steps accordingly
-            if self._movement_possible(_STEP_UNIT):
-                self._driving_motor.motor_go(clockwise=self._forward, steps=_STEP_UNIT)
-                steps -= _STEP_UNIT
-            # otherwise wait for the distances to change
-            else:
-                time.sleep(1)
+        self._motion = motion
+
+        # the mode may have been stopped in the meantime
+        if not self._active:
+            motion.cancel()
+
+        self._engine.submit(motion)
+
+        if block:
+            motion.wait()
 
-        # if possible, drive remaining number of steps
-        if self._movement_possible(steps):
-            self._driving_motor.motor_go(clockwise=self._forward, steps=steps)
+        return motion
 
-    def _movement_possible(self, steps: int) -> bool:
-        """ Determines whether the driver may move by a given number of steps.
+    def clearance(self, forward: bool) -> float:
+        """ Determines the number of steps the driver may move before it must stand still.
 
-        This is exactly the case if the mode is currently active and the movement would not lead to undercutting the
-        minimum safety distance which must always be maintained. The safety distance is checked for the direction of the
-        movement (either front or rear).
+        The movement must not lead to undercutting the minimum safety distance which must always be maintained. The
+        safety distance is checked for the direction of the movement (either front or rear) against the estimated gap
+        which fuses the distance measurements with the movements since then. The estimate's uncertainty is accounted
+        for. As motions decelerate towards the end of the clearance, the driver stops before the safety distance.
 
         Args:
-            steps: Number of steps to drive.
+            forward: Boolean whether the movement is forward.
 
         Returns:
-            Whether the driver may drive the given number of steps.
+            The number of steps the driver may drive (zero if the mode is no longer active).
         """
 
         # if the mode is no longer active, no movement is allowed as to prevent simultaneous movements
         if not self._active:
-            return False
+            return 0
+
+        # get gap estimate corresponding to the direction
+        gap = self._gaps[Direction.FORWARD if forward else Direction.BACKWARD]
 
-        # get ultrasonic distance sensor corresponding to the direction
-        sensor = sensing.Distance.FRONT if self._forward else sensing.Distance.REAR
+        # correct the estimate by a fresh distance (waiting for a new sample if necessary)
+        reading = self._sensor.read(_MAX_SENSOR_AGE)
+        gap.measure(reading.value, reading.timestamp)
+        estimate = gap.estimate(time.monotonic_ns())
+        self._measured = reading.timestamp
 
-        # predict the distance for after driving for a given number of steps
-        predicted_distance = sensor.value - _DISTANCE_PER_STEP * steps
+        # free distance until the safety distance would be undercut
+        free_distance = estimate.lower_bound(_CONFIDENCE) - util.const.Driving.SAFETY_DISTANCE
 
-        # return whether safety distances can be maintained
-        return predicted_distance >= util.const.Driving.SAFETY_DISTANCE
+        return max(0.0, free_distance / _DISTANCE_PER_STEP)
+
+    def wait(self, timeout: float) -> None:
+        """ Waits for a distance sample newer than the one the latest safety check was based on.
+
+        Args:
+            timeout: Maximum number of seconds to wait.
+        """
+
+        self._sensor.wait(self._measured, timeout)
+
+    def moved(self, forward: bool, steps: int) -> None:
+        """ Records driven steps and predicts the gaps in front and behind accordingly.
+
+        Args:
+            forward: Boolean whether the movement was forward.
+            steps: Number of steps driven.
+        """
+
+        self.odometer.record(steps if forward else -steps)
+
+        # the gap in the direction of the movement shrinks while the gap in the opposite direction grows
+        distance = _DISTANCE_PER_STEP * steps if forward else -_DISTANCE_PER_STEP * steps
+        now = time.monotonic_ns()
+        self._gaps[Direction.FORWARD].move(distance, now)
+        self._gaps[Direction.BACKWARD].move(-distance, now)
 
     def stop(self) -> None:
         """ Deactivates the mode by flagging it as inactive.
 
-        It is possible that current movements stop only after a short delay as they cannot be aborted directly. Instead,
-        further movements are no longer executed. For this reason every movement is divided into short movement
-        sequences.
+        The current motion is cancelled and stops after the current step. Further movements are no longer executed.
         """
 
         self._active = False
+
+        if self._motion is not None:
+            self._motion.cancel()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Tuple
+
+_MEASUREMENT_VARIANCE: float = 100  # variance of ultrasonic measurements in mm²
+_PROCESS_VARIANCE: float = 2500  # growth of the variance per second due to movements of other vehicles in mm²/s
+_SLIP_VARIANCE: float = 0.05  # growth of the variance per mm driven due to imprecise steps in mm²/mm
+
+
+class Estimate(NamedTuple):
+    gap: float  # estimated free distance in mm
+    deviation: float  # standard deviation of the estimate in mm
+
+    def lower_bound(self, confidence: float) -> float:
+        """ Gets the gap that is undercut with a low probability only.
+
+        Args:
+            confidence: Number of standard deviations below the estimated gap.
+
+        Returns:
+            The lower bound of the gap in mm.
+        """
+
+        return self.gap - confidence * self.deviation
+
+
+class GapEstimator:
+    """ One-dimensional Kalman filter estimating the free distance in a single direction.
+
+    The estimate is predicted by the distances the vehicle drives and corrected by ultrasonic measurements. As
+    measurements are taken before they are fused, the movements after a measurement are remembered so that each
+    measurement is compared to the estimate at the time it was taken. The uncertainty of the estimate grows with the
+    distance driven (slip) and with time (other vehicles may move).
+
+    Notes:
+        All timestamps are monotonic times in ns.
+    """
+
+    def __init__(self, measurement_variance: float = _MEASUREMENT_VARIANCE,
+                 process_variance: float = _PROCESS_VARIANCE, slip_variance: float = _SLIP_VARIANCE):
+        self.measurement_variance: float = measurement_variance
+        self.process_variance: float = process_variance
+        self.slip_variance: float = slip_variance
+
+        self._gap: Optional[float] = None  # estimated gap at the latest time (no estimate without measurements)
+        self._variance: float = math.inf
+        self._measured: int = 0  # timestamp of the latest fused measurement
+        self._moves: Deque[Tuple[int, float]] = deque()  # timestamp and distance of the moves since the measurement
+
+    def move(self, distance: float, timestamp: int) -> None:
+        """ Predicts the gap after driving towards (positive distance) or away from (negative distance) the obstacle.
+
+        Args:
+            distance: Driven distance in mm.
+            timestamp: Time the movement finished.
+        """
+
+        if self._gap is None:
+            return
+
+        self._gap -= distance
+        self._variance += self.slip_variance * abs(distance)
+        self._moves.append((timestamp, distance))
+
+    def measure(self, gap: float, timestamp: int) -> None:
+        """ Corrects the estimate by a measurement unless a newer measurement has been fused already.
+
+        Args:
+            gap: Measured gap in mm.
+            timestamp: Time the measurement was taken.
+        """
+
+        if self._gap is not None and timestamp <= self._measured:
+            return
+
+        # the first measurement initializes the estimate
+        if self._gap is None:
+            self._gap, self._variance, self._measured = gap, self.measurement_variance, timestamp
+            return
+
+        # forget moves before the measurement -> the remaining moves happened after the measurement
+        while self._moves and self._moves[0][0] <= timestamp:
+            self._moves.popleft()
+
+        moved = sum(distance for _, distance in self._moves)
+
+        # predict the gap at the time of the measurement and correct it
+        prior = self._gap + moved
+        variance = self._variance + self.process_variance * (timestamp - self._measured) / 1e9
+        gain = variance / (variance + self.measurement_variance)
+
+        self._gap = prior + gain * (gap - prior) - moved
+        self._variance = (1 - gain) * variance
+        self._measured = timestamp
+
+    def estimate(self, timestamp: int) -> Optional[Estimate]:
+        """ Gets the current estimate of the gap.
+
+        Args:
+            timestamp: Current time.
+
+        Returns:
+            The estimated gap and its uncertainty or ``None`` if there have not been any measurements yet.
+        """
+
+        if self._gap is None:
+            return None
+
+        variance = self._variance + self.process_variance * max(0, timestamp - self._measured) / 1e9
+        return Estimate(self._gap, math.sqrt(variance))
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import math
+import queue
+import time
+import traceback
+from abc import ABC, abstractmethod
+from threading import Event, Lock
+from typing import Any, Callable, List, Optional
+
+import util
+
+_UNIT: int = 80  # default number of steps between two safety checks
+_BLOCKED_TIMEOUT: float = 0.1  # maximum number of seconds a blocked motion waits before checking again
+_START_SPEED: float = 100  # steps per second the motor can start from and stop at without losing steps
+
+
+class Stepper(ABC):
+    """ Base class for stepper motors moving a single step at a time. """
+
+    @abstractmethod
+    def step(self, forward: bool, interval: float) -> None:
+        """ Moves the motor by a single step and returns once the step is done.
+
+        Args:
+            forward: Boolean whether to move forward (clockwise).
+            interval: Number of seconds the step takes (the inverse of the speed).
+        """
+
+
+class A4988Stepper(Stepper):
+    """ Stepper motor addressed by an A4988 (or DRV8825) driver of ``RpiMotorLib``.
+
+    The driver's pins are set up once. Afterwards, every step only toggles the STEP pin (and the DIR pin if the
+    direction changed) instead of letting the driver set up its pins again for every single step.
+    """
+
+    def __init__(self, driver: Any, gpio: Any, step_type: str = "Full"):
+        self.driver: Any = driver  # RpiMotorLib.A4988Nema
+        self._gpio: Any = gpio  # RPi.GPIO (as used by RpiMotorLib)
+        self._forward: Optional[bool] = None  # direction the DIR pin is set to
+
+        gpio.setup(driver.direction_pin, gpio.OUT)
+        gpio.setup(driver.step_pin, gpio.OUT)
+
+        # set the microstep resolution (unless it is hardwired)
+        if driver.mode_pins:
+            gpio.setup(driver.mode_pins, gpio.OUT)
+            driver.resolution_set(step_type)
+
+    def step(self, forward: bool, interval: float) -> None:
+        if forward != self._forward:
+            self._gpio.output(self.driver.direction_pin, forward)
+            self._forward = forward
+
+        # the step pin is held high and low for half of the interval each
+        self._gpio.output(self.driver.step_pin, True)
+        time.sleep(interval / 2)
+        self._gpio.output(self.driver.step_pin, False)
+        time.sleep(interval / 2)
+
+
+class SimulatedStepper(Stepper):
+    """ Simulated stepper motor keeping track of its position, e.g. for tests, simulations and benchmarks.
+
+    The stepper either takes as long as a real motor or keeps track of the time a real motor would have taken only.
+    """
+
+    def __init__(self, realtime: bool = True):
+        self.realtime: bool = realtime
+        self.position: int = 0  # number of steps forward from the initial position
+        self.elapsed: float = 0  # number of seconds spent stepping
+        self.intervals: List[float] = []  # intervals of all steps
+
+    def step(self, forward: bool, interval: float) -> None:
+        if self.realtime:
+            time.sleep(interval)
+
+        self.position += 1 if forward else -1
+        self.elapsed += interval
+        self.intervals.append(interval)
+
+
+class Profile:
+    """ Trapezoidal velocity profile accelerating from and decelerating to the start speed of the motor.
+
+    The speed of every step is planned from the speed of the previous step and the number of steps until the motor
+    must stand still, so that the motor accelerates up to the maximum speed and decelerates early enough to stop at the
+    start speed. Without a maximum speed exceeding the start speed, the profile is constant.
+    """
+
+    def __init__(self, start_speed: float = _START_SPEED, max_speed: Optional[float] = None, acceleration: float = 0):
+        max_speed = start_speed if max_speed is None else max_speed
+        assert 0 < start_speed <= max_speed, f"The speeds must satisfy 0 < {start_speed} <= {max_speed}."
+        assert acceleration > 0 or start_speed == max_speed, "A profile with varying speeds must accelerate."
+
+        self.start_speed: float = start_speed  # steps per second
+        self.max_speed: float = max_speed  # steps per second
+        self.acceleration: float = acceleration  # steps per second²
+
+    def speed(self, speed: float, remaining: float) -> float:
+        """ Plans the speed of the next step.
+
+        Args:
+            speed: Speed of the previous step (zero if the motor stands still).
+            remaining: Number of steps (including the next one) until the motor must stand still.
+
+        Returns:
+            The speed of the next step in steps per second.
+        """
+
+        # accelerate by at most the acceleration over one step and decelerate in time to stop at the start speed
+        accelerated = math.sqrt(speed * speed + 2 * self.acceleration)
+        decelerated = math.sqrt(self.start_speed ** 2 + 2 * self.acceleration * max(0.0, remaining - 1))
+
+        return max(self.start_speed, min(self.max_speed, accelerated, decelerated))
+
+    def duration(self, steps: int) -> float:
+        """ Determines the number of seconds moving a number of steps from standstill to standstill takes.
+
+        Args:
+            steps: Number of steps to move.
+
+        Returns:
+            The duration in seconds.
+        """
+
+        speed = duration = 0.0
+        for step in range(steps):
+            speed = self.speed(speed, steps - step)
+            duration += 1 / speed
+
+        return duration
+
+
+class Guard:
+    """ Safety checks of a motion which allow every movement unless they are overridden. """
+
+    def clearance(self, forward: bool) -> float:
+        """ Determines the number of steps the motion may move before it must stand still.
+
+        Args:
+            forward: Boolean whether the motion moves forward.
+
+        Returns:
+            The number of steps which may be moved.
+        """
+
+        return math.inf
+
+    def wait(self, timeout: float) -> None:
+        """ Waits for a change that may allow a blocked movement (e.g. a new distance sample).
+
+        Args:
+            timeout: Maximum number of seconds to wait.
+        """
+
+        time.sleep(timeout)
+
+    def moved(self, forward: bool, steps: int) -> None:
+        """ Is called after the motion moved.
+
+        Args:
+            forward: Boolean whether the motion moved forward.
+            steps: Number of steps moved.
+        """
+
+
+class Motion:
+    """ Movement executed step by step by a motion engine.
+
+    The motion moves in units of steps as long as its condition is met and until it has moved the given number of steps
+    (if any). Before every unit, the guard determines the clearance and the unit is shortened to the clearance. The
+    speed of every step follows the profile which decelerates towards the end of the clearance or of the motion. A
+    motion can be cancelled at any time and decelerates to the start speed of the profile after the current step.
+    """
+
+    def __init__(self, forward: bool, steps: Optional[int] = None, condition: Optional[Callable[[], bool]] = None,
+                 guard: Optional[Guard] = None, unit: int = _UNIT, profile: Optional[Profile] = None):
+        assert steps is None or steps >= 0, f"The number of steps {steps} must not be negative."
+        assert unit > 0, f"The unit {unit} must be positive."
+
+        self.forward: bool = forward
+        self.remaining: Optional[int] = steps  # number of steps left to move (unbounded if ``None``)
+        self.condition: Callable[[], bool] = (lambda: True) if condition is None else condition
+        self.guard: Guard = Guard() if guard is None else guard
+        self.unit: int = unit
+        self.profile: Optional[Profile] = profile  # the engine's profile is used if there is none
+        self.steps: int = 0  # number of steps moved
+        self._cancelled: bool = False
+        self._done: Event = Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """ Cancels the motion which decelerates after the current step (or stops before its first step if queued). """
+
+        self._cancelled = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """ Waits for the motion to be done (either finished or cancelled).
+
+        Args:
+            timeout: Maximum number of seconds to wait (waits indefinitely if ``None``).
+
+        Returns:
+            Boolean whether the motion is done.
+        """
+
+        return self._done.wait(timeout)
+
+    def _next_unit(self) -> int:
+        # number of steps to move next (zero if the motion is finished)
+        if self._cancelled or self.remaining == 0 or not self.condition():
+            return 0
+
+        return self.unit if self.remaining is None else min(self.unit, self.remaining)
+
+    def _advance(self, steps: int) -> None:
+        self.steps += steps
+
+        if self.remaining is not None:
+            self.remaining -= steps
+
+
+class MotionEngine:
+    """ Executes motions one after another on a stepper motor in a dedicated thread.
+
+    Motions are queued and generate the motor's steps one at a time, so that cancelling a motion stops the motor after
+    the current step. Blocked motions wait for their guard to signal a change instead of sleeping for a fixed time.
+    """
+
+    def __init__(self, stepper: util.Backend[Stepper], profile: Optional[Profile] = None,
+                 blocked_timeout: float = _BLOCKED_TIMEOUT):
+        self.profile: Profile = Profile() if profile is None else profile
+        self.blocked_timeout: float = blocked_timeout
+        self._stepper: util.Backend[Stepper] = stepper
+        self._queue: queue.SimpleQueue[Motion] = queue.SimpleQueue()
+        self._running: bool = False
+        self._lock: Lock = Lock()
+
+    def submit(self, motion: Motion) -> Motion:
+        """ Queues a motion and starts the engine unless it is already running.
+
+        Args:
+            motion: Motion to be executed after the motions queued before.
+
+        Returns:
+            The motion.
+        """
+
+        self._queue.put(motion)
+
+        # avoid the lock once the engine is running
+        if not self._running:
+            with self._lock:
+                if not self._running:
+                    self._running = True
+                    self._run()
+
+        return motion
+
+    @util.threaded(util.const.ThreadNames.MOTION)
+    def _run(self) -> None:
+        """ Executes the queued motions.
+
+        Notes:
+            This method runs concurrently.
+        """
+
+        while True:
+            motion = self._queue.get()
+
+            # a failing motion (e.g. due to a failing guard) must not stop the engine
+            try:
+                self._execute(motion)
+            except Exception:
+                traceback.print_exc()
+
+            motion._done.set()
+
+    def _execute(self, motion: Motion) -> None:
+        """ Moves a motion unit by unit as long as it is neither finished nor cancelled.
+
+        Args:
+            motion: Motion to be executed.
+        """
+
+        stepper = self._stepper.get()
+        profile = self.profile if motion.profile is None else motion.profile
+        speed = 0.0
+
+        while (unit := motion._next_unit()) > 0:
+            clearance = motion.guard.clearance(motion.forward)
+
+            # wait for a change if not even a single step is possible and check again
+            if clearance < 1:
+                speed = 0.0
+                motion.guard.wait(self.blocked_timeout)
+                continue
+
+            # the motor must stand still at the end of the clearance or of the motion, whichever comes first
+            end = clearance if motion.remaining is None else min(clearance, motion.remaining)
+
+            # move the unit as far as the clearance allows checking for cancellations before every step
+            limit = unit if clearance >= unit else int(clearance)
+            steps = 0
+            while steps < limit and not motion.cancelled:
+                speed = profile.speed(speed, end - steps)
+                stepper.step(motion.forward, 1 / speed)
+                steps += 1
+
+            motion._advance(steps)
+            motion.guard.moved(motion.forward, steps)
+
+        # a cancelled motion or a motion whose condition is no longer met may still be moving faster than the motor can
+        # stop, so it decelerates by one step's worth of acceleration per step as far as the clearance allows
+        if speed > profile.start_speed:
+            limit = motion.guard.clearance(motion.forward)
+            steps = 0
+
+            while speed > profile.start_speed and steps + 1 <= limit:
+                speed = profile.speed(speed, (speed ** 2 - profile.start_speed ** 2) / (2 * profile.acceleration))
+                stepper.step(motion.forward, 1 / speed)
+                steps += 1
+
+            motion._advance(steps)
+            motion.guard.moved(motion.forward, steps)
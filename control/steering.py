@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import math
+import time
+from threading import Condition
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import util
+
+_RESOLUTION: float = 0.1  # maximum number of degrees between two angles of the PWM table
+_MAX_FREQUENCY: float = 50  # maximum number of writes per second (the PWM period of the steering servo)
+
+
+class PwmTable:
+    """ Lookup table of the integer PWM ticks of the steering motor for steering angles within given boundaries.
+
+    The ticks are computed at once from the polynomial approximation of the PWM value and only recomputed if the
+    steering parameters change. Angles between two entries of the table are interpolated linearly.
+
+    Notes:
+        The steering parameters must be in descending exponential order (k0 * x^(n-1) + k1 * x^(n-2) + ... + kn).
+    """
+
+    def __init__(self, min_angle: float, max_angle: float, resolution: float = _RESOLUTION):
+        assert min_angle < max_angle, f"The minimum angle {min_angle} must be less than the maximum angle {max_angle}."
+        assert resolution > 0, f"The resolution {resolution} must be positive."
+
+        self.min_angle: float = min_angle
+        self.max_angle: float = max_angle
+        self.resolution: float = resolution
+
+        # equally spaced angles of the table (the spacing does not exceed the resolution)
+        self.angles: np.ndarray = np.linspace(min_angle, max_angle, math.ceil((max_angle - min_angle) / resolution) + 1)
+        self.ticks: np.ndarray = np.zeros(len(self.angles), dtype=np.int64)
+        self._scale: float = (len(self.angles) - 1) / (max_angle - min_angle)  # table entries per degree
+        self._ticks: List[int] = []  # list of the ticks as indexing lists is faster than indexing arrays
+        self._parameters: Optional[Tuple[float, ...]] = None
+
+    def update(self, parameters: Sequence[float]) -> bool:
+        """ Recomputes the table if the steering parameters changed.
+
+        Args:
+            parameters: Coefficients of the polynomial approximation of the PWM value.
+
+        Returns:
+            Whether the table was recomputed.
+        """
+
+        parameters = tuple(parameters)
+        if parameters == self._parameters:
+            return False
+
+        self.ticks = np.rint(np.polyval(parameters, self.angles)).astype(np.int64)
+        self._ticks = self.ticks.tolist()
+        self._parameters = parameters
+
+        return True
+
+    def tick(self, angle: float) -> int:
+        """ Gets the PWM tick of a steering angle which is clamped to the boundaries.
+
+        Args:
+            angle: Steering angle in degrees.
+
+        Returns:
+            The interpolated PWM tick.
+        """
+
+        assert self._parameters is not None, "The PWM table has not been computed yet."
+
+        ticks = self._ticks
+
+        # clamp the angle (conditional expressions are faster than min and max)
+        angle = self.min_angle if angle < self.min_angle else self.max_angle if angle > self.max_angle else angle
+
+        # position of the angle within the table (the maximum angle is interpolated within the last interval)
+        position = (angle - self.min_angle) * self._scale
+        index = int(position)
+        if index == len(ticks) - 1:
+            index -= 1
+
+        # interpolate between the neighbouring entries of the table
+        return round(ticks[index] + (ticks[index + 1] - ticks[index]) * (position - index))
+
+    def ticks_of(self, angles: Sequence[float]) -> np.ndarray:
+        """ Gets the PWM ticks of several steering angles at once (e.g. of a trajectory).
+
+        Args:
+            angles: Steering angles in degrees which are clamped to the boundaries.
+
+        Returns:
+            The interpolated PWM ticks.
+        """
+
+        assert self._parameters is not None, "The PWM table has not been computed yet."
+
+        return np.rint(np.interp(np.asarray(angles, dtype=float), self.angles, self.ticks)).astype(np.int64)
+
+
+class SteeringActuator:
+    """ Writes PWM ticks to a channel of the steering motor's PWM controller without saturating the I2C bus.
+
+    Writes that would not change the tick of the channel are dropped and writes are limited to a maximum frequency.
+    Targets set while the rate limit does not allow writing are not dropped but the latest of them is written as soon
+    as the rate limit allows it. Every target is either written (``writes``) or suppressed (``suppressed``), either
+    because it would not have changed the tick or because a newer target superseded it.
+    """
+
+    def __init__(self, motor: util.Backend[Any], channel: int, max_frequency: float = _MAX_FREQUENCY):
+        assert max_frequency > 0, f"The maximum frequency {max_frequency} must be positive."
+
+        self.writes: int = 0
+        self.suppressed: int = 0
+        self._motor: util.Backend[Any] = motor
+        self._channel: int = channel
+        self._interval: float = 1 / max_frequency  # minimum number of seconds between two writes
+        self._condition: Condition = Condition()
+        self._written: Optional[int] = None  # tick of the latest write
+        self._allowed: float = 0  # monotonic time from which on the next write is allowed
+        self._target: Optional[int] = None  # latest target that has not been written yet
+        self._flushing: bool = False  # whether the thread writing pending targets has been started
+
+    @property
+    def tick(self) -> Optional[int]:
+        return self._written
+
+    def set(self, tick: int) -> None:
+        """ Sets the tick of the channel immediately or as soon as the rate limit allows it.
+
+        Args:
+            tick: PWM tick the channel is set to.
+        """
+
+        with self._condition:
+            # a pending target is superseded by the new one
+            if self._target is not None:
+                self.suppressed += 1
+                self._target = tick
+            elif time.monotonic() < self._allowed:
+                self._target = tick
+
+                # start the thread writing pending targets on the first one and wake it up afterwards
+                if not self._flushing:
+                    self._flushing = True
+                    self._flush()
+
+                self._condition.notify_all()
+            else:
+                self._write(tick)
+
+    def _write(self, tick: int) -> None:
+        """ Writes a tick to the channel unless the channel already has the tick.
+
+        Notes:
+            The condition must be acquired by the caller, so that writes are serialized.
+
+        Args:
+            tick: PWM tick the channel is set to.
+        """
+
+        if tick == self._written:
+            self.suppressed += 1
+            return
+
+        self._motor.get().set_pwm(self._channel, 0, tick)
+        self._written = tick
+        self._allowed = time.monotonic() + self._interval
+        self.writes += 1
+
+    @util.threaded(util.const.ThreadNames.STEER)
+    def _flush(self) -> None:
+        """ Continuously writes the latest pending target as soon as the rate limit allows it.
+
+        Notes:
+            This method runs in its own thread.
+        """
+
+        with self._condition:
+            while True:
+                # wait for the next pending target and for the rate limit
+                self._condition.wait_for(lambda: self._target is not None)
+
+                while (delay := self._allowed - time.monotonic()) > 0:
+                    self._condition.wait(delay)
+
+                tick, self._target = self._target, None
+                self._write(tick)
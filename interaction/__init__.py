@@ -1,3 +1,5 @@
+from interaction.routing import Router
+from interaction.message import Message, MessageContent, Callback, ContentCodec, WireFormat, register_codec
+from interaction.transport import Transport, MqttTransport, AsyncioMqttTransport, LoopbackBus, LoopbackTransport
 from interaction.communication import Communication
 from interaction.formation import Formation
-from interaction.message import Message, MessageContent, Callback
@@ -1,28 +1,78 @@
 from __future__ import annotations
 
+import asyncio
+import queue
+import time
 from datetime import datetime
-from typing import Dict
-
-import paho.mqtt.client as mqtt
-from paho.mqtt import publish
+from threading import Lock, Semaphore
+from typing import Any, Dict, Optional, Set, Tuple, Union
 
 import attributes
 import interaction
 import util
 
-_BROKER_URL: str = "test.mosquitto.org"
-_BROKER_PORT: int = 1883
 _TIMEOUT: int = 15
+_OUTBOX_SIZE: int = 256  # maximum number of messages waiting to be published
+_IN_FLIGHT: int = 64  # maximum number of published messages waiting for an acknowledgement
+_DISPATCH_WORKERS: int = 2  # number of threads handling received messages
+_DISPATCH_CAPACITY: int = 128  # maximum number of received messages waiting to be handled per thread
+_DISPATCH_POLICY: str = util.OverflowPolicy.DROP_OLDEST
+
+
+class _WireFormats:
+    def __init__(self):
+        self.formats: Dict[str, str] = {}  # topic filter -> wire format used to publish messages of matching topics
+        self._router: interaction.Router[str] = interaction.Router()
+        self._cache: Dict[str, str] = {}  # topic -> wire format
+
+    def use(self, topic: str, wire_format: str) -> None:
+        """ Sets the wire format messages of a given topic are published in.
+
+        Args:
+            topic: Topic (filter) the format applies to.
+            wire_format: Either ``WireFormat.JSON`` or ``WireFormat.BINARY``.
+        """
+
+        # replace the format previously set for the topic
+        if topic in self.formats:
+            self._router.remove(topic, self.formats[topic])
 
-_TOPIC_PREFIX: str = "parknet-21/communication/"
+        self.formats[topic] = wire_format
+        self._router.add(topic, wire_format)
+        self._cache.clear()
+
+    def encode(self, message: interaction.Message) -> Union[str, bytes]:
+        """ Encodes a message in the wire format set for its topic.
+
+        Topics default to JSON unless another format was set via ``use(...)``.
+
+        Args:
+            message: Message to be encoded.
+
+        Returns:
+            The encoded message.
+        """
+
+        if (wire_format := self._cache.get(message.topic)) is None:
+            formats = self._router.match(message.topic)
+            wire_format = self._cache[message.topic] = formats[0] if formats else interaction.WireFormat.JSON
+
+        if wire_format == interaction.WireFormat.BINARY:
+            return message.encode_binary()
+
+        return message.encode()
 
 
 class _Subscription:
-    def __init__(self, callback: interaction.Callback, receive_own: bool):
+    def __init__(self, connection: _Connection, topic: str, callback: interaction.Callback, receive_own: bool,
+                 coalesce: bool):
+        self.connection: _Connection = connection
+        self.topic: str = topic
         self.callback: interaction.Callback = callback
         self.receive_own: bool = receive_own
+        self.coalesce: bool = coalesce
 
-    def handle(self, message: interaction.Message) -> None:
+    def handle(self, message: interaction.Message) -> Any:
         """ Calls the callback function if the message applies to the subscription.
 
         The message applies to the subscription exactly if it was sent by another agent or if the subscription
@@ -31,100 +81,329 @@ class _Subscription:
 
         Args:
             message: Received message linked to the subscription.
+
+        Returns:
+            The result of the callback function (e.g. a coroutine for asynchronous callbacks) or ``None`` if the
+            message does not apply to the subscription.
         """
 
         # check if message was sent by another agent or subscription applies to the agent's own messages
-        if message.sender != attributes.SIGNATURE or self.receive_own:
-            self.callback(message)
+        if message.sender != self.connection.signature or self.receive_own:
+            return self.callback(message)
 
+        return None
 
-@util.Singleton
-class _Connection:
-    def __init__(self):
-        self.subscriptions: Dict[str, _Subscription] = {}
-        self.client: mqtt.Client = mqtt.Client()
-        self.client.on_message = self.react
-        self.client.connect(_BROKER_URL, _BROKER_PORT, _TIMEOUT)
+    def cancel(self) -> None:
+        """ Removes the subscription from the connection so that its callback is no longer triggered. """
+
+        self.connection.unsubscribe(self)
 
-        # start listening for messages
-        self.client.loop_start()
 
-    def subscribe(self, topic: str, callback: interaction.Callback, receive_own: bool) -> None:
+@util.Singleton
+class _Connection:
+    """ Connection of the main agent exchanging messages via a transport.
+
+    By default, messages are published by a publishing thread from a bounded outbox and callbacks are executed by a
+    worker pool. Asynchronous connections instead publish and execute callbacks on the event loop running when they are
+    created. Callbacks of asynchronous connections may also be coroutine functions. As there are no threads per
+    connection, a single event loop can host many (simulated) agents cheaply.
+    """
+
+    def __init__(self, transport: Optional[interaction.Transport] = None, asynchronous: bool = False):
+        self.signature: str = attributes.SIGNATURE
+        self.router: interaction.Router[_Subscription] = interaction.Router()
+        self._routing_lock: Lock = Lock()
+        self.formats: _WireFormats = _WireFormats()
+        self.publish_latency: util.LatencyStatistics = util.LatencyStatistics()
+        self.dropped: int = 0
+
+        self._pending: Dict[int, float] = {}  # message id -> time the message was queued
+        self._acknowledged: Set[int] = set()  # message ids acknowledged before they were registered as pending
+        self._pending_lock: Lock = Lock()
+
+        # asynchronous connections need neither an outbox, nor a publishing thread, nor a worker pool
+        self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop() if asynchronous else None
+        self._tasks: Set[asyncio.Task] = set()  # running asynchronous callbacks
+        self.dispatcher: Optional[util.WorkerPool] = None
+        self._outbox: Optional[queue.Queue[Tuple[interaction.Message, float]]] = None
+        self._in_flight: Semaphore = Semaphore(_IN_FLIGHT)  # released whenever a message was acknowledged
+
+        if transport is None:
+            transport = interaction.AsyncioMqttTransport() if asynchronous else interaction.MqttTransport()
+
+        self.transport: interaction.Transport = transport
+        self.transport.on_message = self.react
+        self.transport.on_acknowledge = self._confirm
+
+        # messages may be received as soon as the transport is connected, so they must be dispatchable by then
+        if not asynchronous:
+            self.dispatcher = util.WorkerPool(util.const.ThreadNames.DISPATCH, _DISPATCH_WORKERS, _DISPATCH_CAPACITY,
+                                              _DISPATCH_POLICY)
+            self._outbox = queue.Queue(maxsize=_OUTBOX_SIZE)
+
+        # start listening for messages and publishing queued messages
+        self.transport.connect()
+
+        if not asynchronous:
+            self._publish()
+
+    @property
+    def asynchronous(self) -> bool:
+        return self._loop is not None
+
+    def subscribe(self, topic: str, callback: interaction.Callback, receive_own: bool,
+                  coalesce: bool) -> _Subscription:
         """ Adds a communication subscription for a given topic.
 
-        As there can only be one subscription per topic, prior subscriptions for the same topic are overwritten.
+        There can be any number of subscriptions per topic. The topic may contain the MQTT wildcards ``+`` (matching a
+        single topic level) and ``#`` (matching any number of trailing topic levels).
 
         Args:
-            topic: Topic to subscribe to.
+            topic: Topic (filter) to subscribe to.
             callback: Callback function to be triggered when a message for the subscribed topic is received.
             receive_own: Boolean whether the sender shall receive his own messages.
+            coalesce: Boolean whether only the latest pending message per sender needs to be handled.
+
+        Returns:
+            The subscription which can be cancelled later on.
         """
 
-        # _add subscription
-        self.subscriptions[topic] = _Subscription(callback, receive_own)
+        subscription = _Subscription(self, topic, callback, receive_own, coalesce)
 
-        # subscribe to communication broker
-        self.client.subscribe(_TOPIC_PREFIX + topic, qos=1)
+        # _add subscription and subscribe to the communication broker if it is the first one for the topic
+        with self._routing_lock:
+            if self.router.add(topic, subscription):
+                self.transport.subscribe(topic)
 
-    @staticmethod
-    def send(message: interaction.Message) -> None:
-        """ Publishes an encoded message.
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription) -> None:
+        """ Removes a communication subscription.
+
+        Args:
+            subscription: Subscription to be removed.
+        """
+
+        # remove the subscription and unsubscribe from the communication broker if it was the last one for the topic
+        with self._routing_lock:
+            if self.router.remove(subscription.topic, subscription):
+                self.transport.unsubscribe(subscription.topic)
+
+    def send(self, message: interaction.Message, block: bool = False) -> bool:
+        """ Queues a message to be published over the persistent broker connection.
+
+        Sending does not wait for the broker. The message is put into a bounded outbox which is drained by the
+        publishing thread as long as the number of messages waiting for an acknowledgement is limited. If the outbox is
+        full, the message is rejected unless ``block`` is set in which case the caller waits (at most ``_TIMEOUT``
+        seconds) for free space in the outbox.
+        Asynchronous connections pass the message to the transport right away, which never waits for the broker
+        either but rejects the message if too many messages are waiting to be published.
 
         Args:
             message: Message to be published.
+            block: Boolean whether to wait for free space in the outbox if it is full.
+
+        Returns:
+            Boolean whether the message was queued for publishing.
         """
 
-        # encode message
-        json_message = message.encode()
+        if self.asynchronous:
+            return self._transmit(message, time.perf_counter())
 
-        # publish message to broker
-        publish.single(_TOPIC_PREFIX + message.topic, json_message, hostname=_BROKER_URL)
+        try:
+            self._outbox.put((message, time.perf_counter()), block=block, timeout=_TIMEOUT if block else None)
+            return True
+        except queue.Full:
+            # the broker cannot keep up with the messages -> reject the message and let the caller handle backpressure
+            self.dropped += 1
+            return False
 
-    def react(self, _client, _user, data: mqtt.MQTTMessage) -> None:
-        """ Handles an incoming message by triggering the corresponding callback function (if existent).
+    @util.threaded(util.const.ThreadNames.PUBLISH)
+    def _publish(self) -> None:
+        """ Continuously publishes queued messages via the transport.
+
+        Notes:
+            This method runs in its own thread.
+        """
+
+        while True:
+            # wait for the next message and publish it (encoded in the wire format of its topic if necessary)
+            message, queued = self._outbox.get()
+
+            # the outbox fills up (and sending reports backpressure) while the transport cannot keep up
+            self._in_flight.acquire()
+
+            # rejected messages are never acknowledged
+            if not self._transmit(message, queued):
+                self._in_flight.release()
+
+    def _transmit(self, message: interaction.Message, queued: float) -> bool:
+        """ Publishes a message via the transport (encoded in the wire format of its topic if necessary).
 
         Args:
-            _client: Client data.
-            _user: User data.
-            data: Encoded MQTT message.
+            message: Message to be published.
+            queued: Time the message was sent by the agent.
+
+        Returns:
+            Boolean whether the transport accepted the message.
         """
 
-        # decode message
-        message = interaction.Message.decode(data.payload.decode())
+        mid = self.transport.publish(message, self.formats.encode)
+
+        if mid is None:
+            self.dropped += 1
+            return False
+
+        # remember when the message was queued to measure the latency as soon as it is acknowledged
+        with self._pending_lock:
+            if mid in self._acknowledged:
+                self._acknowledged.remove(mid)
+                self.publish_latency.record(time.perf_counter() - queued)
+            else:
+                self._pending[mid] = queued
+
+        return True
 
-        # trigger subscription if existent
-        if message.topic in self.subscriptions:
-            self.subscriptions[message.topic].handle(message)
+    def use_format(self, topic: str, wire_format: str) -> None:
+        """ Sets the wire format messages of a given topic are published in.
+
+        Received messages are decoded independently of the format set for their topic.
+
+        See Also:
+            - ``def _WireFormats.use(...)``
+
+        Args:
+            topic: Topic (filter) the format applies to.
+            wire_format: Either ``WireFormat.JSON`` or ``WireFormat.BINARY``.
+        """
+
+        self.formats.use(topic, wire_format)
+
+    def _confirm(self, mid: int) -> None:
+        """ Records the publish latency of a message once the transport acknowledged it.
+
+        Args:
+            mid: Id of the acknowledged message.
+        """
+
+        if not self.asynchronous:
+            self._in_flight.release()
+
+        with self._pending_lock:
+            queued = self._pending.pop(mid, None)
+
+            # the acknowledgement may arrive before the publishing thread registered the message
+            if queued is None:
+                self._acknowledged.add(mid)
+                return
+
+        self.publish_latency.record(time.perf_counter() - queued)
+
+    def react(self, message: interaction.Message) -> None:
+        """ Handles an incoming message by triggering the callback functions of every matching subscription.
+
+        The callbacks are not executed on the transport's thread but dispatched to the worker pool so that slow
+        callbacks cannot stall incoming traffic. Messages of the same topic are handled in order. If the subscription
+        coalesces messages, pending messages of the same sender are replaced by the latest one.
+        Callbacks of asynchronous connections are executed on the event loop in the order messages were received.
+
+        Args:
+            message: Received message.
+        """
+
+        with self._routing_lock:
+            subscriptions = self.router.match(message.topic)
+
+        # messages may be received on another thread (or while publishing on the event loop)
+        if self.asynchronous:
+            for subscription in subscriptions:
+                self._loop.call_soon_threadsafe(self._handle, subscription, message)
+
+            return
+
+        # dispatch every matching subscription
+        for subscription in subscriptions:
+            coalesce_key = (id(subscription), message.sender) if subscription.coalesce else None
+            self.dispatcher.submit(message.topic, lambda handle=subscription.handle: handle(message), coalesce_key)
+
+    def _handle(self, subscription: _Subscription, message: interaction.Message) -> None:
+        """ Handles a message on the event loop of an asynchronous connection.
+
+        Coroutines of asynchronous callbacks are scheduled as tasks which are referenced until they are done.
+
+        Args:
+            subscription: Subscription matching the message.
+            message: Received message.
+        """
+
+        if asyncio.iscoroutine(result := subscription.handle(message)):
+            task = self._loop.create_task(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
 
 class Communication:
+    """ Communication of the main agent with other agents.
+
+    Every instance shares the same connection. The transport passed to the first instance decides how messages are
+    exchanged, e.g. an ``MqttTransport`` for a configurable broker or a ``LoopbackTransport`` for simulations. By
+    default, messages are exchanged via the public MQTT broker. Transports passed to later instances are ignored.
+    Likewise, the first instance decides whether the connection is asynchronous, i.e. driven by the running event loop
+    (e.g. via an ``AsyncioMqttTransport``) instead of background threads.
+    """
+
     class Topics:
         FORMATION = "formation"
+        FORMATION_HEARTBEAT = "formation-heartbeat"
         PROCESS_FINISHED = "process-finished"
 
-    def __init__(self):
-        self._connection: _Connection = _Connection()
+    def __init__(self, transport: Optional[interaction.Transport] = None, asynchronous: bool = False):
+        self._connection: _Connection = _Connection(transport, asynchronous)
 
-    def subscribe(self, topic: str, callback: interaction.Callback, receive_own: bool = False) -> None:
+    def subscribe(self, topic: str, callback: interaction.Callback, receive_own: bool = False,
+                  coalesce: bool = False) -> _Subscription:
         """ Adds a communication subscription to the connection.
 
         See Also:
             - ``def Connection.subscribe(...)``
 
         Args:
-            topic: Topic to subscribe to.
+            topic: Topic (filter) to subscribe to.
             callback: Callback function to be triggered when a message for the subscribed topic is received.
             receive_own: Boolean whether the sender shall receive his own messages.
+            coalesce: Boolean whether only the latest pending message per sender needs to be handled.
+
+        Returns:
+            The subscription which can be cancelled later on.
         """
 
-        self._connection.subscribe(topic, callback, receive_own)
+        return self._connection.subscribe(topic, callback, receive_own, coalesce)
+
+    def use_format(self, topic: str, wire_format: str) -> None:
+        """ Sets the wire format the main agent's messages of a given topic are published in.
+
+        See Also:
+            - ``def Connection.use_format(...)``
 
-    def send(self, topic: str, content: interaction.MessageContent) -> None:
+        Args:
+            topic: Topic (filter) the format applies to.
+            wire_format: Either ``WireFormat.JSON`` or ``WireFormat.BINARY``.
+        """
+
+        self._connection.use_format(topic, wire_format)
+
+    def send(self, topic: str, content: interaction.MessageContent) -> bool:
         """ Publishes a message sent by the main agent.
 
+        See Also:
+            - ``def Connection.send(...)``
+
         Args:
             topic: Topic of the message.
             content: Content of the message (JSON compatible).
+
+        Returns:
+            Boolean whether the message was queued for publishing.
         """
 
-        self._connection.send(interaction.Message(attributes.SIGNATURE, topic, content, datetime.now()))
+        return self._connection.send(interaction.Message(attributes.SIGNATURE, topic, content, datetime.now()))
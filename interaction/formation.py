@@ -1,13 +1,76 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import math
+import struct
+import time
+import traceback
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, TypedDict
+from threading import Event, RLock
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, Union
 
 import attributes
 import interaction
 import sensing
 import util
 
+_HEARTBEAT_INTERVAL: float = 10  # seconds between heartbeats while the main agent's member relation is unchanged
+_REFRESH_INTERVAL: float = 60  # seconds between broadcasts of the unchanged member relation
+_MEMBER_TTL: float = 30  # seconds after which members that did not broadcast anything expire
+_PARTITION_PREFIX: str = "lane"
+_NEIGHBOUR_PARTITIONS: int = 1  # number of partitions on either side of the own partition to listen to
+
+
+def _partition_topic(topic: str, partition: Optional[int] = None) -> str:
+    """ Creates the topic of a formation message within a partition.
+
+    Args:
+        topic: Topic of the formation message.
+        partition: Partition (lane) of the topic or ``None`` for a filter matching every partition.
+
+    Returns:
+        The partitioned topic (e.g. ``lane/3/formation``).
+    """
+
+    return f"{_PARTITION_PREFIX}/{'+' if partition is None else partition}/{topic}"
+
+
+def _topic_partition(topic: str) -> int:
+    """ Extracts the partition from a partitioned topic.
+
+    Args:
+        topic: Partitioned topic.
+
+    Returns:
+        The partition (lane) of the topic.
+    """
+
+    return int(topic.split("/")[1])
+
+
+def _synchronized(method: Callable[..., Any]) -> Callable[..., Any]:
+    """ Decorator executing a method of the formation while holding the formation's lock.
+
+    Messages of different topics are handled by different threads and the main agent updates the formation in its own
+    thread, so that every method changing the relation graph, the known relations or the times members were last
+    heard of must hold the lock.
+
+    Args:
+        method: Method of the formation.
+
+    Returns:
+        Wrapper function calling the method while holding the lock.
+    """
+
+    @functools.wraps(method)
+    def wrapper(formation: Formation, *args, **kwargs) -> Any:
+        with formation._lock:
+            return method(formation, *args, **kwargs)
+
+    return wrapper
+
 
 class _Member:
     class Dictionary(TypedDict):
@@ -50,17 +113,17 @@ class _Member:
         )
 
     @staticmethod
-    def main_agent(filing: bool = False):
+    def main_agent(filing: Optional[datetime] = None):
         """ Creates a member that represents the main agent.
 
         Args:
-            filing: Boolean whether the main agent is intending to leave the parking lane.
+            filing: Time the main agent proposed to leave the parking lane (``None`` if it does not intend to leave).
 
         Returns:
             The main agent member.
         """
 
-        return _Member(attributes.SIGNATURE, attributes.DELTA, datetime.now() if filing else None)
+        return _Member(attributes.SIGNATURE, attributes.DELTA, filing)
 
     def __init__(self, signature: str, delta: float, filing: Optional[datetime]):
         self.signature: str = signature
@@ -117,10 +180,72 @@ class _MemberRelation:
         self.ahead_signature: Optional[str] = ahead_signature
 
 
+class _MemberRelationCodec(interaction.ContentCodec[_MemberRelation.Dictionary]):
+    ID: int = 1
+
+    # member signature index, delta, flags, filing (µs), ahead signature index
+    _LAYOUT: struct.Struct = struct.Struct("!BfBqB")
+    _FILING: int = 0b01
+    _AHEAD: int = 0b10
+
+    def encode(self, content: _MemberRelation.Dictionary, intern: Callable[[str], int]) -> bytes:
+        """ Packs a dictionary representation of a member relation into bytes.
+
+        Args:
+            content: Dictionary representation of the member relation.
+            intern: Function interning a string and returning its index.
+
+        Returns:
+            The binary representation of the member relation.
+        """
+
+        member = content['member']
+        filing, ahead_signature = member['filing'], content['ahead_signature']
+
+        flags = (self._FILING if filing is not None else 0) | (self._AHEAD if ahead_signature is not None else 0)
+
+        return self._LAYOUT.pack(
+            intern(member['signature']),
+            member['delta'],
+            flags,
+            0 if filing is None else round(filing * 1e6),
+            0 if ahead_signature is None else intern(ahead_signature)
+        )
+
+    def decode(self, data: bytes, strings: List[str]) -> _MemberRelation.Dictionary:
+        """ Unpacks the dictionary representation of a member relation from bytes.
+
+        Args:
+            data: Binary representation of the member relation.
+            strings: Strings interned by the message.
+
+        Returns:
+            The dictionary representation of the member relation.
+        """
+
+        signature, delta, flags, filing, ahead_signature = self._LAYOUT.unpack(data)
+
+        return {
+            'member': {
+                'signature': strings[signature],
+                'delta': delta,
+                'filing': filing / 1e6 if flags & self._FILING else None
+            },
+            'ahead_signature': strings[ahead_signature] if flags & self._AHEAD else None
+        }
+
+
+# member relations can always be decoded from the compact binary format
+interaction.register_codec(_partition_topic(interaction.Communication.Topics.FORMATION), _MemberRelationCodec())
+
+
 class _RelationGraph:
     def __init__(self):
         self.vertices: Dict[str, _Member] = {}
         self.edges: Dict[str, Optional[str]] = {}
+        self._reversed_edges: Dict[str, Dict[str, None]] = {}  # ahead signature -> ordered set of behind signatures
+        self._starting_signatures: Dict[str, Optional[str]] = {}  # vertex signature -> cached starting vertex
+        self._transitivities: Dict[str, Dict[str, None]] = {}  # starting vertex -> cached ordered transitivity
 
     def add(self, member_relation: _MemberRelation) -> None:
         """ Adds the relation of two members to the graph.
@@ -130,17 +255,107 @@ class _RelationGraph:
         member. In the case that there already is an edge leaving the primary member vertex, this edge is overwritten as
         there may only be one emanating edge per vertex.
 
+        The reversed edges as well as the cached starting vertices and linear transitivities are updated incrementally.
+        Only the vertices behind the primary member are affected by a changed edge so that re-adding an unchanged
+        relation takes constant time.
+
         Args:
             member_relation: Relation between the primary (behind) member and the secondary (ahead) member.
         """
 
         member = member_relation.member  # primary member
         ahead_signature = member_relation.ahead_signature  # signature of the secondary member
+        is_vertex = member.signature in self.vertices
+        previous_ahead = self.edges.get(member.signature)
 
-        # _add primary member as a vertex and the relation between the primary and the secondary member as an edge
+        # update the primary member's vertex (its delta or filing may have changed)
         self.vertices[member.signature] = member
+
+        # nothing else changes if the relation is already known
+        if is_vertex and previous_ahead == ahead_signature:
+            return
+
+        # the primary member leaves the linear transitivity of its previous front member
+        if previous_ahead is not None and (starting_signature := self._starting_signature(previous_ahead)) is not None:
+            self._transitivities.pop(starting_signature, None)
+
+        # every vertex behind the primary member may belong to a different linear transitivity afterwards
+        self._invalidate(member.signature)
+
+        # replace the emanating edge and its reversed counterpart
+        if previous_ahead is not None:
+            self._unlink(member.signature, previous_ahead)
+
         self.edges[member.signature] = ahead_signature
 
+        if ahead_signature is not None:
+            self._reversed_edges.setdefault(ahead_signature, {})[member.signature] = None
+
+            # the primary member extends the linear transitivity of the member in front of it
+            if (starting_signature := self._starting_signature(ahead_signature)) is not None:
+                self._transitivities.pop(starting_signature, None)
+
+    def remove(self, signature: str) -> None:
+        """ Removes a vertex member and its emanating edge from the graph.
+
+        Edges of other members linking to the removed member are kept as the removed member may rejoin later on.
+
+        Args:
+            signature: Signature of the vertex member to be removed.
+        """
+
+        if signature not in self.vertices:
+            return
+
+        ahead_signature = self.edges[signature]
+
+        # the member leaves the linear transitivity of its front member
+        if ahead_signature is not None:
+            if (starting_signature := self._starting_signature(ahead_signature)) is not None:
+                self._transitivities.pop(starting_signature, None)
+
+        # every vertex behind the member becomes part of a different linear transitivity
+        self._invalidate(signature)
+
+        if ahead_signature is not None:
+            self._unlink(signature, ahead_signature)
+
+        del self.edges[signature]
+        del self.vertices[signature]
+
+    def linear_transitivity(self, signature: str) -> Optional[List[_Member]]:
+        """ Gets the maximum linear transitivity containing a given vertex member.
+
+        The starting vertex and the transitivity of every vertex are cached so that looking up the transitivity only
+        takes time proportional to its length if the relevant part of the graph has not changed.
+
+        See Also:
+            For reference regarding linear transitivities:
+                - ``def max_linear_transitivities(...)``
+
+        Args:
+            signature: Signature of the member to get the maximum linear transitivity for.
+
+        Returns:
+            The maximum linear transitivity including the member or ``None`` if there is no such transitivity.
+        """
+
+        # only vertex members can be part of a linear transitivity
+        if signature not in self.vertices:
+            return None
+
+        # there is no linear transitivity for members linked to a cycle
+        if (starting_signature := self._starting_signature(signature)) is None:
+            return None
+
+        transitivity = self._transitivity(starting_signature)
+
+        # the member may be linked to the starting vertex on a branch that is not part of the linear transitivity
+        if signature not in transitivity:
+            return None
+
+        return [self.vertices[member_signature] for member_signature in transitivity]
+
     def max_linear_transitivities(self) -> List[List[_Member]]:
         """ Traces all linear transitivities of maximum length.
 
@@ -148,7 +363,7 @@ class _RelationGraph:
 
         See Also:
             For reference regarding linear transitivities and starting members:
-                - ``def _linear_transitivity(...)``
+                - ``def _transitivity(...)``
                 - ``def _is_starting_agent(...)``
 
         Returns:
@@ -161,52 +376,139 @@ class _RelationGraph:
         # get every maximum linear transitivity by tracing from every starting agent
         for starting_agent in starting_agents:
             # get maximum linear transitivity starting from starting agent
-            transitivity = self._linear_transitivity(starting_agent)
+            transitivity = self._transitivity(starting_agent.signature)
 
             # _add maximum linear transitivity to list
-            linear_transitivities.append(transitivity)
+            linear_transitivities.append([self.vertices[signature] for signature in transitivity])
 
         return linear_transitivities
 
-    def _linear_transitivity(self, starting_member: _Member) -> List[_Member]:
-        """ Traces a linear transitivity starting from a given vertex member.
+    def _transitivity(self, starting_signature: str) -> Dict[str, None]:
+        """ Gets the (cached) linear transitivity starting from a given starting vertex.
 
         A linear transitivity is a non-cyclical path starting from a given vertex member.
         A vertex member is a member that is represented as a vertex in the graph. This is exactly the case if the member
         has demonstrated to be willing to be part of a formation by sharing his front agent (or ``None`` if there is
-        none).
+        none). If several members link to the same member, the transitivity continues with the member that linked to it
+        most recently.
 
         Args:
-            starting_member: Vertex member to start the linear transitivity from.
+            starting_signature: Signature of the starting vertex to start the linear transitivity from.
 
         Returns:
-            The transitivity list starting from the given vertex member.
+            The signatures of the transitivity in order as an ordered set.
 
         Raises:
             AssertionError: If the given starting member is not a vertex member.
             AssertionError: If there is a cyclical transitivity.
         """
 
+        if (transitivity := self._transitivities.get(starting_signature)) is not None:
+            return transitivity
+
         # starting member must be a vertex member
-        assert starting_member.signature in self.vertices, f"Starting member {starting_member} must be a vertex member."
+        assert starting_signature in self.vertices, f"Starting member #{starting_signature} must be a vertex member."
 
-        reversed_edges = self._reversed_edges()  # edges linking from secondary (ahead) agent to primary (behind) agent
-        transitivity_list = [starting_member]  # every linear transitivity contains at least the starting member
+        transitivity = {starting_signature: None}  # every linear transitivity contains at least the starting member
 
-        # trace directed relations between the agents by traversing the edges starting from the starting member
-        member = starting_member
-        while member.signature in reversed_edges:
-            # get linked member (the agent in front of the current member)
-            behind = reversed_edges[member.signature]
-            member = self._vertex_member(behind)
+        # trace directed relations between the agents by traversing the reversed edges starting from the starting member
+        signature = starting_signature
+        while behind_signatures := self._reversed_edges.get(signature):
+            # get linked member (the agent behind the current member)
+            signature = next(reversed(behind_signatures))
 
             # a linear transitivity must not contain cycles
-            assert member not in transitivity_list, f"Found cycle in linear transitivity {transitivity_list}."
+            assert signature not in transitivity, f"Found cycle in linear transitivity {list(transitivity)}."
+
+            # _add member to linear transitivity and remember its starting vertex
+            transitivity[signature] = None
+            self._starting_signatures[signature] = starting_signature
+
+        self._transitivities[starting_signature] = transitivity
+        return transitivity
 
-            # _add member to linear transitivity list
-            transitivity_list.append(member)
+    def _starting_signature(self, signature: str) -> Optional[str]:
+        """ Gets the (cached) starting vertex a vertex member is linked to by following the edges.
+
+        Every vertex visited on the way is cached so that subsequent lookups take constant time.
+
+        Args:
+            signature: Signature of a vertex member.
+
+        Returns:
+            The signature of the starting vertex or ``None`` if the member is not a vertex or linked to a cycle.
+        """
+
+        if signature not in self.vertices:
+            return None
 
-        return transitivity_list
+        path = {}  # vertices visited on the way to the starting vertex (ordered set)
+        current = signature
+
+        # follow the edges until there is a vertex with a known starting vertex or a starting vertex itself
+        while current not in self._starting_signatures:
+            path[current] = None
+            ahead = self.edges[current]
+
+            # a vertex without a vertex in front is a starting vertex
+            if ahead is None or ahead not in self.vertices:
+                starting_signature = current
+                break
+
+            # vertices linked to a cycle have no starting vertex
+            if ahead in path:
+                starting_signature = None
+                break
+
+            current = ahead
+        else:
+            starting_signature = self._starting_signatures[current]
+
+        # cache the starting vertex of every visited vertex
+        for visited in path:
+            self._starting_signatures[visited] = starting_signature
+
+        return starting_signature
+
+    def _invalidate(self, signature: str) -> None:
+        """ Discards cached starting vertices and transitivities of a member and every vertex behind it.
+
+        Args:
+            signature: Signature of the member whose relation changes.
+        """
+
+        behind = [signature]
+        visited = {signature}
+
+        # traverse every vertex linking (indirectly) to the member
+        while behind:
+            current = behind.pop()
+
+            # discard the cached starting vertex and with it the transitivity starting from there
+            if (starting_signature := self._starting_signatures.pop(current, None)) is not None:
+                self._transitivities.pop(starting_signature, None)
+
+            # a vertex may also have been a starting vertex because the member was not a vertex before
+            self._transitivities.pop(current, None)
+
+            for behind_signature in self._reversed_edges.get(current, ()):
+                if behind_signature not in visited:
+                    visited.add(behind_signature)
+                    behind.append(behind_signature)
+
+    def _unlink(self, signature: str, ahead_signature: str) -> None:
+        """ Removes a reversed edge.
+
+        Args:
+            signature: Signature of the behind member.
+            ahead_signature: Signature of the ahead member.
+        """
+
+        behind_signatures = self._reversed_edges[ahead_signature]
+        behind_signatures.pop(signature, None)
+
+        if not behind_signatures:
+            del self._reversed_edges[ahead_signature]
 
     def _is_starting_vertex(self, member: _Member) -> bool:
         """ Determines whether a given member is a vertex that is not linking to another vertex member.
@@ -254,37 +556,188 @@ class _RelationGraph:
         # filter starting vertices from vertex members
         return [member for member in self.vertices.values() if self._is_starting_vertex(member)]
 
-    def _reversed_edges(self) -> Dict[str, str]:
-        """ Reverses the direction of the edges by switching keys with values of ``vertices``.
+    def __repr__(self):
+        return repr(self.edges)
+
+
+class _BroadcastPolicy:
+    class Decision:
+        NONE: int = 0
+        HEARTBEAT: int = 1
+        RELATION: int = 2
+
+    def __init__(self, heartbeat_interval: float, refresh_interval: float):
+        # heartbeats must be sent more often than full relations
+        assert 0 < heartbeat_interval <= refresh_interval, "Heartbeat interval must be positive and at most the " \
+                                                           "refresh interval."
+
+        self.heartbeat_interval: float = heartbeat_interval
+        self.refresh_interval: float = refresh_interval
+        self._state: Optional[Tuple[Optional[str], float, bool]] = None
+        self._last_relation: float = -math.inf
+        self._last_broadcast: float = -math.inf
+
+    def decide(self, member_relation: _MemberRelation, now: float) -> int:
+        """ Decides what to broadcast for the main agent's current member relation.
+
+        The full member relation is broadcast as soon as the ahead signature, the delta or the filing state changed and
+        additionally every ``refresh_interval`` seconds so that members joining later on learn about the relation.
+        Otherwise a heartbeat is broadcast every ``heartbeat_interval`` seconds to signal that the relation still holds.
+
+        Args:
+            member_relation: The main agent's current member relation.
+            now: Current monotonic time in seconds.
+
+        Returns:
+            The decision as one of ``Decision.NONE``, ``Decision.HEARTBEAT`` and ``Decision.RELATION``.
+        """
+
+        member = member_relation.member
+        state = (member_relation.ahead_signature, member.delta, member.filing is not None)
+
+        if state != self._state or now - self._last_relation >= self.refresh_interval:
+            self._state = state
+            self._last_relation = self._last_broadcast = now
+            return _BroadcastPolicy.Decision.RELATION
+
+        if now - self._last_broadcast >= self.heartbeat_interval:
+            self._last_broadcast = now
+            return _BroadcastPolicy.Decision.HEARTBEAT
+
+        return _BroadcastPolicy.Decision.NONE
+
+    def reset(self) -> None:
+        """ Forgets the previously broadcast member relation so that the next one is broadcast in any case. """
+
+        self._state = None
+        self._last_relation = self._last_broadcast = -math.inf
+
 
-        Vertices that are linked to ``None`` are not included in the resulting edged.
+class _MemberList:
+    def __init__(self, members: List[_Member]):
+        self.members: List[_Member] = members
+        self._positions: Dict[str, int] = {member.signature: position for position, member in enumerate(members)}
+
+    def position(self, signature: str) -> int:
+        """ Gets the position of a member within the member list.
+
+        Args:
+            signature: Signature of the member.
 
         Returns:
-            Dictionary representing the reversed directed edges.
+            The index of the member associated with the signature.
+
+        Raises:
+            AssertionError: If there is no member with the given signature in the member list.
         """
 
-        return {ahead: behind for behind, ahead in self.edges.items() if ahead is not None}
+        # there must be a member with the associated signature in the member list
+        assert signature in self._positions, f"Tried to find {signature} but there is no associated member."
 
-    def _vertex_member(self, signature: str) -> _Member:
-        """ Gets vertex agent by it's signature.
+        return self._positions[signature]
+
+    def member(self, signature: str) -> _Member:
+        """ Gets the member associated with a given signature.
 
         Args:
-            signature: Signature of the vertex member.
+            signature: Signature of the desired member.
 
         Returns:
-            The vertex member.
+            The member with the associated signature.
 
         Raises:
-            AssertionError: If there is no vertex member with the given signature.
+            AssertionError: If there is no member with the given signature in the member list.
         """
 
-        # vertex member must be in vertices
-        assert signature in self.vertices, f"Agent #{signature} is no vertex member."
+        return self.members[self.position(signature)]
 
-        return self.vertices[signature]
+    def comes_before(self, signature_1: str, signature_2: str) -> bool:
+        """ Determines whether a member is located further ahead than another member.
+
+        Args:
+            signature_1: Signature of a member.
+            signature_2: Signature of another member.
+
+        Returns:
+             Boolean whether member associated with ``signature_1`` comes before member associated with ``signature_2``.
+
+        Raises:
+            AssertionError: If there is no member with one of the given signatures in the member list.
+        """
+
+        return self.position(signature_1) < self.position(signature_2)
+
+    def distance(self, signature_1: str, signature_2: str) -> int:
+        """ Determines how many members stand between two different members.
+
+        Args:
+            signature_1: Signature of a member.
+            signature_2: Signature of another member.
+
+        Returns:
+            The number of members in between the given members.
+
+        Raises:
+            AssertionError: If the signatures are equal.
+            AssertionError: If there is no member with one of the given signatures in the member list.
+        """
+
+        # signatures must be different in order to find the distance between distinct members
+        assert signature_1 != signature_2, f"Cannot calculate the distance between {signature_1} and {signature_2} " \
+                                           f"in a meaningful way."
+
+        # calculate and return the (absolute) number of members in between
+        return abs(self.position(signature_1) - self.position(signature_2)) - 1
+
+    def between(self, signature_1: str, signature_2: str) -> List[_Member]:
+        """ Gets the members standing between two members.
+
+        Args:
+            signature_1: Signature of a member.
+            signature_2: Signature of another member.
+
+        Returns:
+            The members in between the given members ordered from front to back.
+
+        Raises:
+            AssertionError: If there is no member with one of the given signatures in the member list.
+        """
+
+        position_1, position_2 = sorted((self.position(signature_1), self.position(signature_2)))
+        return self.members[position_1 + 1:position_2]
+
+    def ahead(self, signature: str) -> List[_Member]:
+        """ Gets the members standing ahead of a member.
+
+        Args:
+            signature: Signature of a member.
+
+        Returns:
+            The members ahead of the given member ordered from front to back.
+
+        Raises:
+            AssertionError: If there is no member with the given signature in the member list.
+        """
+
+        return self.members[:self.position(signature)]
+
+    def __eq__(self, other: _MemberList):
+        return self.members == other.members
+
+    def __iter__(self):
+        yield from self.members
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, item: Union[_Member, str]):
+        return (item if isinstance(item, str) else item.signature) in self._positions
+
+    def __getitem__(self, key: int):
+        return self.members[key]
 
     def __repr__(self):
-        return repr(self.edges)
+        return repr(self.members)
 
 
 @util.Singleton
@@ -296,7 +749,7 @@ class Formation(interaction.Communication):
     @property
     def filing_member(self) -> Optional[_Member]:
         # get members that proposed a filing
-        filing_members = filter(lambda member: member.filing is not None, self.members)
+        filing_members = [member for member in self.members if member.filing is not None]
 
         # return None if no agent proposed a filing
         if not filing_members:
@@ -305,44 +758,286 @@ class Formation(interaction.Communication):
         # of all filing members return the member with the earliest filing
         return min(filing_members, key=lambda member: member.filing)
 
-    def __init__(self):
+    @property
+    def members(self) -> List[_Member]:
+        return self._members.members
+
+    @members.setter
+    def members(self, members: List[_Member]) -> None:
+        previous = [(member.signature, member.filing, member.delta) for member in self._members]
+        current = [(member.signature, member.filing, member.delta) for member in members]
+
+        # rebuild the signature index only when the member list changes
+        if current == previous:
+            return
+
+        self._members = _MemberList(members)
+
+        # wake up the main agent if the order of the members changed or a member started or stopped filing
+        if self.wakeup is not None and [(signature, filing is not None) for signature, filing, _ in current] \
+                != [(signature, filing is not None) for signature, filing, _ in previous]:
+            self.wakeup.set()
+
+    def __init__(self, heartbeat_interval: float = _HEARTBEAT_INTERVAL, refresh_interval: float = _REFRESH_INTERVAL,
+                 member_ttl: float = _MEMBER_TTL):
         super().__init__()
-        self.members: List[_Member] = []
+        self._lock: RLock = RLock()  # held while changing the relation graph (see ``_synchronized``)
+        self.partition: int = attributes.LANE
+        self._members: _MemberList = _MemberList([])
         self._scanner = sensing.Scanner()
         self._relation_graph: _RelationGraph = _RelationGraph()
-
-        self.subscribe(interaction.Communication.Topics.FORMATION, self._handle_member_relation)
+        self._relations: Dict[str, Tuple[int, _MemberRelation]] = {}  # signature -> partition and member relation
+        self._subscriptions: List[interaction.communication._Subscription] = []
+        self._broadcast_policy: _BroadcastPolicy = _BroadcastPolicy(heartbeat_interval, refresh_interval)
+        self._member_ttl: float = member_ttl
+        self._last_seen: OrderedDict[str, float] = OrderedDict()  # signature -> monotonic time (least recent first)
+        self.wakeup: Optional[util.Wakeup] = None  # set on relevant changes of the members (set by the main agent)
+        self._filing: Optional[datetime] = None  # time the main agent proposed to leave the parking lane
+        self._relation: Optional[_MemberRelation] = None  # latest member relation of the main agent
+        self._heartbeats: Optional[asyncio.Task] = None  # heartbeats of formations on an event loop
+        self._stopped: Event = Event()  # set once heartbeats are no longer shared
+
+        # share member relations in the compact binary format
+        self.use_format(_partition_topic(interaction.Communication.Topics.FORMATION), interaction.WireFormat.BINARY)
+        self.use_format(_partition_topic(interaction.Communication.Topics.FORMATION_HEARTBEAT),
+                        interaction.WireFormat.BINARY)
+
+        self._join(self.partition)
+
+        # heartbeats do not depend on updates, as the main agent does not update its formation during actions
+        if self._connection.asynchronous:
+            self._heartbeats = asyncio.get_running_loop().create_task(self._beat_async())
+        else:
+            self._beat()
 
     def update(self, filing: bool = False) -> None:
-        """ Updates the member relation graph by adding and sharing main agent's member relation.
+        """ Updates the member relation graph by adding the main agent's member relation and shares changes.
+
+        If the member in front of the main agent belongs to another partition, the main agent migrates to that
+        partition first. The member relation is only broadcast if it changed or has not been broadcast for a while.
+        Otherwise a heartbeat is broadcast at a lower rate to keep the main agent from expiring in other agents'
+        formations. Heartbeats are also broadcast in the background while the formation is not updated.
+
+        See Also:
+            For reference regarding broadcasting:
+                - ``def _BroadcastPolicy.decide(...)``
+
+        Args:
+            filing: Boolean whether the main agent is intending to leave the parking lane.
+        """
+
+        self._update(self._scanner.ahead_signature, filing)
+
+    async def update_async(self, filing: bool = False) -> None:
+        """ Updates the member relation graph like ``update(...)`` without blocking the running event loop.
+
+        Scanning for the front agent blocks on the camera, so it is done by the event loop's default executor.
+
+        See Also:
+            - ``def update(...)``
+
+        Args:
+            filing: Boolean whether the main agent is intending to leave the parking lane.
+        """
+
+        loop = asyncio.get_running_loop()
+        ahead_signature = await loop.run_in_executor(None, lambda: self._scanner.ahead_signature)
+
+        self._update(ahead_signature, filing)
+
+    @_synchronized
+    def _update(self, ahead_signature: Optional[str], filing: bool) -> None:
+        """ Adds the main agent's member relation to the graph and shares it if necessary.
 
         Args:
+            ahead_signature: Signature of the front agent or ``None`` if there is none.
             filing: Boolean whether the main agent is intending to leave the parking lane.
         """
 
+        # keep the time of the filing until the main agent no longer intends to leave, so that its member is unchanged
+        self._filing = (self._filing or datetime.now()) if filing else None
+
         # create the main agent's member relation containing the front agent signature and the main agent Member
-        ahead_signature = self._scanner.ahead_signature
-        member = _Member.main_agent(filing)
+        member = _Member.main_agent(self._filing)
         member_relation = _MemberRelation(member, ahead_signature)
 
-        # add and share the member relation
-        self._add(member_relation)
-        self.send(interaction.Communication.Topics.FORMATION, member_relation.encode())
+        # follow the member in front of the main agent into its partition
+        if ahead_signature in self._relations and (partition := self._relations[ahead_signature][0]) != self.partition:
+            self._join(partition)
+
+        # add the member relation and remove members that have not been heard of for too long
+        self._add(self.partition, member_relation)
+        self._expire_members()
+
+        # share the member relation or a heartbeat if necessary
+        self._relation = member_relation
+        self._broadcast()
+
+    @_synchronized
+    def _broadcast(self) -> None:
+        """ Shares the main agent's latest member relation or a heartbeat if the broadcast policy decides so.
+
+        See Also:
+            For reference regarding the decision:
+                - ``def _BroadcastPolicy.decide(...)``
+        """
+
+        # nothing is shared before the main agent's member relation is known
+        if self._relation is None:
+            return
+
+        decision = self._broadcast_policy.decide(self._relation, time.monotonic())
+
+        if decision == _BroadcastPolicy.Decision.RELATION:
+            self.send(_partition_topic(interaction.Communication.Topics.FORMATION, self.partition),
+                      self._relation.encode())
+        elif decision == _BroadcastPolicy.Decision.HEARTBEAT:
+            self.send(_partition_topic(interaction.Communication.Topics.FORMATION_HEARTBEAT, self.partition), None)
 
-    def _add(self, member_relation: _MemberRelation) -> None:
-        """ Adds a member relation to the graph and then updates the member list.
+    @util.threaded(util.const.ThreadNames.HEARTBEAT)
+    def _beat(self) -> None:
+        """ Concurrently shares heartbeats while the main agent does not update its formation, e.g. during actions.
+
+        Notes:
+            This method runs concurrently until the formation is stopped.
+        """
+
+        while not self._stopped.wait(self._broadcast_policy.heartbeat_interval):
+            try:
+                self._broadcast()
+            except Exception:
+                traceback.print_exc()
+
+    async def _beat_async(self) -> None:
+        """ Shares heartbeats like ``_beat()`` on the running event loop.
+
+        See Also:
+            - ``def _beat(...)``
+        """
+
+        while True:
+            await asyncio.sleep(self._broadcast_policy.heartbeat_interval)
+
+            try:
+                self._broadcast()
+            except Exception:
+                traceback.print_exc()
+
+    def stop(self) -> None:
+        """ Stops sharing heartbeats in the background. """
+
+        self._stopped.set()
+
+        if self._heartbeats is not None:
+            self._heartbeats.cancel()
+
+    @_synchronized
+    def _join(self, partition: int) -> None:
+        """ Makes the main agent a member of a partition.
+
+        The main agent listens to its own and the neighbouring partitions so that it knows the members it may migrate
+        to. Only member relations of its own partition are part of the relation graph, so the graph is rebuilt from the
+        known member relations of the new partition.
+
+        Args:
+            partition: Partition (lane) to join.
+        """
+
+        # stop listening to the previous partitions
+        for subscription in self._subscriptions:
+            subscription.cancel()
+
+        self.partition = partition
+        self._subscriptions = []
+
+        # listen to the own and the neighbouring partitions
+        # only the latest member relation of every member matters if messages back up
+        for neighbour in range(partition - _NEIGHBOUR_PARTITIONS, partition + _NEIGHBOUR_PARTITIONS + 1):
+            self._subscriptions += [
+                self.subscribe(_partition_topic(interaction.Communication.Topics.FORMATION, neighbour),
+                               self._handle_member_relation, coalesce=True),
+                self.subscribe(_partition_topic(interaction.Communication.Topics.FORMATION_HEARTBEAT, neighbour),
+                               self._handle_heartbeat, coalesce=True)
+            ]
+
+        # rebuild the relation graph from the member relations of the partition
+        self._relation_graph = _RelationGraph()
+
+        for signature, (member_partition, member_relation) in self._relations.items():
+            if member_partition == partition or signature == attributes.SIGNATURE:
+                self._relation_graph.add(member_relation)
+
+        # the main agent's relation has to be shared within the new partition right away
+        self._broadcast_policy.reset()
+        self._update_members()
+
+    def _add(self, partition: int, member_relation: _MemberRelation) -> None:
+        """ Adds a member relation to the graph (if it belongs to the main agent's partition) and updates the members.
+
+        Member relations of neighbouring partitions are only remembered. A member that moved to another partition is
+        evicted from the graph.
 
         See Also:
             For reference regarding the update of the member list:
                 - def _update_members(...)
 
         Args:
+            partition: Partition the member relation was shared in.
             member_relation: Relation between two members to add to the graph.
         """
 
-        self._relation_graph.add(member_relation)  # add relation to the graph
+        signature = member_relation.member.signature
+
+        self._relations[signature] = (partition, member_relation)  # remember the relation and its partition
+        self._refresh(signature)  # the member is still alive
+
+        if partition == self.partition:
+            self._relation_graph.add(member_relation)  # add relation to the graph
+        elif signature in self._relation_graph.vertices:
+            self._relation_graph.remove(signature)  # evict the member from the graph
+        else:
+            return
+
         self._update_members()  # update member list
 
+    def _refresh(self, signature: str) -> None:
+        """ Records that a member has just been heard of.
+
+        Args:
+            signature: Signature of the member.
+        """
+
+        self._last_seen[signature] = time.monotonic()
+        self._last_seen.move_to_end(signature)
+
+    @_synchronized
+    def _expire_members(self) -> None:
+        """ Removes members that have not been heard of within the member TTL.
+
+        The main agent never expires. As members are ordered by the time they were last heard of, only expired members
+        need to be checked.
+        """
+
+        deadline = time.monotonic() - self._member_ttl
+        expired = False
+
+        # remove every member that has been heard of before the deadline
+        while self._last_seen:
+            signature, last_seen = next(iter(self._last_seen.items()))
+
+            if last_seen >= deadline:
+                break
+
+            del self._last_seen[signature]
+
+            if signature != attributes.SIGNATURE:
+                self._relations.pop(signature, None)
+                self._relation_graph.remove(signature)
+                expired = True
+
+        if expired:
+            self._update_members()
+
     def _update_members(self) -> None:
         """ Updates the member list based on the current relation Graph.
 
@@ -351,19 +1046,13 @@ class Formation(interaction.Communication):
         transitivity including the main agent.
         """
 
-        # member list always includes at least the main agent
-        members = [_Member.main_agent()]
+        # get the maximum linear transitivity including the main agent
+        members = self._relation_graph.linear_transitivity(attributes.SIGNATURE)
 
-        # iterate over every maximum linear transitivity in the relation graph
-        for max_linear_transitivity in self._relation_graph.max_linear_transitivities():
-            # overwrite the members with maximum linear transitivity if it includes the main agent
-            if any(member.signature == attributes.SIGNATURE for member in max_linear_transitivity):
-                members = max_linear_transitivity  # set member list
-                break  # member list found -> stop further search
-
-        # set member list
-        self.members = members
+        # member list always includes at least the main agent
+        self.members = [_Member.main_agent()] if members is None else members
 
+    @_synchronized
     def _handle_member_relation(self, message: interaction.Message[_MemberRelation.Dictionary]) -> None:
         """ Handles an incoming member relation message by updating the formation member relation.
 
@@ -373,32 +1062,45 @@ class Formation(interaction.Communication):
 
         # decode message and add it to the graph
         member_relation = _MemberRelation.decode(message.content)
-        self._add(member_relation)
+        self._add(_topic_partition(message.topic), member_relation)
+        self._expire_members()
+
+    @_synchronized
+    def _handle_heartbeat(self, message: interaction.Message[None]) -> None:
+        """ Handles an incoming heartbeat message by keeping the sending member from expiring.
+
+        Heartbeats of members whose member relation is unknown are ignored as the relation will be broadcast again.
+
+        Args:
+            message: Incoming heartbeat message.
+        """
+
+        if message.sender in self._last_seen:
+            self._refresh(message.sender)
+
+        self._expire_members()
 
     def member(self, signature: str) -> _Member:
         """ Gets a formation member associated with a given signature.
 
+        See Also:
+            - ``def _MemberList.member(...)``
+
         Args:
             signature: Signature of the desired member.
 
         Returns:
             The member with the associated signature.
-
-        Raises:
-            AssertionError: If there is no member with the given signature in the formation.
         """
 
-        # get first member with the given signature or None if there is None
-        member = next([member for member in self.members if member.signature == signature], None)
-
-        # there must be a member with the associated signature in the formation
-        assert member is not None, f"Tried to find {signature} but the formation does not contain an associated member."
-
-        return member
+        return self._members.member(signature)
 
     def comes_before(self, signature_1: str, signature_2: str) -> bool:
         """ Determines whether an agent is located further ahead within the formation.
 
+        See Also:
+            - ``def _MemberList.comes_before(...)``
+
         Args:
             signature_1: Signature of a formation member.
             signature_2: Signature of another formation member.
@@ -407,21 +1109,13 @@ class Formation(interaction.Communication):
              Boolean whether member associated with ``signature_1`` comes before member associated with ``signature_2``.
         """
 
-        # a member never comes before itself
-        if signature_1 == signature_2:
-            return False
-
-        # get members associated to the signatures
-        member_1, member_2 = self.member(signature_1), self.member(signature_2)
-
-        # determine and return whether index of first member is less than the index of the second member
-        return self.members.index(member_1) < self.members.index(member_2)
+        return self._members.comes_before(signature_1, signature_2)
 
     def distance(self, signature_1: str, signature_2: str) -> int:
         """ Determines how many vehicles stand between two different members.
 
-        Notes:
-            The given signatures must be distinct.
+        See Also:
+            - ``def _MemberList.distance(...)``
 
         Args:
             signature_1: Signature of a formation member.
@@ -429,35 +1123,55 @@ class Formation(interaction.Communication):
 
         Returns:
             The number of vehicles in between the given members.
+        """
 
-        Raises:
-            AssertionError: If the signatures are equal.
+        return self._members.distance(signature_1, signature_2)
+
+    def between(self, signature_1: str, signature_2: str) -> List[_Member]:
+        """ Gets the formation members standing between two members.
+
+        See Also:
+            - ``def _MemberList.between(...)``
+
+        Args:
+            signature_1: Signature of a formation member.
+            signature_2: Signature of another formation member.
+
+        Returns:
+            The members in between the given members ordered from front to back.
         """
 
-        # signatures must be different in order to find the distance between distinct members
-        assert signature_1 != signature_2, f"Cannot calculate the distance between {signature_1} and {signature_2} " \
-                                           f"in a meaningful way."
+        return self._members.between(signature_1, signature_2)
+
+    def ahead(self, signature: str) -> List[_Member]:
+        """ Gets the formation members standing ahead of a member.
 
-        # get members associated to the signatures
-        member_1, member_2 = self.member(signature_1), self.member(signature_2)
+        See Also:
+            - ``def _MemberList.ahead(...)``
+
+        Args:
+            signature: Signature of a formation member.
+
+        Returns:
+            The members ahead of the given member ordered from front to back.
+        """
 
-        # calculate and return the (absolute) number of vehicles in between
-        return abs(self.members.index(member_1) - self.agents.index(member_2)) - 1
+        return self._members.ahead(signature)
 
     def __eq__(self, other: Formation):
-        return self.members == other.members
+        return self._members == other._members
 
     def __iter__(self):
-        yield from self.members
+        yield from self._members
 
     def __len__(self):
-        return len(self.members)
+        return len(self._members)
 
-    def __contains__(self, item: _Member):
-        return item in self.members
+    def __contains__(self, item: Union[_Member, str]):
+        return item in self._members
 
     def __getitem__(self, key: int):
-        return self.members[key]
+        return self._members[key]
 
     def __repr__(self):
-        return f"Formation{self.members}"
+        return f"Formation{self._members}"
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import json
+import struct
+import sys
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import TypeVar, Generic, Callable, Any
+from typing import TypeVar, Generic, Callable, Any, Dict, List
 
+import interaction
 import util
 
 MessageContent = TypeVar("MessageContent")
 
+_MAGIC: int = 0xA7  # first byte of binary messages which can never be the first byte of a JSON message
+_VERSION: int = 1
+
+# magic byte, version, UNIX timestamp (µs), content codec id, number of interned strings
+_HEADER: struct.Struct = struct.Struct("!BBqBB")
+_STRING_LENGTH: struct.Struct = struct.Struct("!H")
+
 
 class _Keys:
     SENDER: str = "sender"
@@ -16,6 +27,100 @@ class _Keys:
     DATE: str = "date"
 
 
+class WireFormat:
+    JSON: str = "json"
+    BINARY: str = "binary"
+
+
+class ContentCodec(ABC, Generic[MessageContent]):
+    """ Base class for compact binary encodings of message contents.
+
+    Codecs are registered for a topic. Strings that occur repeatedly (like signatures) should be interned via the
+    ``intern`` function passed to ``encode`` so that they are only transmitted once per message and referenced by their
+    index instead.
+    """
+
+    ID: int
+
+    @abstractmethod
+    def encode(self, content: MessageContent, intern: Callable[[str], int]) -> bytes:
+        """ Encodes a message content.
+
+        Args:
+            content: Content of a message.
+            intern: Function interning a string and returning its index.
+
+        Returns:
+            The encoded content.
+        """
+
+    @abstractmethod
+    def decode(self, data: bytes, strings: List[str]) -> MessageContent:
+        """ Decodes a message content.
+
+        Args:
+            data: Encoded content.
+            strings: Interned strings of the message by their index.
+
+        Returns:
+            The content of the message.
+        """
+
+
+class _JsonContentCodec(ContentCodec[Any]):
+    ID: int = 0
+
+    def encode(self, content: Any, intern: Callable[[str], int]) -> bytes:
+        return json.dumps(content, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes, strings: List[str]) -> Any:
+        return json.loads(data)
+
+
+_CODECS: Dict[int, ContentCodec] = {_JsonContentCodec.ID: _JsonContentCodec()}
+_TOPIC_CODECS: interaction.Router[ContentCodec] = interaction.Router()  # topic filter -> codec
+_TOPIC_CODEC_CACHE: Dict[str, ContentCodec] = {}  # topic -> codec
+
+
+def register_codec(topic: str, codec: ContentCodec) -> None:
+    """ Registers a binary content codec for messages of a given topic.
+
+    The topic may contain wildcards to register the codec for several topics at once. Messages of topics without a
+    registered codec fall back to JSON encoded contents within the binary message.
+
+    Args:
+        topic: Topic (filter) whose message contents are encoded by the codec.
+        codec: Codec encoding and decoding the message contents.
+
+    Raises:
+        AssertionError: If another codec with the same id is already registered.
+    """
+
+    # codec ids must be unique
+    assert _CODECS.get(codec.ID, codec) is codec, f"There already is a codec with the id {codec.ID}."
+
+    _CODECS[codec.ID] = codec
+    _TOPIC_CODECS.add(topic, codec)
+    _TOPIC_CODEC_CACHE.clear()
+
+
+def _topic_codec(topic: str) -> ContentCodec:
+    """ Gets the codec for the contents of messages of a given topic.
+
+    Args:
+        topic: Topic of a message.
+
+    Returns:
+        The first codec registered for a matching topic filter or the JSON codec if there is none.
+    """
+
+    if (codec := _TOPIC_CODEC_CACHE.get(topic)) is None:
+        codecs = _TOPIC_CODECS.match(topic)
+        codec = _TOPIC_CODEC_CACHE[topic] = codecs[0] if codecs else _CODECS[_JsonContentCodec.ID]
+
+    return codec
+
+
 class Message(Generic[MessageContent]):
     def __init__(self, sender: str, topic: str, content: MessageContent, date: datetime):
         self.sender = sender
@@ -39,6 +144,37 @@ class Message(Generic[MessageContent]):
             _Keys.DATE: self.date.timestamp()
         })
 
+    def encode_binary(self) -> bytes:
+        """ Creates a compact binary representation of the message.
+
+        The representation consists of a header containing a version and the UNIX timestamp in microseconds, a table of
+        interned strings (starting with the sender and the topic) and the content encoded by the codec registered for
+        the message's topic.
+
+        Returns:
+            The binary representation of the message.
+        """
+
+        strings: Dict[str, int] = {}
+
+        def intern(string: str) -> int:
+            return strings.setdefault(string, len(strings))
+
+        # the sender and the topic are always the first interned strings
+        intern(self.sender)
+        intern(self.topic)
+
+        codec = _topic_codec(self.topic)
+        content = codec.encode(self.content, intern)
+
+        # there can only be as many interned strings as the header is able to count
+        assert len(strings) <= 0xFF, f"Message {self} contains too many distinct strings."
+
+        header = _HEADER.pack(_MAGIC, _VERSION, round(self.date.timestamp() * 1e6), codec.ID, len(strings))
+        table = b"".join(_STRING_LENGTH.pack(len(encoded)) + encoded for encoded in map(str.encode, strings))
+
+        return header + table + content
+
     @staticmethod
     def decode(json_message: str) -> Message[MessageContent]:
         """ Creates a message from a given json representation of that message.
@@ -68,6 +204,60 @@ class Message(Generic[MessageContent]):
             datetime.fromtimestamp(data[_Keys.DATE])
         )
 
+    @staticmethod
+    def decode_binary(binary_message: bytes) -> Message[MessageContent]:
+        """ Creates a message from a given binary representation of that message.
+
+        See Also:
+            - ``def encode_binary(...)``
+
+        Args:
+            binary_message: Binary representation of the message.
+
+        Returns:
+            The message represented by the bytes.
+
+        Raises:
+            AssertionError: If the message is not a binary message of a supported version or uses an unknown codec.
+        """
+
+        magic, version, timestamp, codec_id, string_count = _HEADER.unpack_from(binary_message)
+
+        # the message must be a binary message of a supported version and encoded with a known codec
+        assert magic == _MAGIC, "Message is not binary encoded."
+        assert version == _VERSION, f"Unsupported binary message version {version}."
+        assert codec_id in _CODECS, f"Unknown content codec {codec_id}."
+
+        # read the interned strings
+        strings = []
+        offset = _HEADER.size
+
+        for _ in range(string_count):
+            (length,) = _STRING_LENGTH.unpack_from(binary_message, offset)
+            offset += _STRING_LENGTH.size
+            strings.append(sys.intern(binary_message[offset:offset + length].decode()))
+            offset += length
+
+        content = _CODECS[codec_id].decode(binary_message[offset:], strings)
+
+        return Message(strings[0], strings[1], content, datetime.fromtimestamp(timestamp / 1e6))
+
+    @staticmethod
+    def decode_payload(payload: bytes) -> Message[MessageContent]:
+        """ Creates a message from a payload that is either JSON or binary encoded.
+
+        Args:
+            payload: JSON or binary representation of the message.
+
+        Returns:
+            The message represented by the payload.
+        """
+
+        if payload[:1] == bytes((_MAGIC,)):
+            return Message.decode_binary(payload)
+
+        return Message.decode(payload.decode())
+
     def __repr__(self):
         return f"Message[#{self.sender}: {self.topic}: {self.date}: {self.content}]"
 
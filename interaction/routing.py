@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, List, TypeVar
+
+_SEPARATOR: str = "/"
+_SINGLE_LEVEL: str = "+"
+_MULTI_LEVEL: str = "#"
+
+Subscriber = TypeVar("Subscriber")
+
+
+def _levels(topic: str) -> List[str]:
+    return topic.split(_SEPARATOR)
+
+
+def validate_filter(topic_filter: str) -> None:
+    """ Ensures that a topic filter is a valid MQTT topic filter.
+
+    Wildcards must occupy a whole topic level and the multi-level wildcard ``#`` may only be the last level.
+
+    Args:
+        topic_filter: Topic filter to be checked.
+
+    Raises:
+        AssertionError: If the topic filter is invalid.
+    """
+
+    levels = _levels(topic_filter)
+
+    for index, level in enumerate(levels):
+        # wildcards must occupy a whole level
+        assert level in (_SINGLE_LEVEL, _MULTI_LEVEL) or (_SINGLE_LEVEL not in level and _MULTI_LEVEL not in level), \
+            f"Wildcards must occupy a whole level in topic filter {topic_filter}."
+
+        # the multi-level wildcard must be the last level
+        assert level != _MULTI_LEVEL or index == len(levels) - 1, \
+            f"The multi-level wildcard must be the last level in topic filter {topic_filter}."
+
+
+class _Node(Generic[Subscriber]):
+    def __init__(self):
+        self.children: Dict[str, _Node[Subscriber]] = {}
+        self.subscribers: Dict[Subscriber, None] = {}  # ordered set of subscribers
+
+    def __bool__(self):
+        return bool(self.children or self.subscribers)
+
+
+class Router(Generic[Subscriber]):
+    """ Topic trie mapping MQTT topic filters to subscribers.
+
+    Each topic level corresponds to a level of the trie so that matching a topic takes time proportional to its number
+    of levels (and the number of wildcard branches along the way) independently of the number of subscriptions.
+    Topic filters may contain the single-level wildcard ``+`` and the multi-level wildcard ``#``.
+    """
+
+    def __init__(self):
+        self._root: _Node[Subscriber] = _Node()
+
+    def add(self, topic_filter: str, subscriber: Subscriber) -> bool:
+        """ Adds a subscriber for a topic filter.
+
+        Args:
+            topic_filter: Topic filter (possibly containing wildcards) the subscriber is interested in.
+            subscriber: Subscriber to be added.
+
+        Returns:
+            Boolean whether the subscriber is the first one for the topic filter.
+
+        Raises:
+            AssertionError: If the topic filter is invalid.
+        """
+
+        validate_filter(topic_filter)
+
+        node = self._root
+        for level in _levels(topic_filter):
+            node = node.children.setdefault(level, _Node())
+
+        first = not node.subscribers
+        node.subscribers[subscriber] = None
+
+        return first
+
+    def remove(self, topic_filter: str, subscriber: Subscriber) -> bool:
+        """ Removes a subscriber from a topic filter.
+
+        Branches of the trie without any subscribers are pruned.
+
+        Args:
+            topic_filter: Topic filter the subscriber was added for.
+            subscriber: Subscriber to be removed.
+
+        Returns:
+            Boolean whether there are no subscribers left for the topic filter.
+        """
+
+        path = [self._root]
+        levels = _levels(topic_filter)
+
+        # find the node of the topic filter
+        for level in levels:
+            if (node := path[-1].children.get(level)) is None:
+                return True
+
+            path.append(node)
+
+        path[-1].subscribers.pop(subscriber, None)
+        last = not path[-1].subscribers
+
+        # prune empty nodes from the bottom up
+        for parent, node, level in zip(reversed(path[:-1]), reversed(path[1:]), reversed(levels)):
+            if node:
+                break
+
+            del parent.children[level]
+
+        return last
+
+    def match(self, topic: str) -> List[Subscriber]:
+        """ Gets every subscriber whose topic filter matches a topic.
+
+        Args:
+            topic: Topic (without wildcards) of a message.
+
+        Returns:
+            The matching subscribers (each subscriber at most once per matching topic filter).
+        """
+
+        levels = _levels(topic)
+        matches = []
+        nodes = [self._root]
+
+        for level in levels:
+            next_nodes = []
+
+            for node in nodes:
+                # the multi-level wildcard matches every remaining level
+                if (wildcard := node.children.get(_MULTI_LEVEL)) is not None:
+                    matches.extend(wildcard.subscribers)
+
+                if (child := node.children.get(level)) is not None:
+                    next_nodes.append(child)
+
+                if (wildcard := node.children.get(_SINGLE_LEVEL)) is not None:
+                    next_nodes.append(wildcard)
+
+            if not (nodes := next_nodes):
+                return matches
+
+        for node in nodes:
+            matches.extend(node.subscribers)
+
+            # the multi-level wildcard also matches the parent level
+            if (wildcard := node.children.get(_MULTI_LEVEL)) is not None:
+                matches.extend(wildcard.subscribers)
+
+        return matches
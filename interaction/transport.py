@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import socket
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable, Optional, Set, Union
+
+import paho.mqtt.client as mqtt
+
+import interaction
+
+_BROKER_URL: str = "test.mosquitto.org"
+_BROKER_PORT: int = 1883
+_TIMEOUT: int = 15
+_QOS: int = 1
+_MAX_INFLIGHT: int = 64  # maximum number of published messages waiting for an acknowledgement
+_MAX_QUEUED: int = 256  # maximum number of published messages kept by the client (including the ones in flight)
+_MISC_INTERVAL: float = 1  # seconds between two runs of the client's housekeeping (keepalive pings, retries)
+
+_TOPIC_PREFIX: str = "parknet-21/communication/"
+
+Encoder = Callable[["interaction.Message"], Union[str, bytes]]
+
+
+class Transport(ABC):
+    """ Base class for the ways messages are exchanged between agents.
+
+    A transport only moves messages. Subscriptions, dispatching and statistics are handled by the connection on top of
+    it which sets the ``on_message`` and ``on_acknowledge`` callbacks before connecting the transport.
+    """
+
+    def __init__(self):
+        self.on_message: Callable[[interaction.Message], None] = lambda message: None
+        self.on_acknowledge: Callable[[int], None] = lambda mid: None
+
+    @abstractmethod
+    def connect(self) -> None:
+        """ Starts exchanging messages. Received messages are passed to ``on_message``. """
+
+    @abstractmethod
+    def subscribe(self, topic: str) -> None:
+        """ Starts receiving messages of a topic (filter).
+
+        Args:
+            topic: Topic (filter) to subscribe to.
+        """
+
+    @abstractmethod
+    def unsubscribe(self, topic: str) -> None:
+        """ Stops receiving messages of a topic (filter).
+
+        Args:
+            topic: Topic (filter) to unsubscribe from.
+        """
+
+    @abstractmethod
+    def publish(self, message: interaction.Message, encode: Encoder) -> Optional[int]:
+        """ Publishes a message.
+
+        Args:
+            message: Message to be published.
+            encode: Function encoding the message if the transport needs to serialize it.
+
+        Returns:
+            The id of the message which is passed to ``on_acknowledge`` once the message was delivered or ``None`` if
+            the message was rejected (and will never be acknowledged).
+        """
+
+
+class MqttTransport(Transport):
+    """ Transport exchanging messages via an MQTT broker.
+
+    The broker is only contacted once the transport is connected so that the address can be configured beforehand.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        super().__init__()
+        self.host: str = _BROKER_URL if host is None else host
+        self.port: int = _BROKER_PORT if port is None else port
+
+        self.client: mqtt.Client = mqtt.Client()
+        self.client.on_message = self._react
+        self.client.on_publish = lambda _client, _user, mid: self.on_acknowledge(mid)
+        self.client.max_inflight_messages_set(_MAX_INFLIGHT)
+        self.client.max_queued_messages_set(_MAX_QUEUED)
+
+    def connect(self) -> None:
+        self.client.connect(self.host, self.port, _TIMEOUT)
+
+        # start listening for messages in the client's network thread
+        self.client.loop_start()
+
+    def subscribe(self, topic: str) -> None:
+        self.client.subscribe(_TOPIC_PREFIX + topic, qos=_QOS)
+
+    def unsubscribe(self, topic: str) -> None:
+        self.client.unsubscribe(_TOPIC_PREFIX + topic)
+
+    def publish(self, message: interaction.Message, encode: Encoder) -> Optional[int]:
+        info = self.client.publish(_TOPIC_PREFIX + message.topic, encode(message), qos=_QOS)
+
+        # without a connection, the client keeps the message and publishes it once it is reconnected
+        return info.mid if info.rc in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN) else None
+
+    def _react(self, _client, _user, data: mqtt.MQTTMessage) -> None:
+        """ Decodes an incoming message (either JSON or binary encoded) and passes it on.
+
+        Args:
+            _client: Client data.
+            _user: User data.
+            data: Encoded MQTT message.
+        """
+
+        self.on_message(interaction.Message.decode_payload(data.payload))
+
+
+class AsyncioMqttTransport(MqttTransport):
+    """ Transport exchanging messages via an MQTT broker driven by the running event loop.
+
+    Instead of a network thread, the event loop watches the client's socket and calls the client's read and write
+    functions whenever the socket is ready. Received messages and acknowledgements are therefore passed on on the event
+    loop. The transport must be connected while the event loop is running.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        super().__init__(host, port)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._misc: Optional[asyncio.Task] = None
+        self._topics: Set[str] = set()  # topic filters to subscribe to (again) once the client is connected
+
+        self.client.on_connect = self._on_connect
+        self.client.on_socket_open = self._on_socket_open
+        self.client.on_socket_close = self._on_socket_close
+        self.client.on_socket_register_write = self._on_socket_register_write
+        self.client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def connect(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+        # establishing the TCP connection blocks -> do it outside the event loop
+        self._connecting = self._loop.run_in_executor(None, self.client.connect, self.host, self.port, _TIMEOUT)
+
+    def subscribe(self, topic: str) -> None:
+        # subscriptions made before the client is connected are sent once it is connected
+        self._topics.add(topic)
+        super().subscribe(topic)
+
+    def unsubscribe(self, topic: str) -> None:
+        self._topics.discard(topic)
+        super().unsubscribe(topic)
+
+    def _on_connect(self, client: mqtt.Client, _user, _flags, _rc) -> None:
+        for topic in self._topics:
+            client.subscribe(_TOPIC_PREFIX + topic, qos=_QOS)
+
+    # the client's socket callbacks may be called from the executor thread that connects the client
+    # -> the event loop must only be modified thread safely
+
+    def _on_socket_open(self, client: mqtt.Client, _user, sock: socket.socket) -> None:
+        self._loop.call_soon_threadsafe(self._watch, client, sock)
+
+    def _watch(self, client: mqtt.Client, sock: socket.socket) -> None:
+        """ Lets the event loop read from the client's socket and do the client's housekeeping.
+
+        Args:
+            client: The connected client.
+            sock: The client's socket.
+        """
+
+        self._loop.add_reader(sock, client.loop_read)
+        self._misc = self._loop.create_task(self._housekeeping())
+
+    def _on_socket_close(self, _client, _user, sock: socket.socket) -> None:
+        self._loop.call_soon_threadsafe(self._unwatch, sock)
+
+    def _unwatch(self, sock: socket.socket) -> None:
+        """ Stops reading from the client's socket and doing the client's housekeeping.
+
+        Args:
+            sock: The client's socket.
+        """
+
+        self._loop.remove_reader(sock)
+
+        if self._misc is not None:
+            self._misc.cancel()
+
+    def _on_socket_register_write(self, client: mqtt.Client, _user, sock: socket.socket) -> None:
+        self._loop.call_soon_threadsafe(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, _client, _user, sock: socket.socket) -> None:
+        self._loop.call_soon_threadsafe(self._loop.remove_writer, sock)
+
+    async def _housekeeping(self) -> None:
+        """ Periodically lets the client send keepalive pings and retry unacknowledged messages. """
+
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(_MISC_INTERVAL)
+
+
+class LoopbackBus:
+    """ In-process message broker connecting loopback transports.
+
+    Messages are delivered as they are, without being encoded, to every transport subscribed to a matching topic
+    filter. This allows simulating many agents (and load testing the communication stack) within a single process.
+
+    Notes:
+        Every receiver gets the same message object. Receivers must therefore not modify received messages.
+    """
+
+    def __init__(self):
+        self._router: interaction.Router[LoopbackTransport] = interaction.Router()
+        self._lock: Lock = Lock()
+        self._ids: itertools.count = itertools.count(1)
+
+    def subscribe(self, topic: str, transport: LoopbackTransport) -> None:
+        with self._lock:
+            self._router.add(topic, transport)
+
+    def unsubscribe(self, topic: str, transport: LoopbackTransport) -> None:
+        with self._lock:
+            self._router.remove(topic, transport)
+
+    def publish(self, message: interaction.Message) -> int:
+        """ Delivers a message to every subscribed transport.
+
+        Every transport receives the message at most once, even if several of its topic filters match.
+
+        Args:
+            message: Message to be delivered.
+
+        Returns:
+            The id of the message.
+        """
+
+        with self._lock:
+            transports = dict.fromkeys(self._router.match(message.topic))
+
+        for transport in transports:
+            transport.on_message(message)
+
+        return next(self._ids)
+
+
+class LoopbackTransport(Transport):
+    """ Transport exchanging messages with other transports of the same ``LoopbackBus``.
+
+    Messages are delivered synchronously within ``publish`` and acknowledged right away.
+    """
+
+    def __init__(self, bus: LoopbackBus):
+        super().__init__()
+        self.bus: LoopbackBus = bus
+
+    def connect(self) -> None:
+        pass
+
+    def subscribe(self, topic: str) -> None:
+        self.bus.subscribe(topic, self)
+
+    def unsubscribe(self, topic: str) -> None:
+        self.bus.unsubscribe(topic, self)
+
+    def publish(self, message: interaction.Message, encode: Encoder) -> int:
+        mid = self.bus.publish(message)
+        self.on_acknowledge(mid)
+
+        return mid
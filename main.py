@@ -1,4 +1,19 @@
-from control import MainAgent
+import argparse
+
+import util
 
 if __name__ == "__main__":
-    agent = MainAgent()
+    parser = argparse.ArgumentParser(description="Starts the agent of the vehicle.")
+    parser.add_argument("--profile", action="store_true", help="print the durations of the startup phases")
+    arguments = parser.parse_args()
+
+    # import the packages one by one to measure their import times (hardware is acquired on first use)
+    util.STARTUP.import_modules("attributes", "interaction", "sensing", "control")
+
+    from control import MainAgent
+
+    with util.STARTUP.measure("create agent"):
+        agent = MainAgent()
+
+    if arguments.profile:
+        print(util.STARTUP.report())
@@ -1,2 +1,4 @@
-from sensing.distance import Distance
-from sensing.scanner import Scanner
+from sensing.camera import Frame, FrameSource, PiCameraSource, ArraySource, FileSource, Capture
+from sensing.distance import Distance, Reading, Sample, Snapshot, Sensors, Sampler
+from sensing.distance import SignalSource, GpioSource, SimulatedSource
+from sensing.scanner import Scanner, QrDecoder, CachedQrDecoder
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from abc import ABC, abstractmethod
+from threading import Condition
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+import util
+
+_BUFFERS: int = 4  # number of frame buffers in the ring (one being written, one latest, others may be borrowed)
+
+
+class Frame(NamedTuple):
+    image: np.ndarray  # view of a ring buffer (height x width [x RGB]), valid while the frame is borrowed
+    number: int  # consecutive number of the frame since the capture started
+    timestamp: float  # monotonic time the frame was completed
+
+
+class FrameSource(ABC):
+    """ Base class for sources of continuously captured frames.
+
+    Frames either consist of a single channel (luma) or of three channels (RGB). Sources do not allocate frames. They
+    write into the buffers handed to them so that a fixed set of buffers can be reused for every frame.
+    """
+
+    def __init__(self, resolution: Tuple[int, int], channels: int):
+        assert channels in (1, 3), f"Frames must have either 1 (luma) or 3 (RGB) channels but not {channels}."
+
+        self.resolution: Tuple[int, int] = resolution  # width, height
+        self.channels: int = channels
+
+    @property
+    def buffer_shape(self) -> Tuple[int, ...]:
+        """ Shape of the buffers the source writes into (may be padded compared to the resolution). """
+
+        width, height = self.resolution
+        return (height, width) if self.channels == 1 else (height, width, self.channels)
+
+    def image(self, buffer: np.ndarray) -> np.ndarray:
+        """ Gets the image of a frame within its (possibly padded) buffer.
+
+        Args:
+            buffer: Buffer the frame was written into.
+
+        Returns:
+            A view of the buffer containing the frame's image only.
+        """
+
+        width, height = self.resolution
+        return buffer[:height, :width]
+
+    @abstractmethod
+    def stream(self, buffers: Iterator[np.ndarray]) -> None:
+        """ Captures frames into the given buffers until the buffers are exhausted.
+
+        A buffer is complete as soon as the next buffer is requested.
+
+        Args:
+            buffers: Iterator yielding the buffer the next frame is written into.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PiCameraSource(FrameSource):
+    """ Frames of the Raspberry Pi camera captured via the video port.
+
+    The video port avoids the mode switches (and the resulting latency) of still captures. The camera stays open until
+    the source is closed. Single channel frames are captured in YUV format whose Y plane is the luma of the frame so
+    that no conversion is necessary.
+    """
+
+    def __init__(self, resolution: Tuple[int, int], brightness: int, framerate: int = 10, channels: int = 1):
+        super().__init__(resolution, channels)
+
+        # picamera can only be installed on a Raspberry Pi -> other frame sources must work without it
+        import picamera
+
+        self._camera = picamera.PiCamera(resolution=resolution, framerate=framerate)
+        self._camera.brightness = brightness
+
+    @property
+    def buffer_shape(self) -> Tuple[int, ...]:
+        # the camera pads the width to a multiple of 32 and the height to a multiple of 16
+        width, height = self.resolution
+        width, height = (width + 31) // 32 * 32, (height + 15) // 16 * 16
+
+        # the Y plane is followed by the quarter size U and V planes
+        return (height * 3 // 2, width) if self.channels == 1 else (height, width, self.channels)
+
+    def stream(self, buffers: Iterator[np.ndarray]) -> None:
+        self._camera.capture_sequence(buffers, "yuv" if self.channels == 1 else "rgb", use_video_port=True)
+
+    def close(self) -> None:
+        self._camera.close()
+
+
+class ArraySource(FrameSource):
+    """ Frames (either luma or RGB) repeatedly played back from arrays, e.g. for simulations and benchmarks. """
+
+    def __init__(self, frames: Sequence[np.ndarray], framerate: Optional[float] = None):
+        height, width = frames[0].shape[:2]
+        super().__init__((width, height), 1 if frames[0].ndim == 2 else frames[0].shape[2])
+        self._frames: Sequence[np.ndarray] = frames
+        self._interval: float = 0 if framerate is None else 1 / framerate
+
+    def stream(self, buffers: Iterator[np.ndarray]) -> None:
+        for index, buffer in enumerate(buffers):
+            np.copyto(buffer, self._frames[index % len(self._frames)])
+            time.sleep(self._interval)
+
+
+class FileSource(FrameSource):
+    """ Frames repeatedly played back from a file of raw frames (e.g. recorded with ``raspivid`` or ``ffmpeg``).
+
+    The file contains the frames back to back, either with one byte (``gray``) or three bytes (``rgb24``) per pixel.
+    """
+
+    def __init__(self, path: str, resolution: Tuple[int, int], channels: int = 3, framerate: Optional[float] = None):
+        super().__init__(resolution, channels)
+        self._file = open(path, "rb", buffering=0)
+        self._interval: float = 0 if framerate is None else 1 / framerate
+
+    def stream(self, buffers: Iterator[np.ndarray]) -> None:
+        for buffer in buffers:
+            view = memoryview(buffer.reshape(-1))
+
+            # read straight into the buffer and start over at the end of the file
+            while (size := self._file.readinto(view)) < len(view):
+                if size == 0:
+                    self._file.seek(0)
+
+                view = view[size:]
+
+            time.sleep(self._interval)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Capture:
+    """ Continuous capture of frames into a ring of preallocated buffers.
+
+    A background thread lets the frame source write into the buffers of the ring. The latest frame can be borrowed
+    without copying it. Borrowed buffers are skipped by the capture thread until they are returned so that they are
+    never overwritten while being read.
+    """
+
+    def __init__(self, source: FrameSource, buffers: int = _BUFFERS):
+        assert buffers >= 3, f"The ring needs at least 3 buffers but only has {buffers}."
+
+        self.source: FrameSource = source
+        self._buffers: List[np.ndarray] = [np.empty(source.buffer_shape, np.uint8) for _ in range(buffers)]
+        self._borrowed: List[int] = [0] * buffers  # number of readers per buffer
+        self._latest: Optional[Frame] = None
+        self._latest_index: Optional[int] = None
+        self._condition: Condition = Condition()
+        self._running: bool = False
+        self._started: float = 0.0
+
+    @property
+    def frames(self) -> int:
+        return 0 if self._latest is None else self._latest.number
+
+    @property
+    def fps(self) -> float:
+        elapsed = time.monotonic() - self._started
+        return self.frames / elapsed if self._running and elapsed > 0 else 0.0
+
+    def start(self) -> None:
+        """ Starts capturing frames in the background. """
+
+        self._running = True
+        self._started = time.monotonic()
+        self._capture()
+
+    def stop(self) -> None:
+        """ Stops capturing frames after the current frame. The frame source is closed afterwards. """
+
+        self._running = False
+
+    @util.threaded(util.const.ThreadNames.CAPTURE)
+    def _capture(self) -> None:
+        """ Lets the frame source write into the ring buffers.
+
+        Notes:
+            This method runs in its own thread.
+        """
+
+        try:
+            self.source.stream(self._ring())
+        finally:
+            self.source.close()
+
+    def _free_index(self) -> Optional[int]:
+        return next((index for index, readers in enumerate(self._borrowed)
+                     if readers == 0 and index != self._latest_index), None)
+
+    def _ring(self) -> Iterator[np.ndarray]:
+        """ Yields free buffers of the ring and publishes each buffer as the latest frame once it is complete. """
+
+        number = 0
+
+        while self._running:
+            with self._condition:
+                # neither overwrite the latest frame nor a borrowed frame (wait if every other frame is borrowed)
+                self._condition.wait_for(lambda: self._free_index() is not None)
+                index = self._free_index()
+
+            yield self._buffers[index]
+
+            number += 1
+
+            with self._condition:
+                self._latest = Frame(self.source.image(self._buffers[index]), number, time.monotonic())
+                self._latest_index = index
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def frame(self, newer_than: int = 0, timeout: Optional[float] = None) -> Iterator[Optional[Frame]]:
+        """ Borrows the latest frame without copying it.
+
+        The frame's image must not be used after leaving the context since its buffer is reused afterwards.
+
+        Args:
+            newer_than: Number of a frame the borrowed frame must be newer than (e.g. the previously used frame).
+            timeout: Maximum number of seconds to wait for a new enough frame (waits indefinitely if ``None``).
+
+        Returns:
+            Context manager yielding the latest frame or ``None`` if there is no new enough frame within the timeout.
+        """
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.frames > newer_than, timeout):
+                frame = index = None
+            else:
+                frame, index = self._latest, self._latest_index
+                self._borrowed[index] += 1
+
+        if frame is None:
+            yield None
+            return
+
+        try:
+            yield frame
+        finally:
+            with self._condition:
+                self._borrowed[index] -= 1
+                self._condition.notify_all()
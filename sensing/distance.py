@@ -1,8 +1,37 @@
-from datetime import datetime
+from __future__ import annotations
 
-from gpiozero import DistanceSensor
+import heapq
+import math
+import random
+import statistics
+import time
+import traceback
+from abc import ABC, abstractmethod
+from array import array
+from threading import Condition, Event, Lock
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 
-UPDATE_INTERVAL: float = 0.4
+import util
+
+_BUFFER_SIZE: int = 64  # number of samples kept per sensor
+_WINDOW: int = 5  # default number of samples for windowed statistics
+_STALENESS_BOUNDS: List[float] = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1]  # upper bounds of ages in seconds
+_MAX_ERRORS: int = 10  # number of consecutive failed readings of a sensor after which sampling stops
+
+
+class Sensors:
+    FRONT: str = "front"
+    RIGHT: str = "right"
+    REAR: str = "rear"
+    REAR_ANGLED: str = "rear_angled"
+
+
+SAMPLE_RATES: Dict[str, float] = {  # samples per second
+    Sensors.FRONT: 20,
+    Sensors.RIGHT: 5,
+    Sensors.REAR: 20,
+    Sensors.REAR_ANGLED: 5,
+}
 
 
 class _TriggerPins:
@@ -19,27 +48,496 @@ class _EchoPins:
     BACK_ANGLED: int = 27
 
 
+class SignalSource(ABC):
+    """ Base class for sources of ultrasonic distance readings. """
+
+    @abstractmethod
+    def read(self, sensor: str) -> float:
+        """ Reads the current distance measured by a sensor.
+
+        Args:
+            sensor: Name of the sensor (see ``Sensors``).
+
+        Returns:
+            The distance in mm.
+        """
+
+
+class GpioSource(SignalSource):
+    """ Readings of the ultrasonic sensors connected to the GPIO pins. """
+
+    _PINS: Dict[str, Tuple[int, int]] = {  # sensor -> echo pin, trigger pin
+        Sensors.FRONT: (_EchoPins.FRONT, _TriggerPins.FRONT),
+        Sensors.RIGHT: (_EchoPins.RIGHT, _TriggerPins.RIGHT),
+        Sensors.REAR: (_EchoPins.BACK, _TriggerPins.BACK),
+        Sensors.REAR_ANGLED: (_EchoPins.BACK_ANGLED, _TriggerPins.BACK_ANGLED),
+    }
+
+    def __init__(self):
+        # gpiozero sets up the pin factory on import -> import it only once the sensors are actually used
+        from gpiozero import DistanceSensor
+
+        self._sensors: Dict[str, DistanceSensor] = {
+            sensor: DistanceSensor(echo=echo_pin, trigger=trigger_pin)
+            for sensor, (echo_pin, trigger_pin) in GpioSource._PINS.items()
+        }
+
+    def read(self, sensor: str) -> float:
+        # gpiozero measures distances in m
+        return self._sensors[sensor].distance * 1000
+
+
+SENSORS: util.Backend[SignalSource] = util.Backend("ultrasonic sensors", GpioSource)
+
+
+class SimulatedSource(SignalSource):
+    """ Simulated readings following given signals, e.g. for simulations and benchmarks.
+
+    Signals are functions mapping the number of seconds since the source was created to a distance in mm. Sensors
+    without a signal constantly measure ``default``.
+    """
+
+    def __init__(self, signals: Optional[Dict[str, Callable[[float], float]]] = None, default: float = 1000,
+                 noise: float = 0, latency: float = 0, seed: Optional[int] = None):
+        self.signals: Dict[str, Callable[[float], float]] = {} if signals is None else signals
+        self.default: float = default
+        self.noise: float = noise  # standard deviation of the gaussian measurement noise in mm
+        self.latency: float = latency  # number of seconds a reading takes
+        self._random: random.Random = random.Random(seed)
+        self._start: float = time.monotonic()
+
+    def read(self, sensor: str) -> float:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        signal = self.signals.get(sensor)
+        distance = self.default if signal is None else signal(time.monotonic() - self._start)
+
+        return max(0.0, distance + self._random.gauss(0, self.noise)) if self.noise > 0 else distance
+
+
+class Reading(NamedTuple):
+    value: float  # distance in mm
+    age: float  # number of seconds since the sample was taken
+    timestamp: int  # monotonic time in ns the sample was taken
+
+
+class Sample(NamedTuple):
+    value: float  # distance in mm
+    timestamp: int  # monotonic time in ns the sample was taken
+
+
+class Snapshot(NamedTuple):
+    """ Immutable view of the latest samples of every sensor (``None`` for sensors that have not been sampled). """
+
+    timestamp: int  # monotonic time in ns the snapshot was published
+    front: Optional[Sample] = None
+    right: Optional[Sample] = None
+    rear: Optional[Sample] = None
+    rear_angled: Optional[Sample] = None
+
+    @property
+    def age(self) -> float:
+        """ Number of seconds since the oldest sample of the snapshot was taken. """
+
+        timestamps = [sample.timestamp for sample in self[1:] if sample is not None]
+        return (time.monotonic_ns() - min(timestamps)) / 1e9 if timestamps else math.inf
+
+
+class _RingBuffer:
+    """ Fixed-size buffer of timestamped samples backed by arrays.
+
+    The buffer is written by a single thread. The latest sample is published by incrementing the sample count after the
+    sample has been written so that readers never see a partially written sample.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.count: int = 0  # number of samples written so far
+        self._values: array = array("d", [0.0] * capacity)
+        self._timestamps: array = array("q", [0] * capacity)  # monotonic time in ns
+
+    def append(self, value: float, timestamp: int) -> None:
+        position = self.count % self.capacity
+        self._values[position] = value
+        self._timestamps[position] = timestamp
+        self.count += 1
+
+    def latest(self) -> Optional[Tuple[float, int]]:
+        """ Gets the latest sample in O(1).
+
+        Returns:
+            The latest value and its timestamp or ``None`` if there are no samples yet.
+        """
+
+        if (count := self.count) == 0:
+            return None
+
+        position = (count - 1) % self.capacity
+        return self._values[position], self._timestamps[position]
+
+    def window(self, size: int) -> List[float]:
+        """ Gets the values of the latest samples.
+
+        Args:
+            size: Maximum number of samples (at most the capacity of the buffer).
+
+        Returns:
+            The values of the latest samples, oldest first.
+        """
+
+        count = self.count
+        size = min(size, count, self.capacity)
+
+        return [self._values[position % self.capacity] for position in range(count - size, count)]
+
+
+class Sampler:
+    """ Background sampling of the ultrasonic sensors.
+
+    A single thread reads every sensor at its own rate from the signal source and stores the samples in a ring buffer
+    per sensor. Reading samples never touches the sensors and therefore never blocks the caller.
+    Failed readings are skipped and counted. If a sensor keeps failing, sampling stops and readers fail instead of
+    waiting for samples forever.
+    """
+
+    def __init__(self, source: Optional[SignalSource] = None, rates: Optional[Dict[str, float]] = None,
+                 capacity: int = _BUFFER_SIZE):
+        self.source: Optional[SignalSource] = source
+        self.rates: Dict[str, float] = SAMPLE_RATES if rates is None else rates
+        self.buffers: Dict[str, _RingBuffer] = {sensor: _RingBuffer(capacity) for sensor in self.rates}
+        self._running: bool = False
+        self._idle: Event = Event()  # set while there is no sampling thread
+        self._idle.set()
+        self._lock: Lock = Lock()
+        self._condition: Condition = Condition()  # notified whenever a sample was taken or requested
+        self._requested: Set[str] = set()  # sensors to be sampled immediately
+        self._watches: Dict[str, List[Tuple[float, util.Wakeup]]] = {}  # sensor -> thresholds and their wake-ups
+        self.errors: int = 0  # number of failed readings
+        self.failure: Optional[Exception] = None  # error of the reading that stopped sampling
+
+        # latest samples of every sensor which are published by replacing the immutable snapshot as a whole
+        self.snapshot: Snapshot = Snapshot(0)
+
+    def start(self) -> None:
+        """ Starts sampling unless the sampler is already running. The sensors backend is used without a source. """
+
+        # avoid the lock once the sampler is running since every reading starts the sampler
+        if self._running:
+            return
+
+        # readers must not wait for samples that are never taken
+        assert self.failure is None, f"Sampling stopped as a sensor failed repeatedly: {self.failure!r}"
+
+        with self._lock:
+            if self._running:
+                return
+
+            if self.source is None:
+                self.source = SENSORS.get()
+
+            # the thread of a sampler that was just stopped may still be taking its last sample
+            self._idle.wait()
+            self._idle.clear()
+            self._running = True
+            self._sample()
+
+    def stop(self) -> None:
+        """ Stops sampling and waits for the sampling thread to finish its current sample. """
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        self._idle.wait()
+
+    def request(self, sensor: str) -> None:
+        """ Lets the sampler take a sample of a sensor as soon as possible instead of waiting until it is due.
+
+        Args:
+            sensor: Name of the sensor.
+        """
+
+        assert sensor in self.rates, f"The sensor {sensor} is not sampled (sampled sensors: {list(self.rates)})."
+
+        with self._condition:
+            self._requested.add(sensor)
+            self._condition.notify_all()
+
+    def watch(self, sensor: str, threshold: float, wakeup: util.Wakeup) -> None:
+        """ Sets a wake-up whenever the distance of a sensor crosses a threshold (in either direction).
+
+        Watching starts sampling, since a threshold is only checked when a sample is taken.
+
+        Args:
+            sensor: Name of the sensor.
+            threshold: Distance in mm.
+            wakeup: Wake-up to set.
+        """
+
+        # replace the list as a whole so that the sampling thread never needs a lock
+        with self._condition:
+            self._watches[sensor] = self._watches.get(sensor, []) + [(threshold, wakeup)]
+
+        self.start()
+
+    def wait(self, sensor: str, newer_than: int, timeout: float) -> bool:
+        """ Waits for a sample of a sensor taken after a given time.
+
+        Args:
+            sensor: Name of the sensor.
+            newer_than: Monotonic time in ns the sample must be taken after.
+            timeout: Maximum number of seconds to wait.
+
+        Returns:
+            Boolean whether there is such a sample.
+        """
+
+        def available() -> bool:
+            latest = self.buffers[sensor].latest()
+            return latest is not None and latest[1] > newer_than
+
+        with self._condition:
+            return self._condition.wait_for(available, timeout)
+
+    def complete_snapshot(self) -> Snapshot:
+        """ Gets the latest snapshot once every sensor has been sampled.
+
+        Returns:
+            The latest snapshot containing a sample of every sensor.
+        """
+
+        self.start()
+
+        def complete() -> bool:
+            return all(getattr(self.snapshot, sensor) is not None for sensor in self.rates)
+
+        # only wait for the first samples of every sensor -> afterwards reading the snapshot never blocks
+        if not complete():
+            with self._condition:
+                self._condition.wait_for(lambda: complete() or self.failure is not None)
+
+            # sampling may have stopped in the meantime
+            self.start()
+
+        return self.snapshot
+
+    @util.threaded(util.const.ThreadNames.SAMPLE)
+    def _sample(self) -> None:
+        """ Reads every sensor whenever its next sample is due.
+
+        Notes:
+            This method runs in its own thread.
+        """
+
+        # sensors ordered by the time their next sample is due (in ns)
+        schedule = [(time.monotonic_ns(), sensor) for sensor in self.rates]
+        heapq.heapify(schedule)
+        failures = dict.fromkeys(self.rates, 0)  # sensor -> number of consecutive failed readings
+
+        def reschedule(sensor: str, now: int) -> None:
+            # schedule the next sample (skip samples that could not be taken in time)
+            index = next(index for index, (_, scheduled) in enumerate(schedule) if scheduled == sensor)
+            schedule[index] = (max(schedule[index][0] + int(1e9 / self.rates[sensor]), now), sensor)
+            heapq.heapify(schedule)
+
+        try:
+            while self._running:
+                due, sensor = schedule[0]
+
+                # wait until the next sample is due unless a sample is requested earlier
+                with self._condition:
+                    self._condition.wait_for(lambda: self._requested or not self._running,
+                                             max(0, due - time.monotonic_ns()) / 1e9)
+                    requested = self._requested.pop() if self._requested else None
+
+                sensor = sensor if requested is None else requested
+
+                # a failed reading only skips the sample unless the sensor keeps failing
+                try:
+                    value = self.source.read(sensor)
+                    failures[sensor] = 0
+                except Exception as error:
+                    traceback.print_exc()
+                    self.errors += 1
+                    failures[sensor] += 1
+
+                    if failures[sensor] >= _MAX_ERRORS:
+                        with self._condition:
+                            self.failure = error
+                            self._running = False
+                            self._condition.notify_all()
+
+                    reschedule(sensor, time.monotonic_ns())
+                    continue
+
+                now = time.monotonic_ns()
+
+                # set the wake-ups of all thresholds crossed since the previous sample
+                if (previous := self.buffers[sensor].latest()) is not None:
+                    for threshold, wakeup in self._watches.get(sensor, ()):
+                        if (previous[0] < threshold) != (value < threshold):
+                            wakeup.set()
+
+                # publish the sample by swapping the reference to the snapshot so that readers never need a lock
+                snapshot = self.snapshot._replace(timestamp=now, **{sensor: Sample(value, now)})
+
+                with self._condition:
+                    self.buffers[sensor].append(value, now)
+                    self.snapshot = snapshot
+                    self._condition.notify_all()
+
+                reschedule(sensor, now)
+        finally:
+            self._idle.set()
+
+
 class _UltrasonicSensor:
+    def __init__(self, sampler: Sampler, sensor: str):
+        self._sampler: Sampler = sampler
+        self._sensor: str = sensor
+        self.hits: int = 0  # readings fresh enough right away
+        self.misses: int = 0  # readings that had to wait for a fresh sample (or were too old nevertheless)
+        self.staleness: util.Histogram = util.Histogram(_STALENESS_BOUNDS)  # ages of the returned readings
+
+    @property
+    def _buffer(self) -> _RingBuffer:
+        self._sampler.start()
+        return self._sampler.buffers[self._sensor]
+
+    def _latest(self) -> Tuple[float, int]:
+        # wait for the first sample
+        while (latest := self._buffer.latest()) is None:
+            self._sampler.wait(self._sensor, 0, 1 / self._sampler.rates[self._sensor])
+
+        return latest
+
     @property
     def value(self) -> float:
-        # calculate the time since last sensor update
-        passed_time = datetime.now() - self._last_update
+        """ Latest distance in mm regardless of its age. """
+
+        return self._latest()[0]
+
+    @property
+    def age(self) -> float:
+        """ Number of seconds since the latest sample was taken. """
+
+        return (time.monotonic_ns() - self._latest()[1]) / 1e9
+
+    def read(self, max_age: float, block: bool = True, timeout: Optional[float] = None) -> Reading:
+        """ Reads the distance with a maximum age the consumer can accept.
+
+        If the latest sample is too old and ``block`` is set, a sample is requested from the sampler and the caller
+        waits for it. Otherwise, the latest sample is returned along with its age so that the caller can decide how to
+        handle it.
+
+        Args:
+            max_age: Maximum number of seconds since the sample was taken.
+            block: Boolean whether to wait for a fresh sample if the latest one is too old.
+            timeout: Maximum number of seconds to wait for a fresh sample (waits for ``max_age`` if ``None``).
+
+        Returns:
+            The latest reading which is older than ``max_age`` only if it was not possible to get a fresh sample.
+        """
+
+        value, timestamp = self._latest()
+        now = time.monotonic_ns()
+        oldest = now - int(max_age * 1e9)
+
+        if timestamp >= oldest:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+            if block:
+                self._sampler.request(self._sensor)
+
+                if self._sampler.wait(self._sensor, oldest, max_age if timeout is None else timeout):
+                    value, timestamp = self._buffer.latest()
+                    now = time.monotonic_ns()
+
+        reading = Reading(value, (now - timestamp) / 1e9, timestamp)
+        self.staleness.record(reading.age)
+
+        return reading
+
+    def watch(self, threshold: float, wakeup: util.Wakeup) -> None:
+        """ Sets a wake-up whenever the distance crosses a threshold.
+
+        See Also:
+            - ``def Sampler.watch(...)``
 
-        # check if the sensor value needs to be updated
-        if passed_time.seconds >= UPDATE_INTERVAL:
-            self._last_update = datetime.now()  # update timestamp of last sensor update
-            self._value = self._sensor.distance  # update sensor value
+        Args:
+            threshold: Distance in mm.
+            wakeup: Wake-up to set.
+        """
 
-        return self._value
+        self._sampler.watch(self._sensor, threshold, wakeup)
 
-    def __init__(self, echo_pin: int, trigger_pin: int):
-        self._sensor: DistanceSensor = DistanceSensor(echo=echo_pin, trigger=trigger_pin)
-        self._value: float = 0.0
-        self._last_update: datetime = datetime.now()
+    def wait(self, newer_than: int, timeout: float) -> bool:
+        """ Waits for a sample taken after a given time, e.g. after a reading that did not allow to move.
+
+        Args:
+            newer_than: Monotonic time in ns the sample must be taken after.
+            timeout: Maximum number of seconds to wait.
+
+        Returns:
+            Boolean whether there is such a sample.
+        """
+
+        self._sampler.start()
+        return self._sampler.wait(self._sensor, newer_than, timeout)
+
+    def median(self, window: int = _WINDOW) -> float:
+        """ Median distance of the latest samples in mm.
+
+        Args:
+            window: Number of samples.
+
+        Returns:
+            The median distance.
+        """
+
+        self._latest()
+        return statistics.median(self._buffer.window(window))
+
+    def mean(self, window: int = _WINDOW) -> float:
+        """ Mean distance of the latest samples in mm.
+
+        Args:
+            window: Number of samples.
+
+        Returns:
+            The mean distance.
+        """
+
+        self._latest()
+        return statistics.fmean(self._buffer.window(window))
 
 
 class Distance:
-    FRONT: _UltrasonicSensor = _UltrasonicSensor(_EchoPins.FRONT, _TriggerPins.FRONT)
-    RIGHT: _UltrasonicSensor = _UltrasonicSensor(_EchoPins.RIGHT, _TriggerPins.RIGHT)
-    REAR: _UltrasonicSensor = _UltrasonicSensor(_EchoPins.BACK, _TriggerPins.BACK)
-    REAR_ANGLED: _UltrasonicSensor = _UltrasonicSensor(_EchoPins.BACK_ANGLED, _TriggerPins.BACK_ANGLED)
+    """ Ultrasonic distance sensors of the vehicle.
+
+    The sensors are sampled in the background as soon as the first sensor is read. In order to use another signal
+    source than the GPIO sensors (e.g. a ``SimulatedSource``), set ``Distance.SAMPLER.source`` or replace the factory of
+    the ``SENSORS`` backend beforehand.
+    """
+
+    SAMPLER: Sampler = Sampler()
+    FRONT: _UltrasonicSensor = _UltrasonicSensor(SAMPLER, Sensors.FRONT)
+    RIGHT: _UltrasonicSensor = _UltrasonicSensor(SAMPLER, Sensors.RIGHT)
+    REAR: _UltrasonicSensor = _UltrasonicSensor(SAMPLER, Sensors.REAR)
+    REAR_ANGLED: _UltrasonicSensor = _UltrasonicSensor(SAMPLER, Sensors.REAR_ANGLED)
+
+    @staticmethod
+    def snapshot() -> Snapshot:
+        """ Gets the latest samples of all sensors at once.
+
+        The snapshot is immutable and published atomically by the sampler. Reading it neither blocks the sampler nor
+        other readers.
+
+        Returns:
+            The latest snapshot of all sensors.
+        """
+
+        return Distance.SAMPLER.complete_snapshot()
@@ -1,38 +1,293 @@
-from typing import Optional, Tuple
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-import picamera
-import picamera.array
-import pyzbar.pyzbar as pyzbar
+import numpy as np
 
+import sensing
 import util
 
 RESOLUTION: Tuple[int, int] = (1920, 1080)
 BRIGHTNESS: int = 60
 
+ROI: Tuple[float, float, float, float] = (0.25, 0.25, 0.5, 0.5)  # left, top, width, height relative to the frame
+DOWNSCALE: int = 2  # factor the region of interest is downscaled by in the first pass
+_TRACKING_MARGIN: float = 0.5  # margin around the last known QR code relative to its size
+
+MAX_STALENESS: float = 2  # maximum number of seconds a decoded signature is reused for an unchanged scene
+CHANGE_THRESHOLD: float = 4  # mean absolute luma difference above which a scene is considered changed
+_FINGERPRINT_SIZE: int = 64  # maximum number of samples per dimension of a fingerprint
+_WATCH_INTERVAL: float = 0.1  # seconds between two checks whether the scene changed
+_FRAME_TIMEOUT: float = 1  # maximum number of seconds to wait for a (new) camera frame
+
+
+class _Region(NamedTuple):
+    left: int
+    top: int
+    width: int
+    height: int
+
+    def expanded(self, margin: float, frame: Tuple[int, int]) -> "_Region":
+        frame_height, frame_width = frame
+        left = max(0, self.left - int(self.width * margin))
+        top = max(0, self.top - int(self.height * margin))
+        right = min(frame_width, self.left + self.width + int(self.width * margin))
+        bottom = min(frame_height, self.top + self.height + int(self.height * margin))
+
+        return _Region(left, top, right - left, bottom - top)
+
+
+_Zbar: type = Callable[[np.ndarray], List[Any]]  # pyzbar.pyzbar.decode (imported on first use)
+
+
+def _zbar() -> _Zbar:
+    """ Loads the zbar library decoding QR codes.
+
+    Returns:
+        The function decoding every QR code of an image.
+    """
+
+    import pyzbar.pyzbar as pyzbar
+
+    return pyzbar.decode
+
+
+ZBAR: util.Backend[_Zbar] = util.Backend("zbar", _zbar)
+
+
+class QrDecoder:
+    """ Decoder of QR codes in camera frames searching the most likely parts of a frame first.
+
+    The decoder tries the following passes until a QR code is found:
+
+    1. the surroundings of the last known QR code (if tracking is enabled and a QR code has been found before)
+    2. the downscaled region of interest
+    3. the region of interest in full resolution
+    4. the whole frame in full resolution
+
+    Every pass only decodes a view of the luma of the frame. RGB frames are reduced to their green channel which
+    approximates the luma best.
+    """
+
+    class Pass:
+        TRACKED: str = "tracked"
+        DOWNSCALED: str = "downscaled"
+        ROI: str = "roi"
+        FULL: str = "full"
+
+    def __init__(self, roi: Tuple[float, float, float, float] = ROI, downscale: int = DOWNSCALE, track: bool = True):
+        assert downscale >= 1, f"The downscale factor must be positive but is {downscale}."
+
+        self.roi: Tuple[float, float, float, float] = roi
+        self.downscale: int = downscale
+        self.track: bool = track
+        self.last_region: Optional[_Region] = None  # region of the last found QR code in frame coordinates
+        self.hits: Dict[str, int] = dict.fromkeys(
+            [QrDecoder.Pass.TRACKED, QrDecoder.Pass.DOWNSCALED, QrDecoder.Pass.ROI, QrDecoder.Pass.FULL], 0)
+        self.misses: int = 0
+
+    def _passes(self, shape: Tuple[int, int]) -> List[Tuple[str, _Region, int]]:
+        height, width = shape
+        left, top, roi_width, roi_height = self.roi
+        roi = _Region(int(left * width), int(top * height), int(roi_width * width), int(roi_height * height))
+        passes = []
+
+        if self.track and self.last_region is not None:
+            passes.append((QrDecoder.Pass.TRACKED, self.last_region.expanded(_TRACKING_MARGIN, shape), 1))
+
+        if self.downscale > 1:
+            passes.append((QrDecoder.Pass.DOWNSCALED, roi, self.downscale))
+
+        passes.append((QrDecoder.Pass.ROI, roi, 1))
+        passes.append((QrDecoder.Pass.FULL, _Region(0, 0, width, height), 1))
+
+        return passes
+
+    def decode(self, image: np.ndarray) -> Optional[str]:
+        """ Decodes the first QR code found in an image.
+
+        Args:
+            image: Luma (height x width) or RGB (height x width x 3) image.
+
+        Returns:
+            The data of the QR code or ``None`` if no QR code has been found.
+        """
+
+        luma = image if image.ndim == 2 else image[:, :, 1]
+        zbar = ZBAR.get()
+
+        for name, region, scale in self._passes(luma.shape):
+            view = luma[region.top:region.top + region.height:scale, region.left:region.left + region.width:scale]
+
+            # check if any QR codes have been found
+            if decoded_objects := zbar(view):
+                self.hits[name] += 1
+
+                # remember where the QR code was found in frame coordinates
+                left, top, width, height = decoded_objects[0].rect
+                self.last_region = _Region(region.left + left * scale, region.top + top * scale,
+                                           width * scale, height * scale)
+
+                # decode and return the first QR code
+                return decoded_objects[0].data.decode("utf-8")
+
+        self.misses += 1
+        self.last_region = None
+
+        return None
+
+
+class CachedQrDecoder:
+    """ QR decoder skipping the decoding of scenes that did not change since the last decoding.
+
+    Along with the last decoded signature, a fingerprint of the scene is kept: the downsampled luma of the region the
+    QR code was found in (or of the whole frame if there was none). As long as the mean absolute difference to the
+    fingerprint of a new frame stays below the threshold, the last signature is reused without decoding the frame.
+    Signatures are reused for at most ``max_staleness`` seconds.
+    """
+
+    def __init__(self, decoder: QrDecoder, max_staleness: float = MAX_STALENESS,
+                 threshold: float = CHANGE_THRESHOLD):
+        self.decoder: QrDecoder = decoder
+        self.max_staleness: float = max_staleness
+        self.threshold: float = threshold
+        self.hits: int = 0
+        self.misses: int = 0
+        self.decode_time: util.LatencyStatistics = util.LatencyStatistics()
+
+        self._signature: Optional[str] = None
+        self._scene: Optional[Tuple[_Region, np.ndarray]] = None  # region and fingerprint of the last decoding
+        self._decoded: float = 0.0  # monotonic time of the last decoding
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """ Estimated number of seconds saved by skipped decodings. """
+
+        return self.hits * self.decode_time.mean if self.decode_time.count > 0 else 0.0
+
+    @property
+    def latest(self) -> Optional[str]:
+        """ Last decoded signature as long as it is fresh enough to be reused (``None`` otherwise). """
+
+        return self._signature if time.monotonic() - self._decoded <= self.max_staleness else None
+
+    @staticmethod
+    def _fingerprint_of(luma: np.ndarray, region: _Region) -> np.ndarray:
+        step = max(1, region.width // _FINGERPRINT_SIZE, region.height // _FINGERPRINT_SIZE)
+
+        # copy the samples since the frame's buffer is reused
+        return luma[region.top:region.top + region.height:step, region.left:region.left + region.width:step] \
+            .astype(np.int16)
+
+    def decode(self, image: np.ndarray) -> Optional[str]:
+        """ Decodes the first QR code found in an image unless the scene did not change since the last decoding.
+
+        Args:
+            image: Luma (height x width) or RGB (height x width x 3) image.
+
+        Returns:
+            The data of the QR code or ``None`` if no QR code has been found.
+        """
+
+        luma = image if image.ndim == 2 else image[:, :, 1]
+        now = time.monotonic()
+
+        # reuse the last signature if it is fresh enough and the scene did not change
+        if self._scene is not None and now - self._decoded <= self.max_staleness and not self.changed(luma):
+            self.hits += 1
+            return self._signature
+
+        self.misses += 1
+        self._signature = self.decoder.decode(luma)
+        self._decoded = time.monotonic()
+        self.decode_time.record(self._decoded - now)
+
+        # fingerprint the region of the found QR code (or the whole frame if there is none)
+        height, width = luma.shape
+        region = self.decoder.last_region or _Region(0, 0, width, height)
+        self._scene = (region, self._fingerprint_of(luma, region))
+
+        return self._signature
+
+    def changed(self, image: np.ndarray) -> bool:
+        """ Determines whether the scene changed since the last decoding without decoding the image.
+
+        Args:
+            image: Luma (height x width) or RGB (height x width x 3) image.
+
+        Returns:
+            Boolean whether the scene changed (``False`` if nothing has been decoded yet).
+        """
+
+        # the scene may be replaced by a decoding in another thread
+        if (scene := self._scene) is None:
+            return False
+
+        luma = image if image.ndim == 2 else image[:, :, 1]
+        region, fingerprint = scene
+
+        return np.abs(self._fingerprint_of(luma, region) - fingerprint).mean() >= self.threshold
+
+
+CAMERA: util.Backend[sensing.FrameSource] = util.Backend(
+    "camera", lambda: sensing.PiCameraSource(RESOLUTION, BRIGHTNESS))
+
 
 @util.Singleton
 class Scanner:
-    def __init__(self):
-        self._camera = picamera.PiCamera()
-        self._camera.resolution = RESOLUTION
-        self._camera.brightness = BRIGHTNESS
+    def __init__(self, source: Optional[sensing.FrameSource] = None):
+        # capture luma frames of the camera continuously unless another frame source is given (on the first scan)
+        self._capture: util.Backend[sensing.Capture] = util.Backend("capture", lambda: self._start(source))
+        self.decoder: CachedQrDecoder = CachedQrDecoder(QrDecoder())
+        self.wakeup: Optional[util.Wakeup] = None  # set whenever the scene changed since the last scan
 
-    @property
-    def _image(self) -> picamera.array.PiRGBArray:
-        with self._camera as camera, picamera.array.PiRGBArray(camera) as frame:
-            # capture and return image
-            camera.capture(frame, "rgb")
-            return frame.array
+    def _start(self, source: Optional[sensing.FrameSource]) -> sensing.Capture:
+        capture = sensing.Capture(CAMERA.get() if source is None else source)
+        capture.start()
+        self._watch(capture)
+        return capture
+
+    @util.threaded(util.const.ThreadNames.WATCH)
+    def _watch(self, capture: sensing.Capture) -> None:
+        """ Sets the wake-up once the captured scene changed since the last scan, e.g. as the vehicle ahead left.
+
+        Only fingerprints of the frames are compared, so that watching is cheap compared to decoding every frame.
+
+        Notes:
+            This method runs in its own thread.
+        """
+
+        number = 0
+        reported = None  # scene of the scan whose change has been reported already
+
+        while True:
+            time.sleep(_WATCH_INTERVAL)
+
+            scene = self.decoder._scene
+
+            # the camera may stall -> check again later
+            with capture.frame(number, _FRAME_TIMEOUT) as frame:
+                if frame is None:
+                    continue
+
+                number = frame.number
+                changed = self.decoder.changed(frame.image)
+
+            # report every change only once until the next scan
+            if changed and self.wakeup is not None and scene is not reported:
+                reported = scene
+                self.wakeup.set()
 
     @property
     def ahead_signature(self) -> Optional[str]:
-        # get QR object from camera image
-        decoded_objects = pyzbar.decode(self._image)
+        # get QR code from the latest camera image (without copying the image)
+        with self._capture.get().frame(timeout=_FRAME_TIMEOUT) as frame:
+            # without a frame, the last signature is reused as long as it is fresh enough
+            if frame is None:
+                return self.decoder.latest
 
-        # check if any QR codes have been found
-        if len(decoded_objects) > 0:
-            # decode and return the first QR code
-            data_bytes = decoded_objects[0].data
-            return data_bytes.decode("utf-8")
-
-        return None
+            return self.decoder.decode(frame.image)
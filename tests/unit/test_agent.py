@@ -0,0 +1,191 @@
+import time
+from datetime import datetime
+from threading import Thread
+from typing import Dict, List, Set
+
+import pytest
+
+import attributes
+import control
+import interaction
+import sensing
+import util
+from control import agent, driver
+from control.motion import SimulatedStepper
+from interaction import communication
+from interaction.formation import Formation, _Member, _MemberRelation
+from sensing import distance
+
+_GAP: float = 150  # mm to the vehicle ahead at the initial position
+
+
+class _Lane:
+    """ Main agent "m" with a simulated driving motor and sensors between the vehicles ahead and behind. """
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch):
+        self.stepper: SimulatedStepper = SimulatedStepper(realtime=False)
+        self.ahead: float = _GAP  # mm between the vehicle ahead and the initial position
+        self.behind: float = _GAP  # mm between the vehicle behind and the initial position
+        self.finished: List[str] = []  # senders of finished processes
+
+        monkeypatch.setattr(driver, "DRIVING_MOTOR", util.Backend("simulated driving motor", lambda: self.stepper))
+        self.sampler: sensing.Sampler = sensing.Sampler(sensing.SimulatedSource({
+            sensing.Sensors.FRONT: lambda seconds: self.ahead - self.position,
+            sensing.Sensors.REAR: lambda seconds: self.behind + self.position,
+        }))
+        monkeypatch.setattr(sensing.Distance, "FRONT", distance._UltrasonicSensor(self.sampler, sensing.Sensors.FRONT))
+        monkeypatch.setattr(sensing.Distance, "REAR", distance._UltrasonicSensor(self.sampler, sensing.Sensors.REAR))
+
+        # the main agent and the other agents communicate over a loopback bus
+        bus = interaction.LoopbackBus()
+        connection = communication._Connection._cls(interaction.LoopbackTransport(bus))
+        monkeypatch.setattr(communication._Connection, "_instance", connection)
+        self.others: Dict[str, communication._Connection] = {}
+
+        for signature in ["a", "f", "x"]:
+            self.others[signature] = communication._Connection._cls(interaction.LoopbackTransport(bus))
+            self.others[signature].signature = signature
+
+        self.others["x"].subscribe(interaction.Communication.Topics.PROCESS_FINISHED,
+                                   lambda message: self.finished.append(message.sender), False, False)
+
+        # the main agent is driven by the test instead of its own thread
+        monkeypatch.setattr(agent.MainAgent._cls, "_run", lambda main_agent: None)
+        monkeypatch.setattr(Formation, "_instance", Formation._cls())
+        monkeypatch.setattr(control.Driver, "_instantiated", False)
+        self.agent: agent.MainAgent = agent.MainAgent._cls()
+
+    @property
+    def position(self) -> float:
+        return self.stepper.position * driver._DISTANCE_PER_STEP
+
+    @property
+    def gap(self) -> float:
+        return self.ahead - self.position
+
+    def join(self, signature: str, ahead: str = None, filing: bool = False) -> None:
+        relation = _MemberRelation(_Member(signature, 40.0, datetime.now() if filing else None), ahead)
+        message = interaction.Message(signature, "lane/1/formation", relation.encode(), datetime.now())
+        self.agent._formation._handle_member_relation(message)
+
+    def finish(self, signature: str) -> None:
+        self.others[signature].send(interaction.Message(signature, interaction.Communication.Topics.PROCESS_FINISHED,
+                                                        None, datetime.now()))
+
+    def wait_for(self, condition, timeout: float = 5) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert condition()
+
+
+@pytest.fixture
+def lane(monkeypatch: pytest.MonkeyPatch) -> _Lane:
+    # set the attributes in the module's namespace to not read the attributes file
+    for name, value in [("SIGNATURE", "m"), ("DELTA", 40.0), ("LANE", 1)]:
+        monkeypatch.setitem(vars(attributes), name, value)
+
+    lane = _Lane(monkeypatch)
+
+    yield lane
+
+    lane.sampler.stop()
+    lane.agent._formation.stop()
+
+
+def _closed(lane: _Lane) -> bool:
+    # the minimum distance is half of the largest delta plus the safety distance (the simulated motor moves without
+    # delay, so that readings are outdated by the time the gap is planned and the gap may be closed slightly further)
+    return util.const.Driving.SAFETY_DISTANCE <= lane.gap <= 70 + control.compaction._TOLERANCE
+
+
+def test_minimize_space(lane: _Lane) -> None:
+    """ Tests whether the gap is closed before the agent ahead confirmed and confirmed only afterwards. """
+
+    lane.join("a")
+    lane.agent._formation._update("a", False)
+
+    thread = Thread(target=lane.agent.minimize_space)
+    thread.start()
+    lane.wait_for(lambda: _closed(lane))
+
+    # the agent ahead may still reopen the gap
+    time.sleep(0.2)
+    assert thread.is_alive() and lane.finished == []
+
+    lane.finish("a")
+    thread.join(5)
+
+    assert not thread.is_alive() and _closed(lane)
+    lane.wait_for(lambda: lane.finished == ["a", "m"])
+
+
+def test_minimize_space_timeout(lane: _Lane, monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether an agent ahead that never confirms is no longer waited for after a while. """
+
+    monkeypatch.setattr(agent, "_FINISH_TIMEOUT", 0.2)
+    lane.join("a")
+    lane.agent._formation._update("a", False)
+
+    start = time.monotonic()
+    lane.agent.minimize_space()
+
+    assert time.monotonic() - start >= 0.2 and _closed(lane)
+    lane.wait_for(lambda: lane.finished == ["m"])
+
+
+def test_create_space(lane: _Lane) -> None:
+    """ Tests whether space is created behind a leaving agent and minimized once it finished leaving. """
+
+    lane.join("a")
+    lane.join("f", "a", filing=True)
+    lane.agent._formation._update("f", False)
+
+    thread = Thread(target=lane.agent.create_space)
+    thread.start()
+
+    # the main agent backs up as long as the leaving agent leaves
+    lane.wait_for(lambda: lane.position < -20)
+    lane.finish("a")
+    assert thread.is_alive()
+
+    # afterwards, the gap up to the agent ahead of the leaving agent is closed
+    lane.ahead = 400
+    lane.finish("f")
+    thread.join(10)
+
+    assert not thread.is_alive() and _closed(lane) and lane.agent._standby
+
+    # the other agents publish independently of each other but the main agent confirms after both
+    lane.wait_for(lambda: len(lane.finished) == 3)
+    assert sorted(lane.finished[:2]) == ["a", "f"] and lane.finished[2] == "m"
+
+
+def test_create_space_while_filing(lane: _Lane) -> None:
+    """ Tests whether the main agent does not create space for itself if it is the leaving agent. """
+
+    lane.join("a")
+    lane.join("f", "m")
+    lane.agent._formation._update("a", True)
+
+    lane.agent.create_space()
+
+    assert lane.position == 0 and lane.agent._standby
+
+
+def test_failing_action(lane: _Lane, monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether the main agent returns to standby after an action failed. """
+
+    standby = []
+
+    def fail(main_agent: agent.MainAgent, finished: Set[str] = None) -> None:
+        standby.append(main_agent._standby)
+        raise RuntimeError("The driving motor failed.")
+
+    monkeypatch.setattr(agent.MainAgent._cls, "_minimize_space", fail)
+
+    with pytest.raises(RuntimeError):
+        lane.agent.minimize_space()
+
+    assert standby == [False] and lane.agent._standby
@@ -0,0 +1,41 @@
+import numpy as np
+
+import sensing
+
+
+def _frames(count: int) -> list:
+    return [np.full((16, 32, 3), value, np.uint8) for value in range(count)]
+
+
+def test_latest_frame() -> None:
+    """ Tests whether captured frames are borrowed in order and without copies of the ring buffers. """
+
+    capture = sensing.Capture(sensing.ArraySource(_frames(5), framerate=200))
+    capture.start()
+
+    with capture.frame(timeout=5) as first:
+        assert first is not None and first.image.shape == (16, 32, 3)
+        number, value = first.number, first.image[0, 0, 0]
+
+        # the borrowed buffer is not overwritten while newer frames are captured
+        with capture.frame(newer_than=number + 5, timeout=5) as later:
+            assert later.number > number + 5
+            assert first.image[0, 0, 0] == value
+            assert not np.shares_memory(first.image, later.image)
+
+    capture.stop()
+
+
+def test_file_source(tmp_path) -> None:
+    """ Tests whether raw RGB frames are read from a file repeatedly. """
+
+    path = tmp_path / "frames.rgb"
+    path.write_bytes(b"".join(frame.tobytes() for frame in _frames(3)))
+
+    capture = sensing.Capture(sensing.FileSource(str(path), (32, 16)))
+    capture.start()
+
+    with capture.frame(newer_than=4, timeout=5) as frame:
+        assert frame.image[0, 0, 0] == (frame.number - 1) % 3
+
+    capture.stop()
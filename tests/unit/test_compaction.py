@@ -0,0 +1,25 @@
+from control.compaction import GapCloser, wave_delay
+
+
+def test_gap_closer() -> None:
+    """ Tests whether the planned distance closes the gap without undercutting the safety distance. """
+
+    closer = GapCloser(minimum_distance=60, tolerance=2)
+
+    assert closer.distance(100) == 40
+    assert closer.distance(100, free_distance=25) == 25
+    assert closer.distance(61.5) == 0  # within the tolerance
+    assert closer.distance(40) == 0  # closer than the minimum distance
+
+    # finished only once the gap is closed and the vehicle ahead finished
+    assert not closer.finished(40, True)
+    assert not closer.finished(0, False)
+    assert closer.finished(0, True)
+
+
+def test_wave_delay() -> None:
+    """ Tests whether vehicles further from the gap start later. """
+
+    assert wave_delay(0) == 0
+    assert wave_delay(3, stagger=0.5) == 1.5
+    assert wave_delay(1) < wave_delay(2)
@@ -0,0 +1,171 @@
+import time
+from threading import Lock
+
+import pytest
+
+import sensing
+import util
+from sensing import distance
+
+
+def test_ring_buffer() -> None:
+    """ Tests whether the ring buffer keeps the latest samples only. """
+
+    buffer = distance._RingBuffer(4)
+    assert buffer.latest() is None and buffer.window(3) == []
+
+    for value in range(6):
+        buffer.append(float(value), value)
+
+    assert buffer.latest() == (5.0, 5)
+    assert buffer.window(3) == [3.0, 4.0, 5.0]
+    assert buffer.window(10) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_sampler() -> None:
+    """ Tests whether every sensor is sampled at its own rate from a simulated source. """
+
+    source = sensing.SimulatedSource({sensing.Sensors.FRONT: lambda seconds: 500 - 100 * seconds})
+    sampler = sensing.Sampler(source, {sensing.Sensors.FRONT: 200, sensing.Sensors.REAR: 50})
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+    rear = distance._UltrasonicSensor(sampler, sensing.Sensors.REAR)
+
+    time.sleep(0.1)
+    assert sampler.buffers[sensing.Sensors.FRONT].count == 0  # sampling starts with the first reading
+
+    assert rear.value == 1000
+    time.sleep(0.2)
+    sampler.stop()
+
+    assert 400 < front.value < 500 and front.median() <= 500 and front.age < 0.1
+    assert sampler.buffers[sensing.Sensors.FRONT].count > 2 * sampler.buffers[sensing.Sensors.REAR].count
+
+
+def test_watch() -> None:
+    """ Tests whether crossing a threshold sets the wake-up of the sensor. """
+
+    source = sensing.SimulatedSource({sensing.Sensors.FRONT: lambda seconds: 100 + 1000 * seconds})
+    sampler = sensing.Sampler(source, {sensing.Sensors.FRONT: 200})
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+    near, far = util.Wakeup(), util.Wakeup()
+
+    # watching samples without anything reading the sensor
+    front.watch(150, near)
+    front.watch(10000, far)
+
+    assert near.wait(1)
+    sampler.stop()
+    assert near.count == 1 and not far.is_set
+
+
+def test_fresh_reading() -> None:
+    """ Tests whether readings older than the maximum age are refreshed on request. """
+
+    sampler = sensing.Sampler(sensing.SimulatedSource(), {sensing.Sensors.FRONT: 1})
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+
+    assert front.value == 1000
+    time.sleep(0.05)
+
+    stale = front.read(0.01, block=False)
+    assert stale.age >= 0.05 and front.misses == 1
+
+    # the sampler is asked for a sample long before the next one is due
+    fresh = front.read(0.01)
+    assert fresh.age < 0.04 and front.misses == 2
+
+    assert front.read(1).age < 1 and front.hits == 1
+    assert front.staleness.count == 3
+
+    sampler.stop()
+
+
+def test_snapshot() -> None:
+    """ Tests whether snapshots contain the latest sample of every sensor and are replaced instead of modified. """
+
+    sampler = sensing.Sampler(sensing.SimulatedSource({sensing.Sensors.RIGHT: lambda seconds: 300}),
+                              {sensing.Sensors.FRONT: 100, sensing.Sensors.RIGHT: 100})
+
+    first = sampler.complete_snapshot()
+    assert first.front.value == 1000 and first.right.value == 300 and first.rear is None
+    assert first.age < 1
+
+    time.sleep(0.05)
+    latest = sampler.complete_snapshot()
+    sampler.stop()
+
+    assert latest.timestamp > first.timestamp and latest.front.timestamp > first.front.timestamp
+    assert first.front.timestamp <= first.timestamp
+
+
+class _FailingSource(sensing.SignalSource):
+    """ Source of which the front sensor fails a given number of times before measuring a constant distance. """
+
+    def __init__(self, failures: int):
+        self.failures: int = failures
+
+    def read(self, sensor: str) -> float:
+        if sensor == sensing.Sensors.FRONT and self.failures > 0:
+            self.failures -= 1
+            raise OSError("The echo of the sensor timed out.")
+
+        return 500
+
+
+def test_failing_sensor(monkeypatch) -> None:
+    """ Tests whether failed readings are skipped and sampling stops if a sensor keeps failing. """
+
+    monkeypatch.setattr(distance, "_MAX_ERRORS", 3)
+
+    sampler = sensing.Sampler(_FailingSource(2), {sensing.Sensors.FRONT: 200})
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+
+    assert front.value == 500 and sampler.errors == 2 and sampler.failure is None
+    sampler.stop()
+
+    # readers fail instead of waiting for samples that are never taken
+    sampler = sensing.Sampler(_FailingSource(3), {sensing.Sensors.FRONT: 200})
+    front = distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT)
+
+    with pytest.raises(AssertionError):
+        front.read(0.1)
+
+    assert sampler.errors == 3 and isinstance(sampler.failure, OSError)
+
+    with pytest.raises(AssertionError):
+        sampler.request("roof")
+
+
+class _SlowSource(sensing.SignalSource):
+    """ Source keeping track of the number of readings taken at the same time. """
+
+    def __init__(self):
+        self.readings: int = 0
+        self.max_readings: int = 0
+        self._lock: Lock = Lock()
+
+    def read(self, sensor: str) -> float:
+        with self._lock:
+            self.readings += 1
+            self.max_readings = max(self.max_readings, self.readings)
+
+        time.sleep(0.02)
+
+        with self._lock:
+            self.readings -= 1
+
+        return 500
+
+
+def test_restart() -> None:
+    """ Tests whether restarting a sampler right after stopping it never samples in two threads at the same time. """
+
+    source = _SlowSource()
+    sampler = sensing.Sampler(source, {sensing.Sensors.FRONT: 100})
+
+    for _ in range(5):
+        sampler.start()
+        time.sleep(0.01)
+        sampler.stop()
+
+    assert source.readings == 0 and source.max_readings == 1
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import sensing
+import util
+from control import driver
+from control.motion import SimulatedStepper
+from sensing import distance
+
+_GAP: float = 100  # mm to the vehicle ahead at the initial position
+
+
+@pytest.fixture
+def stepper(monkeypatch: pytest.MonkeyPatch) -> SimulatedStepper:
+    # simulated driving motor and front and rear sensors measuring the gaps to vehicles standing still
+    stepper = SimulatedStepper(realtime=False)
+    monkeypatch.setattr(driver, "DRIVING_MOTOR", util.Backend("simulated driving motor", lambda: stepper))
+
+    def position() -> float:
+        return stepper.position * driver._DISTANCE_PER_STEP
+
+    sampler = sensing.Sampler(sensing.SimulatedSource({
+        sensing.Sensors.FRONT: lambda seconds: _GAP - position(),
+        sensing.Sensors.REAR: lambda seconds: _GAP + position(),
+    }))
+    monkeypatch.setattr(sensing.Distance, "FRONT", distance._UltrasonicSensor(sampler, sensing.Sensors.FRONT))
+    monkeypatch.setattr(sensing.Distance, "REAR", distance._UltrasonicSensor(sampler, sensing.Sensors.REAR))
+
+    yield stepper
+
+    sampler.stop()
+
+
+def test_drive_for_distance(stepper: SimulatedStepper) -> None:
+    """ Tests whether modes drive the given distances in their direction and keep track of them. """
+
+    vehicle = driver.Driver._cls()
+
+    forward = vehicle.forward
+    assert forward.do_for(10).done
+    assert stepper.position == 800
+    assert forward.odometer.distance == pytest.approx(10)
+
+    backward = vehicle.backward
+    backward.do_for(4)
+    assert stepper.position == 480
+    assert backward.odometer.distance == pytest.approx(-4) and backward.odometer.steps == -320
+    assert vehicle.odometer.distance == pytest.approx(6) and vehicle.odometer.total_distance == pytest.approx(14)
+
+
+def test_safety_distance(stepper: SimulatedStepper) -> None:
+    """ Tests whether driving towards a standing vehicle stops before the safety distance. """
+
+    vehicle = driver.Driver._cls()
+    mode = vehicle.forward
+    motion = mode.do_while(lambda: True, block=False)
+
+    # wait for the vehicle to stand still
+    steps, deadline = -1, time.monotonic() + 5
+    while motion.steps != steps and time.monotonic() < deadline:
+        steps = motion.steps
+        time.sleep(0.3)
+
+    gap = _GAP - mode.odometer.distance
+    assert util.const.Driving.SAFETY_DISTANCE <= gap < util.const.Driving.SAFETY_DISTANCE + 25
+
+    mode.stop()
+    assert motion.wait(1) and motion.cancelled
@@ -0,0 +1,50 @@
+import pytest
+
+from control.estimation import GapEstimator
+
+_SECOND: int = 1_000_000_000  # ns
+
+
+def test_prediction() -> None:
+    """ Tests whether movements shrink the estimated gap and grow its uncertainty. """
+
+    estimator = GapEstimator(measurement_variance=100, process_variance=0, slip_variance=1)
+    assert estimator.estimate(0) is None
+
+    estimator.measure(500, 1)
+    estimate = estimator.estimate(1)
+    assert estimate.gap == 500 and estimate.deviation == pytest.approx(10)
+
+    estimator.move(100, 2)
+    estimate = estimator.estimate(2)
+    assert estimate.gap == 400 and estimate.deviation == pytest.approx(200 ** 0.5)
+    assert estimate.lower_bound(2) == pytest.approx(400 - 2 * 200 ** 0.5)
+
+
+def test_delayed_measurement() -> None:
+    """ Tests whether measurements taken before a movement are compared to the gap before the movement. """
+
+    estimator = GapEstimator(measurement_variance=100, process_variance=0, slip_variance=0)
+    estimator.measure(500, _SECOND)
+    estimator.move(100, 3 * _SECOND)
+
+    # the measurement was taken before the movement -> it confirms the estimate
+    estimator.measure(500, 2 * _SECOND)
+    assert estimator.estimate(3 * _SECOND).gap == pytest.approx(400)
+
+    # measurements older than the latest fused one are ignored
+    estimator.measure(0, _SECOND)
+    assert estimator.estimate(3 * _SECOND).gap == pytest.approx(400)
+
+    # a measurement after the movement corrects the estimate
+    estimator.measure(380, 4 * _SECOND)
+    assert 380 < estimator.estimate(4 * _SECOND).gap < 400
+
+
+def test_uncertainty_over_time() -> None:
+    """ Tests whether the uncertainty grows while there are no measurements. """
+
+    estimator = GapEstimator(measurement_variance=100, process_variance=100, slip_variance=0)
+    estimator.measure(500, 0)
+
+    assert estimator.estimate(3 * _SECOND).deviation == pytest.approx(20)
@@ -0,0 +1,321 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+from threading import Thread
+from typing import Callable, List
+
+import pytest
+
+import attributes
+import interaction
+import util
+from interaction import communication
+from interaction.formation import Formation, _BroadcastPolicy, _Member, _MemberList, _MemberRelation, _RelationGraph
+from interaction.formation import _partition_topic, _topic_partition
+
+
+@pytest.fixture
+def formation(monkeypatch: pytest.MonkeyPatch) -> Formation:
+    """ Formation of the main agent "m" in lane 1 communicating over a loopback bus. """
+
+    # set the attributes in the module's namespace to not read the attributes file
+    for name, value in [("SIGNATURE", "m"), ("DELTA", 1.0), ("LANE", 1)]:
+        monkeypatch.setitem(vars(attributes), name, value)
+
+    connection = communication._Connection._cls(interaction.LoopbackTransport(interaction.LoopbackBus()))
+    monkeypatch.setattr(communication._Connection, "_instance", connection)
+    formation = Formation._cls()
+
+    yield formation
+
+    formation.stop()
+
+
+def _members(signatures: List[str]) -> _MemberList:
+    return _MemberList([_Member(signature, 1.0, None) for signature in signatures])
+
+
+def test_member_lookup() -> None:
+    """ Tests whether members are found by their signature. """
+
+    members = _members(["a", "b", "c"])
+
+    assert members.member("b").signature == "b"
+    assert members.position("c") == 2
+    assert "a" in members and _Member("c", 0.0, None) in members
+    assert "d" not in members
+
+    with pytest.raises(AssertionError):
+        members.member("d")
+
+
+def test_positional_queries() -> None:
+    """ Tests whether the order of and the distance between members is determined correctly. """
+
+    members = _members(["a", "b", "c", "d", "e"])
+
+    assert members.comes_before("a", "c")
+    assert not members.comes_before("c", "a")
+    assert not members.comes_before("b", "b")
+    assert members.distance("a", "e") == 3
+    assert members.distance("d", "c") == 0
+    assert [member.signature for member in members.between("e", "b")] == ["c", "d"]
+    assert members.between("a", "b") == []
+
+    with pytest.raises(AssertionError):
+        members.distance("a", "a")
+
+
+def test_relation_graph_transitivity() -> None:
+    """ Tests whether the linear transitivity of a member follows changing relations. """
+
+    graph = _RelationGraph()
+
+    for signature, ahead in [("a", None), ("b", "a"), ("c", "b"), ("x", None)]:
+        graph.add(_MemberRelation(_Member(signature, 1.0, None), ahead))
+
+    assert [member.signature for member in graph.linear_transitivity("c")] == ["a", "b", "c"]
+
+    # c moves behind x
+    graph.add(_MemberRelation(_Member("c", 1.0, None), "x"))
+    assert [member.signature for member in graph.linear_transitivity("c")] == ["x", "c"]
+    assert [member.signature for member in graph.linear_transitivity("a")] == ["a", "b"]
+
+    # a leaves so that b becomes a starting vertex
+    graph.remove("a")
+    assert [member.signature for member in graph.linear_transitivity("b")] == ["b"]
+    assert graph.linear_transitivity("a") is None
+
+
+def test_member_list_rebuilt_on_change(formation: Formation) -> None:
+    """ Tests whether the signature index of the members is only rebuilt if the members changed. """
+
+    index = formation._members
+    formation.members = [_Member("m", 1.0, None)]
+    assert formation._members is index
+
+    formation.members = [_Member("a", 1.0, None), _Member("m", 1.0, None)]
+    assert formation._members is not index and formation._members.position("m") == 1
+
+
+def test_heartbeats_without_updates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether heartbeats keep the main agent alive while it does not update its formation, e.g. during actions.
+    """
+
+    for name, value in [("SIGNATURE", "m"), ("DELTA", 1.0), ("LANE", 1)]:
+        monkeypatch.setitem(vars(attributes), name, value)
+
+    bus = interaction.LoopbackBus()
+    connection = communication._Connection._cls(interaction.LoopbackTransport(bus))
+    monkeypatch.setattr(communication._Connection, "_instance", connection)
+    formation = Formation._cls(heartbeat_interval=0.05, refresh_interval=60)
+
+    # another agent which only hears of the main agent's member relation once
+    other = communication._Connection._cls(interaction.LoopbackTransport(bus))
+    other.signature = "a"
+    heartbeats: List[float] = []
+    other.subscribe("lane/1/formation-heartbeat", lambda message: heartbeats.append(time.monotonic()), False, False)
+
+    formation._update(None, False)
+    start = time.monotonic()
+    time.sleep(0.5)
+    formation.stop()
+
+    # peers with a member TTL of a few heartbeat intervals never expire the main agent
+    intervals = [later - earlier for earlier, later in zip([start] + heartbeats, heartbeats)]
+    assert len(heartbeats) >= 3 and max(intervals) < 0.3
+
+
+def test_filing_member(formation: Formation) -> None:
+    """ Tests whether the member with the earliest filing is the filing member and there is none without filings. """
+
+    formation._add(1, _MemberRelation(_Member("a", 1.0, None), None))
+    formation._update("a", False)
+    assert formation.filing_member is None
+
+    formation._add(1, _MemberRelation(_Member("a", 1.0, datetime(2020, 1, 1)), None))
+    formation._update("a", True)
+    assert formation.filing_member.signature == "a"
+
+
+def test_filing_wakes_up_once(formation: Formation) -> None:
+    """ Tests whether the main agent is only woken up once it starts or stops filing and not on every update. """
+
+    formation.wakeup = util.Wakeup()
+
+    for _ in range(3):
+        formation._update(None, True)
+
+    filing = formation.members[0].filing
+    assert filing is not None and formation.wakeup.count == 1
+
+    for _ in range(3):
+        formation._update(None, True)
+
+    assert formation.members[0].filing == filing and formation.wakeup.count == 1
+
+    formation._update(None, False)
+    assert formation.members[0].filing is None and formation.wakeup.count == 2
+
+
+def _relation_message(signature: str, ahead: str, partition: int = 1) -> interaction.Message:
+    relation = _MemberRelation(_Member(signature, 1.0, None), ahead)
+    return interaction.Message(signature, f"lane/{partition}/formation", relation.encode(), datetime.now())
+
+
+def test_broadcast_policy() -> None:
+    """ Tests whether unchanged relations are only broadcast as heartbeats and refreshed now and then. """
+
+    policy = _BroadcastPolicy(heartbeat_interval=10, refresh_interval=60)
+    relation = _MemberRelation(_Member("m", 1.0, None), "a")
+    decisions = [policy.decide(relation, now) for now in [0, 5, 10, 15, 20]]
+
+    assert decisions == [_BroadcastPolicy.Decision.RELATION, _BroadcastPolicy.Decision.NONE,
+                         _BroadcastPolicy.Decision.HEARTBEAT, _BroadcastPolicy.Decision.NONE,
+                         _BroadcastPolicy.Decision.HEARTBEAT]
+
+    # changes, refreshes and resets broadcast the relation
+    assert policy.decide(_MemberRelation(_Member("m", 1.0, None), "b"), 21) == _BroadcastPolicy.Decision.RELATION
+    assert policy.decide(_MemberRelation(_Member("m", 1.0, None), "b"), 81) == _BroadcastPolicy.Decision.RELATION
+    policy.reset()
+    assert policy.decide(_MemberRelation(_Member("m", 1.0, None), "b"), 82) == _BroadcastPolicy.Decision.RELATION
+
+
+def test_unchanged_relation_not_broadcast(formation: Formation, monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether the formation only broadcasts its relation once while it does not change. """
+
+    sent = []
+    monkeypatch.setattr(formation, "send", lambda topic, content: sent.append(topic))
+
+    for _ in range(3):
+        formation._update("a", False)
+
+    assert sent == ["lane/1/formation"]
+
+
+def test_member_expiry(formation: Formation) -> None:
+    """ Tests whether members expire once they have not been heard of for the member TTL unless they send heartbeats.
+    """
+
+    formation._member_ttl = 0.5
+    formation._handle_member_relation(_relation_message("a", None))
+    formation._update("a", False)
+    assert [member.signature for member in formation] == ["a", "m"]
+
+    # heartbeats keep the member alive
+    time.sleep(0.3)
+    formation._handle_heartbeat(interaction.Message("a", "lane/1/formation-heartbeat", None, datetime.now()))
+    time.sleep(0.3)
+    formation._expire_members()
+    assert [member.signature for member in formation] == ["a", "m"]
+
+    # without heartbeats, the member expires while the main agent never does
+    time.sleep(0.6)
+    formation._expire_members()
+    assert [member.signature for member in formation] == ["m"]
+
+
+def test_concurrent_updates(formation: Formation) -> None:
+    """ Tests whether relations and heartbeats handled by several threads and updates of the main agent do not race.
+    """
+
+    formation._member_ttl = 0.001
+    errors = []
+
+    def run(function: Callable[[int], None]) -> None:
+        try:
+            for index in range(5000):
+                function(index)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [
+        Thread(target=run, args=(lambda index: formation._handle_member_relation(
+            _relation_message(f"a{index % 50}", f"a{index % 50 - 1}" if index % 50 else None)),)),
+        Thread(target=run, args=(lambda index: formation._handle_member_relation(
+            _relation_message(f"a{index % 50}", None, 2)),)),
+        Thread(target=run, args=(lambda index: formation._handle_heartbeat(
+            interaction.Message(f"a{index % 50}", "lane/1/formation-heartbeat", None, datetime.now())),)),
+        Thread(target=run, args=(lambda index: formation._update(f"a{index % 50}", False),))
+    ]
+
+    # switch threads as often as possible to provoke races
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+
+
+def test_partition_topics(formation: Formation) -> None:
+    """ Tests whether formation topics are partitioned by lane and the own and neighbouring lanes are listened to. """
+
+    assert _partition_topic("formation", 3) == "lane/3/formation"
+    assert _partition_topic("formation") == "lane/+/formation"
+    assert _topic_partition("lane/3/formation-heartbeat") == 3
+
+    listened = [partition for partition in range(5)
+                if formation._connection.router.match(_partition_topic("formation", partition))]
+    assert listened == [0, 1, 2]
+
+
+def test_partition_migration(formation: Formation) -> None:
+    """ Tests whether members moving to another partition are evicted and the main agent follows the member ahead. """
+
+    formation._handle_member_relation(_relation_message("a", None))
+    formation._handle_member_relation(_relation_message("b", None, 2))
+    formation._update("a", False)
+    assert [member.signature for member in formation] == ["a", "m"]
+
+    # a moves to the neighbouring lane and is evicted
+    formation._handle_member_relation(_relation_message("a", "b", 2))
+    assert [member.signature for member in formation] == ["m"]
+
+    # the main agent follows a into its lane where b is known already
+    formation._update("a", False)
+    assert formation.partition == 2
+    assert [member.signature for member in formation] == ["b", "a", "m"]
+
+    listened = [partition for partition in range(5)
+                if formation._connection.router.match(_partition_topic("formation", partition))]
+    assert listened == [1, 2, 3]
+
+
+def test_asynchronous_formation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether a formation sharing an asynchronous connection handles member relations on the event loop. """
+
+    for name, value in [("SIGNATURE", "m"), ("DELTA", 1.0), ("LANE", 1)]:
+        monkeypatch.setitem(vars(attributes), name, value)
+
+    # threads of other formations may end in the meantime, so only new threads are looked for
+    threads = set(threading.enumerate())
+
+    async def run() -> Formation:
+        bus = interaction.LoopbackBus()
+        connection = communication._Connection._cls(interaction.LoopbackTransport(bus), asynchronous=True)
+        monkeypatch.setattr(communication._Connection, "_instance", connection)
+        formation = Formation._cls()
+
+        other = communication._Connection._cls(interaction.LoopbackTransport(bus), asynchronous=True)
+        other.signature = "a"
+        other.send(_relation_message("a", None))
+
+        # the relation is handled on the next iteration of the event loop
+        await asyncio.sleep(0)
+        formation._update("a", False)
+
+        return formation
+
+    formation = asyncio.run(run())
+
+    assert [member.signature for member in formation] == ["a", "m"]
+    assert set(threading.enumerate()) <= threads
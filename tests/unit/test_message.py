@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import interaction
+from interaction.formation import _Member, _MemberRelation, _partition_topic
+
+
+def test_binary_round_trip() -> None:
+    """ Tests whether a formation message survives binary encoding and decoding. """
+
+    filing = datetime(2021, 3, 22, 12, 30, 15, 250000)
+    relation = _MemberRelation(_Member("a", 12.5, filing), "b")
+    topic = _partition_topic(interaction.Communication.Topics.FORMATION, 0)
+    message = interaction.Message("a", topic, relation.encode(), datetime.now())
+
+    decoded = interaction.Message.decode_payload(message.encode_binary())
+    decoded_relation = _MemberRelation.decode(decoded.content)
+
+    assert decoded.sender == message.sender and decoded.topic == message.topic
+    assert abs(decoded.date.timestamp() - message.date.timestamp()) < 1e-6
+    assert decoded_relation.member.signature == "a" and decoded_relation.ahead_signature == "b"
+    assert decoded_relation.member.delta == 12.5
+    assert decoded_relation.member.filing == filing
+
+
+def test_generic_content() -> None:
+    """ Tests whether messages of topics without a codec are decoded from both formats. """
+
+    message = interaction.Message("a", "generic", {"value": [1, 2, None]}, datetime.now())
+
+    for payload in [message.encode_binary(), message.encode().encode()]:
+        decoded = interaction.Message.decode_payload(payload)
+        assert decoded.content == message.content and decoded.topic == "generic"
@@ -0,0 +1,159 @@
+import math
+import time
+
+import pytest
+
+import util
+from control.motion import A4988Stepper, Guard, Motion, MotionEngine, Profile, SimulatedStepper
+
+
+class _Gap(Guard):
+    """ Guard of a static gap of a number of steps which may be blocked. """
+
+    def __init__(self, steps: float = math.inf):
+        self.steps = steps
+        self.blocked = False
+        self.moved_steps = 0
+
+    def clearance(self, forward: bool) -> float:
+        return 0 if self.blocked else self.steps - self.moved_steps
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(0.001)
+
+    def moved(self, forward: bool, steps: int) -> None:
+        self.moved_steps += steps
+
+
+def _engine(realtime: bool = False, profile: Profile = None) -> MotionEngine:
+    stepper = SimulatedStepper(realtime)
+    engine = MotionEngine(util.Backend("stepper", lambda: stepper), profile)
+    engine.stepper = stepper
+    return engine
+
+
+def test_bounded_motions() -> None:
+    """ Tests whether queued motions move exactly their number of steps in their direction one after another. """
+
+    engine = _engine()
+    forward = engine.submit(Motion(True, 250, unit=80))
+    backward = engine.submit(Motion(False, 50, unit=80))
+
+    assert backward.wait(1) and forward.done
+    assert forward.steps == 250 and backward.steps == 50 and engine.stepper.position == 200
+
+
+def test_cancel_at_step_granularity() -> None:
+    """ Tests whether a cancelled motion stops after the current step instead of finishing its unit. """
+
+    engine = _engine(True, Profile(1000))
+    motion = engine.submit(Motion(True, unit=1000))
+    time.sleep(0.02)
+    motion.cancel()
+
+    assert motion.wait(1)
+    assert 0 < motion.steps < 1000 and engine.stepper.position == motion.steps
+
+
+def test_decelerate_after_cancel() -> None:
+    """ Tests whether a cancelled motion decelerates to the start speed instead of stopping at full speed. """
+
+    engine = _engine(True, Profile(100, 1000, 20000))
+    motion = engine.submit(Motion(True, unit=1000))
+    time.sleep(0.1)
+    motion.cancel()
+
+    assert motion.wait(1)
+
+    # the step intervals get longer from the last step at full speed to the last step at the start speed
+    intervals = engine.stepper.intervals
+    full_speed = max(index for index, interval in enumerate(intervals) if interval == pytest.approx(1 / 1000))
+    assert len(intervals) - full_speed > 10 and intervals[-1] == pytest.approx(1 / 100)
+    assert all(earlier < later for earlier, later in zip(intervals[full_speed:], intervals[full_speed + 1:]))
+
+
+def test_blocked_motion_resumes() -> None:
+    """ Tests whether a blocked motion moves as soon as its guard allows it and reports its movements. """
+
+    engine = _engine()
+    guard = _Gap()
+    guard.blocked = True
+    motion = engine.submit(Motion(True, 100, guard=guard, unit=40))
+
+    assert not motion.wait(0.05) and motion.steps == 0
+
+    guard.blocked = False
+
+    assert motion.wait(1) and motion.steps == guard.moved_steps == 100
+
+
+def test_trapezoidal_profile() -> None:
+    """ Tests whether the speeds accelerate and decelerate within the limits and stop at the start speed. """
+
+    profile = Profile(100, 400, 2000)
+    engine = _engine(profile=profile)
+    engine.submit(Motion(True, 500, unit=80)).wait(1)
+
+    speeds = [1 / interval for interval in engine.stepper.intervals]
+    assert len(speeds) == 500 and max(speeds) == pytest.approx(400)
+    assert speeds[0] >= 100 and speeds[-1] == pytest.approx(100)
+    assert all(abs(second ** 2 - first ** 2) <= 2 * 2000 + 1e-6 for first, second in zip(speeds, speeds[1:]))
+    assert engine.stepper.elapsed == pytest.approx(profile.duration(500))
+    assert profile.duration(500) < Profile(100).duration(500)
+
+
+def test_stop_within_clearance() -> None:
+    """ Tests whether an unbounded motion decelerates to the start speed at the end of the clearance. """
+
+    engine = _engine(profile=Profile(100, 400, 2000))
+    guard = _Gap(330.5)
+    motion = engine.submit(Motion(True, condition=lambda: guard.clearance(True) >= 1, guard=guard, unit=80))
+
+    assert motion.wait(1) and motion.steps == 330
+    assert 1 / engine.stepper.intervals[-1] == pytest.approx(100, rel=0.1)
+
+
+class _Gpio:
+    OUT = "out"
+
+    def __init__(self):
+        self.setups = []
+        self.outputs = []
+
+    def setup(self, pins, mode: str) -> None:
+        self.setups.append(pins)
+
+    def output(self, pin: int, level: bool) -> None:
+        self.outputs.append((pin, level))
+
+
+class _A4988Nema:
+    direction_pin = 20
+    step_pin = 21
+    mode_pins = (24, 25, 26)
+
+    def __init__(self):
+        self.step_types = []
+
+    def resolution_set(self, step_type: str) -> None:
+        self.step_types.append(step_type)
+
+    def motor_go(self, *args, **kwargs) -> None:
+        raise AssertionError("The pins must not be set up for every step.")
+
+
+def test_a4988_pins() -> None:
+    """ Tests whether the pins are set up once and steps only toggle the step pin and the direction pin if needed. """
+
+    gpio, nema = _Gpio(), _A4988Nema()
+    stepper = A4988Stepper(nema, gpio)
+
+    assert gpio.setups == [20, 21, (24, 25, 26)] and nema.step_types == ["Full"]
+
+    stepper.step(True, 0.001)
+    stepper.step(True, 0.001)
+    stepper.step(False, 0.001)
+
+    assert gpio.setups == [20, 21, (24, 25, 26)]
+    assert gpio.outputs == [(20, True), (21, True), (21, False), (21, True), (21, False),
+                            (20, False), (21, True), (21, False)]
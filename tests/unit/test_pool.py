@@ -0,0 +1,81 @@
+import time
+from threading import Event
+from typing import Callable, List
+
+import util
+
+
+def _blocked(pool: util.WorkerPool) -> Event:
+    """ Blocks the single worker of a pool until the returned event is set. """
+
+    started, release = Event(), Event()
+    pool.submit("block", lambda: (started.set(), release.wait()))
+    assert started.wait(1)
+
+    return release
+
+
+def _wait(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_ordering() -> None:
+    """ Tests whether tasks with the same ordering key are executed in the order they were submitted. """
+
+    pool = util.WorkerPool("T-Test", 4, 1000)
+    executed: List[int] = []
+
+    for index in range(500):
+        pool.submit("formation", lambda index=index: executed.append(index))
+
+    _wait(lambda: len(executed) == 500)
+    assert executed == list(range(500))
+
+
+def test_coalescing() -> None:
+    """ Tests whether only the latest pending task per coalesce key is executed. """
+
+    pool = util.WorkerPool("T-Test", 1, 10)
+    executed: List[str] = []
+    release = _blocked(pool)
+
+    for index in range(3):
+        pool.submit("formation", lambda index=index: executed.append(f"a{index}"), coalesce_key="a")
+        pool.submit("formation", lambda index=index: executed.append(f"b{index}"), coalesce_key="b")
+
+    release.set()
+    _wait(lambda: len(executed) == 2)
+
+    # the pending tasks keep their position in the queue
+    assert executed == ["a2", "b2"] and pool.coalesced == 4
+
+
+def test_drop_newest() -> None:
+    """ Tests whether tasks submitted to a full queue are rejected. """
+
+    pool = util.WorkerPool("T-Test", 1, 2, util.OverflowPolicy.DROP_NEWEST)
+    executed: List[int] = []
+    release = _blocked(pool)
+
+    assert [pool.submit("formation", lambda index=index: executed.append(index)) for index in range(4)] == \
+           [True, True, False, False]
+
+    release.set()
+    _wait(lambda: pool.depth == 0 and len(executed) == 2)
+    assert executed == [0, 1] and pool.dropped == 2
+
+
+def test_drop_oldest() -> None:
+    """ Tests whether the oldest pending tasks are discarded for tasks submitted to a full queue. """
+
+    pool = util.WorkerPool("T-Test", 1, 2, util.OverflowPolicy.DROP_OLDEST)
+    executed: List[int] = []
+    release = _blocked(pool)
+
+    assert all(pool.submit("formation", lambda index=index: executed.append(index)) for index in range(4))
+
+    release.set()
+    _wait(lambda: pool.depth == 0 and len(executed) == 2)
+    assert executed == [2, 3] and pool.dropped == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from interaction.routing import Router
+
+
+def test_exact_and_multiple_subscribers() -> None:
+    """ Tests whether every subscriber of a topic is matched. """
+
+    router = Router()
+
+    assert router.add("formation", "a")
+    assert not router.add("formation", "b")
+    assert router.match("formation") == ["a", "b"]
+    assert router.match("formation/lane") == []
+    assert router.match("process-finished") == []
+
+
+def test_wildcards() -> None:
+    """ Tests whether single-level and multi-level wildcards match according to MQTT. """
+
+    router = Router()
+    router.add("lane/+/formation", "single")
+    router.add("lane/#", "multi")
+    router.add("#", "all")
+
+    assert sorted(router.match("lane/3/formation")) == ["all", "multi", "single"]
+    assert sorted(router.match("lane")) == ["all", "multi"]
+    assert sorted(router.match("lane/3/heartbeat")) == ["all", "multi"]
+    assert router.match("other") == ["all"]
+
+    with pytest.raises(AssertionError):
+        router.add("lane/#/formation", "invalid")
+
+    with pytest.raises(AssertionError):
+        router.add("lane/3+", "invalid")
+
+
+def test_remove() -> None:
+    """ Tests whether removed subscribers are no longer matched. """
+
+    router = Router()
+    router.add("lane/+", "a")
+    router.add("lane/+", "b")
+
+    assert not router.remove("lane/+", "a")
+    assert router.match("lane/1") == ["b"]
+    assert router.remove("lane/+", "b")
+    assert router.match("lane/1") == []
+    assert router.remove("unknown/topic", "c")
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import pytest
+
+import sensing
+import util
+from sensing import scanner
+
+
+def _decode(image: np.ndarray) -> List[SimpleNamespace]:
+    """ Stands in for zbar by "decoding" the bounding box of white pixels. """
+
+    rows, columns = np.nonzero(image == 255)
+    if len(rows) == 0:
+        return []
+
+    rect = (columns.min(), rows.min(), columns.max() - columns.min() + 1, rows.max() - rows.min() + 1)
+    return [SimpleNamespace(data=b"ahead", rect=rect)]
+
+
+@pytest.fixture(autouse=True)
+def fake_zbar(monkeypatch) -> None:
+    monkeypatch.setattr(scanner, "ZBAR", util.Backend("fake zbar", lambda: _decode))
+
+
+def _frame(left: int, top: int) -> np.ndarray:
+    frame = np.zeros((200, 400), np.uint8)
+    frame[top:top + 20, left:left + 20] = 255
+    return frame
+
+
+def test_passes() -> None:
+    """ Tests whether QR codes are searched in the tracked region, the region of interest and the whole frame. """
+
+    decoder = sensing.QrDecoder()
+
+    assert decoder.decode(_frame(180, 90)) == "ahead"
+    assert decoder.hits[sensing.QrDecoder.Pass.DOWNSCALED] == 1
+    assert decoder.last_region == (180, 90, 20, 20)
+
+    assert decoder.decode(_frame(185, 95)) == "ahead"
+    assert decoder.hits[sensing.QrDecoder.Pass.TRACKED] == 1
+
+    assert decoder.decode(_frame(0, 0)) == "ahead"
+    assert decoder.hits[sensing.QrDecoder.Pass.FULL] == 1
+
+    assert decoder.decode(np.zeros((200, 400), np.uint8)) is None
+    assert decoder.misses == 1 and decoder.last_region is None
+
+
+def test_rgb_frames() -> None:
+    """ Tests whether RGB frames are decoded via their green channel. """
+
+    decoder = sensing.QrDecoder(track=False)
+
+    assert decoder.decode(np.repeat(_frame(180, 90)[:, :, np.newaxis], 3, axis=2)) == "ahead"
+    assert decoder.hits[sensing.QrDecoder.Pass.DOWNSCALED] == 1
+
+
+def test_cached_decoding() -> None:
+    """ Tests whether decoding is skipped for unchanged scenes but not for changed or stale ones. """
+
+    decoder = sensing.CachedQrDecoder(sensing.QrDecoder())
+    frame = _frame(180, 90)
+    noisy = frame.copy()
+    noisy[::7, ::7] ^= 1  # sensor noise
+
+    assert decoder.decode(frame) == "ahead"
+    assert decoder.decode(noisy) == "ahead"
+    assert decoder.hits == 1 and decoder.misses == 1
+
+    # a new car ahead changes the region of the QR code
+    assert not decoder.changed(noisy) and decoder.changed(_frame(0, 0))
+    assert decoder.decode(_frame(0, 0)) == "ahead"
+    assert decoder.decode(np.zeros((200, 400), np.uint8)) is None
+    assert decoder.hits == 1 and decoder.misses == 3
+
+    decoder.max_staleness = 0
+    assert decoder.decode(np.zeros((200, 400), np.uint8)) is None
+    assert decoder.misses == 4
+
+
+class _StalledSource(sensing.FrameSource):
+    """ Camera that stopped delivering frames. """
+
+    def __init__(self):
+        super().__init__((400, 200), 1)
+
+    def stream(self, buffers) -> None:
+        pass
+
+
+def test_stalled_camera(monkeypatch) -> None:
+    """ Tests whether scanning without camera frames reuses the last signature only as long as it is fresh enough. """
+
+    monkeypatch.setattr(scanner, "_FRAME_TIMEOUT", 0.01)
+    stalled = sensing.Scanner._cls(_StalledSource())
+
+    assert stalled.ahead_signature is None
+
+    assert stalled.decoder.decode(_frame(180, 90)) == "ahead"
+    assert stalled.ahead_signature == "ahead"
+
+    stalled.decoder.max_staleness = 0
+    assert stalled.ahead_signature is None
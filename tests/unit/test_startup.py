@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+
+import util
+
+_HARDWARE_MODULES = ["gpiozero", "Adafruit_PCA9685", "RpiMotorLib", "picamera", "pyzbar"]
+
+_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import attributes, interaction, sensing, control
+duration = time.perf_counter() - start
+from attributes import agent
+print(json.dumps({"duration": duration, "modules": sorted(sys.modules), "initialized": agent._INITIALIZED}))
+"""
+
+
+def test_imports_within_budget() -> None:
+    """ Tests whether importing the top-level packages is fast and neither touches hardware nor reads attributes. """
+
+    # a fresh interpreter is required as the packages have been imported by other tests already
+    output = subprocess.run([sys.executable, "-c", _IMPORT], check=True, capture_output=True, text=True).stdout
+    result = json.loads(output)
+
+    assert result["duration"] < util.const.Startup.IMPORT_BUDGET
+    assert not [module for module in result["modules"] if module.split(".")[0] in _HARDWARE_MODULES]
+    assert not result["initialized"]
+
+
+def test_backend_acquired_once() -> None:
+    """ Tests whether a backend acquires its resource on first use only and records the acquisition. """
+
+    acquisitions = []
+    backend = util.Backend("test resource", lambda: acquisitions.append(1) or object())
+    backend.use(lambda: acquisitions.append(2) or object())
+
+    assert not backend.acquired and not acquisitions
+
+    resource = backend.get()
+
+    assert backend.get() is resource and acquisitions == [2]
+    assert "acquire test resource" in util.STARTUP.report()
@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Set
+
+import numpy as np
+
+import util
+from control.steering import PwmTable, SteeringActuator
+
+_PARAMETERS = [0.05, 2.5, 307]
+
+
+def test_ticks() -> None:
+    """ Tests whether the interpolated ticks approximate the polynomial and angles are clamped to the boundaries. """
+
+    table = PwmTable(-20, 20, 0.3)
+    assert table.update(_PARAMETERS)
+
+    angles = np.linspace(-25, 25, 501)
+    expected = np.polyval(_PARAMETERS, np.clip(angles, -20, 20))
+    ticks = table.ticks_of(angles)
+
+    assert ticks.dtype == np.int64 and np.abs(ticks - expected).max() <= 1
+    assert [table.tick(angle) for angle in angles] == ticks.tolist()
+    assert table.tick(-30) == table.tick(-20) and table.tick(30) == table.tick(20) == round(np.polyval(_PARAMETERS, 20))
+    assert isinstance(table.tick(3.3), int)
+
+
+def test_update() -> None:
+    """ Tests whether the table is only recomputed if the steering parameters change. """
+
+    table = PwmTable(-20, 20)
+    assert table.update(_PARAMETERS)
+    assert not table.update(list(_PARAMETERS))
+    assert table.update([0, 2, 300]) and table.tick(0) == 300
+
+
+class _Motor:
+    def __init__(self):
+        self.ticks = []
+
+    def set_pwm(self, channel: int, on: int, off: int) -> None:
+        self.ticks.append(off)
+
+
+def test_coalescing() -> None:
+    """ Tests whether unchanged ticks are dropped and only the latest target is written within the rate limit. """
+
+    motor = _Motor()
+    actuator = SteeringActuator(util.Backend("motor", lambda: motor), 0, max_frequency=10)
+
+    actuator.set(300)
+    actuator.set(300)  # rate-limited -> pending
+    actuator.set(310)  # supersedes the pending target
+    actuator.set(320)  # supersedes the pending target again
+
+    assert motor.ticks == [300] and actuator.suppressed == 2
+
+    deadline = time.monotonic() + 1
+    while actuator.tick != 320 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert motor.ticks == [300, 320]
+    assert actuator.writes == 2 and actuator.suppressed == 2
+
+
+
+def _wait_until_handled(actuator: SteeringActuator, targets: int) -> None:
+    deadline = time.monotonic() + 1
+    while actuator.writes + actuator.suppressed < targets and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _flushing_threads() -> Set[threading.Thread]:
+    return {thread for thread in threading.enumerate() if thread.name == util.const.ThreadNames.STEER}
+
+
+def test_unchanged_ticks() -> None:
+    """ Tests whether unchanged ticks are dropped, whether allowed right away or pending, and whether pending targets
+    are always written by the same thread.
+    """
+
+    motor = _Motor()
+    actuator = SteeringActuator(util.Backend("motor", lambda: motor), 0, max_frequency=20)
+    threads = _flushing_threads()
+
+    actuator.set(300)
+    time.sleep(0.06)
+    actuator.set(300)  # unchanged and allowed -> dropped immediately
+
+    assert motor.ticks == [300] and actuator.suppressed == 1
+
+    actuator.set(310)
+    actuator.set(300)  # rate-limited -> pending
+    actuator.set(310)  # supersedes the pending target but is dropped once due as it is unchanged
+    _wait_until_handled(actuator, 5)
+
+    assert motor.ticks == [300, 310] and actuator.suppressed == 3
+
+    # the thread writing pending targets keeps running
+    flushing = _flushing_threads() - threads
+    assert len(flushing) == 1
+
+    time.sleep(0.06)
+    actuator.set(300)
+    actuator.set(320)  # rate-limited -> pending
+    _wait_until_handled(actuator, 7)
+
+    assert motor.ticks == [300, 310, 300, 320] and actuator.suppressed == 3
+    assert _flushing_threads() - threads == flushing
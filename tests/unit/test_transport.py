@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from threading import Event
+
+import pytest
+
+import attributes
+import interaction
+from interaction import communication
+
+
+def _encode(message: interaction.Message) -> bytes:
+    raise AssertionError(f"Loopback message {message} must not be encoded.")
+
+
+def test_loopback_delivery() -> None:
+    """ Tests whether the loopback bus delivers messages once per matching transport without copying them. """
+
+    bus = interaction.LoopbackBus()
+    sender, receiver, bystander = (interaction.LoopbackTransport(bus) for _ in range(3))
+    received, acknowledged = [], []
+    receiver.on_message = received.append
+    bystander.on_message = received.append
+    sender.on_acknowledge = acknowledged.append
+
+    receiver.subscribe("lane/+/formation")
+    receiver.subscribe("lane/1/formation")
+    bystander.subscribe("lane/2/formation")
+
+    message = interaction.Message("a", "lane/1/formation", {"value": 1}, datetime.now())
+    mid = sender.publish(message, _encode)
+
+    assert received == [message] and received[0] is message
+    assert acknowledged == [mid]
+
+    receiver.unsubscribe("lane/+/formation")
+    receiver.unsubscribe("lane/1/formation")
+    sender.publish(message, _encode)
+
+    assert received == [message]
+
+
+def test_connections_over_loopback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether connections exchange messages and measure publish latencies over the loopback bus. """
+
+    # connections identify the main agent by its signature (set in the module's namespace to not read the attributes)
+    monkeypatch.setitem(vars(attributes), "SIGNATURE", "a")
+
+    bus = interaction.LoopbackBus()
+    connections = [communication._Connection._cls(interaction.LoopbackTransport(bus)) for _ in range(2)]
+    connections[0].signature, connections[1].signature = "a", "b"
+    received = {"a": [], "b": []}
+    done = Event()
+
+    def handle(signature: str, message: interaction.Message) -> None:
+        received[signature].append(message.content)
+        done.set()
+
+    connections[0].subscribe("formation", lambda message: handle("a", message), False, False)
+    connections[1].subscribe("formation", lambda message: handle("b", message), False, False)
+
+    assert connections[0].send(interaction.Message("a", "formation", "hello", datetime.now()))
+    assert done.wait(5)
+
+    assert received == {"a": [], "b": ["hello"]}
+
+    # the message may be handled before the publishing thread recorded its latency
+    deadline = time.monotonic() + 5
+    while connections[0].publish_latency.count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert connections[0].publish_latency.count == 1
+
+
+class _StalledTransport(interaction.Transport):
+    """ Transport accepting messages without ever acknowledging them, like a broker that cannot keep up. """
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def connect(self) -> None:
+        pass
+
+    def subscribe(self, topic: str) -> None:
+        pass
+
+    def unsubscribe(self, topic: str) -> None:
+        pass
+
+    def publish(self, message: interaction.Message, encode: interaction.transport.Encoder) -> int:
+        self.published.append(message)
+        return len(self.published)
+
+
+def test_backpressure(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether sending is rejected once the messages in flight and the outbox reached their limits. """
+
+    monkeypatch.setitem(vars(attributes), "SIGNATURE", "a")
+    monkeypatch.setattr(communication, "_IN_FLIGHT", 4)
+    monkeypatch.setattr(communication, "_OUTBOX_SIZE", 8)
+
+    transport = _StalledTransport()
+    connection = communication._Connection._cls(transport)
+    message = interaction.Message("a", "formation", "hello", datetime.now())
+
+    # the publishing thread publishes as many messages as may be in flight and waits with the next one
+    assert all(connection.send(message) for _ in range(4 + 1))
+
+    deadline = time.monotonic() + 5
+    while not connection._outbox.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(transport.published) == 4
+
+    # afterwards, the outbox fills up and further messages are rejected
+    assert all(connection.send(message) for _ in range(8))
+    assert not connection.send(message) and connection.dropped == 1
+
+    # acknowledging a message makes room for the next one
+    transport.on_acknowledge(1)
+    deadline = time.monotonic() + 5
+    while len(transport.published) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(transport.published) == 5 and connection.send(message)
+
+
+def test_asynchronous_connections_over_loopback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ Tests whether asynchronous connections handle messages on the event loop without starting any threads. """
+
+    monkeypatch.setitem(vars(attributes), "SIGNATURE", "a")
+    threads = set(threading.enumerate())  # threads of other tests may end in the meantime
+    received = []
+
+    async def exchange() -> communication._Connection:
+        bus = interaction.LoopbackBus()
+        connections = [communication._Connection._cls(interaction.LoopbackTransport(bus), asynchronous=True)
+                       for _ in range(2)]
+        connections[0].signature, connections[1].signature = "a", "b"
+        done = asyncio.Event()
+
+        def handle(message: interaction.Message) -> None:
+            received.append((message.content, threading.current_thread()))
+
+        async def handle_asynchronously(message: interaction.Message) -> None:
+            await asyncio.sleep(0)
+            handle(message)
+            done.set()
+
+        # callbacks may be coroutine functions and own messages are still ignored
+        connections[0].subscribe("formation", handle, False, False)
+        connections[1].subscribe("formation", handle, False, False)
+        connections[1].subscribe("lane/+/formation", handle_asynchronously, False, False)
+
+        assert connections[0].send(interaction.Message("a", "formation", "hello", datetime.now()))
+        assert connections[0].send(interaction.Message("a", "lane/1/formation", "hi", datetime.now()))
+        await asyncio.wait_for(done.wait(), 5)
+
+        return connections[0]
+
+    connection = asyncio.run(exchange())
+
+    assert received == [("hello", threading.main_thread()), ("hi", threading.main_thread())]
+    assert connection.publish_latency.count == 2
+    assert connection.dispatcher is None and set(threading.enumerate()) <= threads
+
+
+class _Client:
+    def __init__(self):
+        self.subscribed = []
+
+    def subscribe(self, topic: str, qos: int) -> None:
+        self.subscribed.append(topic)
+
+
+def test_asyncio_mqtt_subscriptions() -> None:
+    """ Tests whether the asyncio MQTT transport subscribes to its topics once the client is connected. """
+
+    transport = interaction.AsyncioMqttTransport("localhost")
+    client = _Client()
+
+    # subscribing before the client is connected
+    transport.subscribe("formation")
+    transport.subscribe("lane/+/formation")
+    transport.unsubscribe("formation")
+
+    transport._on_connect(client, None, None, 0)
+
+    assert client.subscribed == [interaction.transport._TOPIC_PREFIX + "lane/+/formation"]
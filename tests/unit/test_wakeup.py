@@ -0,0 +1,52 @@
+import asyncio
+import time
+from threading import Event
+
+import util
+
+
+def test_concurrent_wakeup() -> None:
+    """ Tests whether a wake-up interrupts the delay of a stabilized concurrent function. """
+
+    wakeup = util.Wakeup()
+    executions = []
+    executed = Event()
+
+    @util.stabilized_concurrent("T-Test", 5, 10, 1, True, lambda: wakeup)
+    def execute() -> bool:
+        executions.append(time.monotonic())
+        executed.set()
+        return True
+
+    execute()
+    assert executed.wait(1)
+
+    executed.clear()
+    woken = time.monotonic()
+    wakeup.set()
+
+    assert executed.wait(1) and executions[-1] - woken < 1
+    assert len(executions) == 2 and wakeup.count == 1
+
+
+def test_coroutine_wakeup() -> None:
+    """ Tests whether a wake-up set from another thread interrupts the delay of a stabilized coroutine. """
+
+    wakeup = util.Wakeup()
+    executions = []
+
+    @util.stabilized_coroutine(5, 10, 1, lambda: wakeup)
+    async def execute() -> bool:
+        executions.append(time.monotonic())
+        return True
+
+    async def main() -> None:
+        task = asyncio.create_task(execute())
+        await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().run_in_executor(None, wakeup.set)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(main())
+
+    assert len(executions) == 2 and executions[1] - executions[0] < 1
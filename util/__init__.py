@@ -1,6 +1,12 @@
 from util import constants as const
 from util.assertions import assert_keys_exist
-from util.concurrent import stabilized_concurrent
+from util.wakeup import Wakeup
+from util.concurrent import backoff_delay, stabilized_concurrent, stabilized_coroutine
 from util.single import Singleton, SingleUse
+from util.statistics import LatencyStatistics, Histogram
 from util.threaded import threaded
 from util.time_measurement import measure_execution_time
+from util.pool import OverflowPolicy, WorkerPool
+from util.startup import StartupProfile, STARTUP
+from util.backend import Backend
+from util.odometry import Odometer
@@ -0,0 +1,57 @@
+from threading import Lock
+from typing import Callable, Generic, Optional, TypeVar
+
+from util.startup import STARTUP
+
+Resource = TypeVar("Resource")
+
+
+class Backend(Generic[Resource]):
+    """ Hardware (or simulated) resource that is only acquired on first use.
+
+    The factory creating the resource is called the first time the resource is requested. Until then, the factory
+    can be replaced, e.g. by one creating a simulated resource for tests and simulations. Acquisitions are recorded in
+    the startup profile.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Resource]):
+        self.name: str = name
+        self._factory: Callable[[], Resource] = factory
+        self._resource: Optional[Resource] = None
+        self._lock: Lock = Lock()
+
+    @property
+    def acquired(self) -> bool:
+        return self._resource is not None
+
+    def use(self, factory: Callable[[], Resource]) -> None:
+        """ Replaces the factory creating the resource.
+
+        Args:
+            factory: Function creating the resource.
+
+        Raises:
+            AssertionError: If the resource has already been acquired.
+        """
+
+        with self._lock:
+            assert self._resource is None, f"The {self.name} backend has already been acquired."
+            self._factory = factory
+
+    def get(self) -> Resource:
+        """ Gets the resource and acquires it if it is requested for the first time.
+
+        Returns:
+            The resource.
+        """
+
+        # avoid the lock once the resource has been acquired
+        if (resource := self._resource) is not None:
+            return resource
+
+        with self._lock:
+            if self._resource is None:
+                with STARTUP.measure(f"acquire {self.name}"):
+                    self._resource = self._factory()
+
+            return self._resource
@@ -1,17 +1,41 @@
+import asyncio
 import math
 import time
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Coroutine, Optional
 
 import util
 
 
-def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps: int, daemon: bool = True) -> Callable:
+def backoff_delay(min_delay: float, max_delay: float, steps: int, stable_intervals: int) -> float:
+    """ Calculates the delay before the next execution based on the number of consecutive stable executions.
+
+    The delay d is defined as min_delay * exp(stable_intervals * ln(max_delay / min_delay) / steps) normally but is at
+    maximum ``max_delay``. For 0 stable intervals the delay is ``min_delay``. After ``steps`` stable intervals, the
+    delay is ``max_delay``.
+
+    Args:
+        min_delay: Lower bound for the delay.
+        max_delay: Upper bound for the delay.
+        steps: Number of stable executions to reach the maximum delay.
+        stable_intervals: Number of consecutive stable executions.
+
+    Returns:
+        The delay to wait before the next execution in seconds.
+    """
+
+    return min(max_delay, min_delay * math.exp(stable_intervals * math.log(max_delay / min_delay) / steps))
+
+
+def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps: int, daemon: bool = True,
+                          wakeup: Optional[Callable[..., util.Wakeup]] = None) -> Callable:
     """ Decorator factory for concurrently executing a function with dynamic delays in between.
 
         Whenever a function is decorated with ``@stabilized_concurrent(...)``, it will be executed concurrently with
         dynamically changing delays in between two executions. The longer the execution has been stable, the longer the
         delay.
         An execution was stable exactly if the decorated function returned True.
+        If there is a wake-up, setting it interrupts the delay and the next execution starts right away. The delay only
+        backs off while the executions are stable and no wake-up is set.
 
         Notes:
             A ``@stabilized_concurrent`` function cannot return Values other than None since it is run in its own
@@ -23,6 +47,7 @@ def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps:
             max_delay: Upper bound for the dynamic delay.
             steps: Number of stable executions to reach the maximum delay.
             daemon: Boolean whether the thread in which the function is executed is daemonic.
+            wakeup: Function returning the wake-up for the arguments the decorated function is called with.
 
         Returns:
             The according decorator function.
@@ -34,22 +59,6 @@ def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps:
     # there must be at least one step from minimum to maximum delay
     assert steps > 0, "It must take at least one step to reach the maximum delay."
 
-    def calc_delay(stable_intervals: int) -> float:
-        """ Calculates the delay before the next execution based on the number of consecutive stable executions.
-
-        The delay d is defined as min_delay * exp(stable_intervals * ln(max_delay / min_delay) / steps) normally but is
-        at maximum ``max_delay``. For 0 stable intervals the delay is ``min_delay``. After ``steps`` stable intervals,
-        the delay is ``max_delay``.
-
-        Args:
-            stable_intervals: Number of consecutive stable executions.
-
-        Returns:
-            The delay to wait before the next execution in seconds.
-        """
-
-        return min(max_delay, min_delay * math.exp(stable_intervals * math.log(max_delay / min_delay) / steps))
-
     def decorator(function: Callable[[Any], bool]) -> Callable:
         @util.threaded(name, daemon)
         def concurrent_execution(*args, **kwargs) -> None:
@@ -65,8 +74,13 @@ def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps:
 
             # initially there have been no stable executions
             stable_intervals = 0
+            event = None if wakeup is None else wakeup(*args, **kwargs)
 
             while True:
+                # wake-ups set during the execution interrupt the following delay
+                if event is not None:
+                    event.clear()
+
                 # execute the decorated function and save the result
                 stable = function(*args, **kwargs)
 
@@ -74,13 +88,76 @@ def stabilized_concurrent(name: str, min_delay: float, max_delay: float, steps:
                 assert stable is True or stable is False, f"A stabilized concurrent function must return a Boolean " \
                                                           f"but {function.__name__}(...) did not."
 
-                # calculate a dynamic delay and stop the execution for the corresponding duration
-                delay = calc_delay(stable_intervals)
-                time.sleep(delay)
+                # calculate a dynamic delay and stop the execution for the corresponding duration unless woken up
+                delay = backoff_delay(min_delay, max_delay, steps, stable_intervals)
+                if event is None:
+                    time.sleep(delay)
+                    woken = False
+                else:
+                    woken = event.wait(delay)
 
                 # update number of stable executions accordingly to the result of the latest execution
-                stable_intervals = stable_intervals + 1 if stable else 0
+                stable_intervals = stable_intervals + 1 if stable and not woken else 0
 
         return concurrent_execution
 
     return decorator
+
+
+def stabilized_coroutine(min_delay: float, max_delay: float, steps: int,
+                         wakeup: Optional[Callable[..., util.Wakeup]] = None) -> Callable:
+    """ Decorator factory for repeatedly awaiting a coroutine function with dynamic delays in between.
+
+    This is the counterpart of ``@stabilized_concurrent(...)`` for event loops. Instead of starting a thread, calling
+    the decorated function returns a coroutine that repeatedly awaits the function and sleeps on the event loop in
+    between. The longer the execution has been stable, the longer the delay. Setting the wake-up (if any) interrupts
+    the delay like it does for ``@stabilized_concurrent(...)``.
+
+    Args:
+        min_delay: Lower bound for the dynamic delay.
+        max_delay: Upper bound for the dynamic delay.
+        steps: Number of stable executions to reach the maximum delay.
+        wakeup: Function returning the wake-up for the arguments the decorated function is called with.
+
+    Returns:
+        The according decorator function.
+    """
+
+    # the minimum delay must be less than the maximum delay
+    assert 0 < min_delay < max_delay, "Minimum delay must be positive and less than max delay."
+
+    # there must be at least one step from minimum to maximum delay
+    assert steps > 0, "It must take at least one step to reach the maximum delay."
+
+    def decorator(function: Callable[..., Awaitable[bool]]) -> Callable[..., Coroutine]:
+        async def repeated_execution(*args, **kwargs) -> None:
+            # initially there have been no stable executions
+            stable_intervals = 0
+            event = None if wakeup is None else wakeup(*args, **kwargs)
+
+            while True:
+                # wake-ups set during the execution interrupt the following delay
+                if event is not None:
+                    event.clear()
+
+                # execute the decorated function and save the result
+                stable = await function(*args, **kwargs)
+
+                # the decorated function must return a Boolean
+                assert stable is True or stable is False, f"A stabilized coroutine must return a Boolean but " \
+                                                          f"{function.__name__}(...) did not."
+
+                # wait for a dynamic delay without blocking the event loop unless woken up
+                delay = backoff_delay(min_delay, max_delay, steps, stable_intervals)
+                if event is None:
+                    await asyncio.sleep(delay)
+                    woken = False
+                else:
+                    woken = await event.wait_async(delay)
+
+                # update number of stable executions accordingly to the result of the latest execution
+                stable_intervals = stable_intervals + 1 if stable and not woken else 0
+
+        return repeated_execution
+
+    return decorator
@@ -9,3 +9,15 @@ class Units:
 class ThreadNames:
     MAIN_AGENT_ACTION: str = "T-Main-Agent-Action"
     SCAN: str = "T-Scan"
+    CAPTURE: str = "T-Capture"
+    WATCH: str = "T-Watch"
+    SAMPLE: str = "T-Sample"
+    STEER: str = "T-Steer"
+    MOTION: str = "T-Motion"
+    PUBLISH: str = "T-Publish"
+    DISPATCH: str = "T-Dispatch"
+    HEARTBEAT: str = "T-Heartbeat"
+
+
+class Startup:
+    IMPORT_BUDGET: float = 1  # maximum number of seconds importing the top-level packages may take
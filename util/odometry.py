@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Optional
+
+
+class Odometer:
+    """ Thread-safe record of the steps a stepper motor moved.
+
+    Steps forward count positively and steps backward negatively. An odometer may have a parent (e.g. the cumulative
+    odometer of a vehicle) which records every step recorded by the odometer as well, so that a single drive and all
+    drives can be tracked at the same time.
+    """
+
+    def __init__(self, distance_per_step: float, parent: Optional[Odometer] = None):
+        self.distance_per_step: float = distance_per_step  # mm
+        self.parent: Optional[Odometer] = parent
+        self.steps: int = 0  # net number of steps forward
+        self.total_steps: int = 0  # number of steps in both directions
+        self._lock: Lock = Lock()
+
+    @property
+    def distance(self) -> float:
+        # net distance forward in mm
+        return self.steps * self.distance_per_step
+
+    @property
+    def total_distance(self) -> float:
+        # distance in both directions in mm
+        return self.total_steps * self.distance_per_step
+
+    def record(self, steps: int) -> None:
+        """ Adds moved steps.
+
+        Args:
+            steps: Number of steps (positive if moved forward, negative if moved backward).
+        """
+
+        with self._lock:
+            self.steps += steps
+            self.total_steps += abs(steps)
+
+        if self.parent is not None:
+            self.parent.record(steps)
+
+    def __repr__(self):
+        return f"Odometer[{self.distance:.1f}mm, total: {self.total_distance:.1f}mm]"
@@ -0,0 +1,141 @@
+import time
+import traceback
+from collections import deque
+from threading import Condition
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+
+import util
+
+
+class OverflowPolicy:
+    DROP_NEWEST: str = "drop-newest"  # reject tasks submitted to a full queue
+    DROP_OLDEST: str = "drop-oldest"  # discard the oldest pending task of a full queue
+
+
+class _Task:
+    def __init__(self, function: Callable[[], None], coalesce_key: Optional[Hashable]):
+        self.function: Callable[[], None] = function
+        self.coalesce_key: Optional[Hashable] = coalesce_key
+        self.submitted: float = time.perf_counter()
+
+
+class _WorkerQueue:
+    def __init__(self):
+        self.tasks: Deque[_Task] = deque()
+        self.coalescing: Dict[Hashable, _Task] = {}  # coalesce key -> pending task
+        self.condition: Condition = Condition()
+
+    def discard(self, task: _Task) -> None:
+        """ Forgets the coalesce key of a task that is no longer pending.
+
+        Args:
+            task: Task that was removed from the queue.
+        """
+
+        if task.coalesce_key is not None and self.coalescing.get(task.coalesce_key) is task:
+            del self.coalescing[task.coalesce_key]
+
+
+class WorkerPool:
+    """ Fixed number of worker threads executing submitted tasks from bounded queues.
+
+    Tasks with the same ordering key are always executed by the same worker in the order they were submitted. Tasks
+    with a coalesce key replace a pending task with the same key (keeping its position in the queue) so that only the
+    latest one is executed when the queue backs up. If a queue is full, the overflow policy decides whether the new or
+    the oldest task is dropped.
+    """
+
+    def __init__(self, name: str, workers: int, capacity: int, policy: str = OverflowPolicy.DROP_OLDEST):
+        # there must be at least one worker and room for at least one task
+        assert workers > 0 and capacity > 0, "A worker pool needs at least one worker and a positive capacity."
+
+        self.capacity: int = capacity
+        self.policy: str = policy
+        self.handler_latency: util.LatencyStatistics = util.LatencyStatistics()
+        self.queue_latency: util.LatencyStatistics = util.LatencyStatistics()
+        self.dropped: int = 0
+        self.coalesced: int = 0
+        self.max_depth: int = 0
+
+        self._queues: List[_WorkerQueue] = [_WorkerQueue() for _ in range(workers)]
+
+        # start every worker in its own thread
+        work = util.threaded(name)(self._work)
+        for queue in self._queues:
+            work(queue)
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue.tasks) for queue in self._queues)
+
+    def submit(self, ordering_key: Hashable, function: Callable[[], None],
+               coalesce_key: Optional[Hashable] = None) -> bool:
+        """ Queues a task for execution by the worker responsible for the ordering key.
+
+        Args:
+            ordering_key: Key of tasks that must be executed in order (e.g. the topic of a message).
+            function: Function to be executed.
+            coalesce_key: Key of tasks of which only the latest pending one needs to be executed.
+
+        Returns:
+            Boolean whether the task was queued (or coalesced with a pending task).
+        """
+
+        queue = self._queues[hash(ordering_key) % len(self._queues)]
+        task = _Task(function, coalesce_key)
+
+        with queue.condition:
+            # replace the pending task with the same coalesce key
+            if coalesce_key is not None and (pending := queue.coalescing.get(coalesce_key)) is not None:
+                pending.function = function
+                self.coalesced += 1
+                return True
+
+            # handle a full queue according to the overflow policy
+            if len(queue.tasks) >= self.capacity:
+                self.dropped += 1
+
+                if self.policy == OverflowPolicy.DROP_NEWEST:
+                    return False
+
+                queue.discard(queue.tasks.popleft())
+
+            queue.tasks.append(task)
+
+            if coalesce_key is not None:
+                queue.coalescing[coalesce_key] = task
+
+            self.max_depth = max(self.max_depth, self.depth)
+            queue.condition.notify()
+
+        return True
+
+    def _work(self, queue: _WorkerQueue) -> None:
+        """ Continuously executes the tasks of a queue.
+
+        Notes:
+            This method runs in its own thread for every queue.
+
+        Args:
+            queue: Queue of the tasks to be executed.
+        """
+
+        while True:
+            # wait for the next task
+            with queue.condition:
+                while not queue.tasks:
+                    queue.condition.wait()
+
+                task = queue.tasks.popleft()
+                queue.discard(task)
+
+            start = time.perf_counter()
+            self.queue_latency.record(start - task.submitted)
+
+            # a failing task must not stop the worker
+            try:
+                task.function()
+            except Exception:
+                traceback.print_exc()
+
+            self.handler_latency.record(time.perf_counter() - start)
@@ -0,0 +1,74 @@
+import contextlib
+import importlib
+import time
+from threading import Lock
+from typing import Iterator, List, Tuple
+
+
+class StartupProfile:
+    """ Thread-safe record of the durations of startup phases (imports, hardware acquisitions, initializations). """
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []  # name and duration in seconds, in the order of completion
+        self._lock: Lock = Lock()
+
+    def record(self, name: str, duration: float) -> None:
+        """ Adds the duration of a startup phase.
+
+        Args:
+            name: Name of the phase.
+            duration: Duration in seconds.
+        """
+
+        with self._lock:
+            self.phases.append((name, duration))
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """ Measures the duration of the phase executed within the context.
+
+        Args:
+            name: Name of the phase.
+
+        Returns:
+            Context manager recording the duration of the phase.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def import_modules(self, *names: str) -> None:
+        """ Imports modules and measures the duration of every import.
+
+        Modules that have already been imported are not measured again.
+
+        Args:
+            *names: Names of the modules in the order they are imported.
+        """
+
+        for name in names:
+            with self.measure(f"import {name}"):
+                importlib.import_module(name)
+
+    def report(self) -> str:
+        """ Summarizes the startup phases.
+
+        Returns:
+            A table of every phase with its duration (in order of completion).
+        """
+
+        with self._lock:
+            phases = list(self.phases)
+
+        width = max([len(name) for name, _ in phases] + [len("total")])
+        lines = [f"{name:{width}s} {duration * 1000:9.1f}ms" for name, duration in phases]
+        lines.append(f"{'total':{width}s} {sum(duration for _, duration in phases) * 1000:9.1f}ms")
+
+        return "\n".join(lines)
+
+
+STARTUP: StartupProfile = StartupProfile()
@@ -0,0 +1,92 @@
+import bisect
+import math
+from collections import deque
+from threading import Lock
+from typing import Deque, List, Sequence
+
+
+class LatencyStatistics:
+    """ Thread-safe record of the most recent latency samples.
+
+    Only the latest ``capacity`` samples are kept so that memory consumption stays constant no matter how long the
+    statistics are recorded. Counts are kept over the whole lifetime though.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._samples: Deque[float] = deque(maxlen=capacity)
+        self._lock: Lock = Lock()
+        self.count: int = 0
+
+    def record(self, latency: float) -> None:
+        """ Adds a latency sample.
+
+        Args:
+            latency: Latency in seconds.
+        """
+
+        with self._lock:
+            self._samples.append(latency)
+            self.count += 1
+
+    @property
+    def mean(self) -> float:
+        with self._lock:
+            return sum(self._samples) / len(self._samples) if self._samples else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """ Determines a percentile of the recorded latencies using the nearest rank method.
+
+        Args:
+            percentile: Percentile to determine (between 0 and 100).
+
+        Returns:
+            The latency in seconds below which ``percentile`` percent of the recorded samples lie or ``0`` if no
+            samples have been recorded.
+        """
+
+        # the percentile must be within the range of percentages
+        assert 0 <= percentile <= 100, f"Percentile must be between 0 and 100 but is {percentile}."
+
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if not samples:
+            return 0.0
+
+        rank = max(1, math.ceil(percentile / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def __repr__(self):
+        return f"Latency[n: {self.count}, mean: {self.mean * 1000:.3f}ms, p99: {self.percentile(99) * 1000:.3f}ms]"
+
+
+class Histogram:
+    """ Thread-safe histogram counting values per bucket.
+
+    Buckets are given by their ascending upper bounds. Values above the last bound are counted in an overflow bucket.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        assert list(bounds) == sorted(bounds), f"Bucket bounds must be ascending but are {bounds}."
+
+        self.bounds: List[float] = list(bounds)
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self._lock: Lock = Lock()
+
+    def record(self, value: float) -> None:
+        """ Counts a value in the first bucket whose upper bound is not below the value.
+
+        Args:
+            value: Value to be counted.
+        """
+
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def __repr__(self):
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}" if self.bounds else "all"]
+        return f"Histogram[{', '.join(f'{label}: {count}' for label, count in zip(labels, self.counts))}]"
@@ -0,0 +1,79 @@
+import asyncio
+from threading import Event, Lock
+from typing import List, Tuple
+
+
+class Wakeup:
+    """ Event waking up a loop which sleeps between two executions, e.g. when a relevant message has been received.
+
+    The wake-up can be set from any thread. Threads wait for it directly while coroutines wait for it on their event
+    loop. A wake-up stays set until it is cleared, so that a wake-up set while the loop is executing is not lost.
+    """
+
+    def __init__(self):
+        self.count: int = 0  # number of times the wake-up has been set
+        self._event: Event = Event()
+        self._lock: Lock = Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []  # coroutines waiting on event loops
+
+    @property
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def set(self) -> None:
+        """ Sets the wake-up waking up every waiting thread and coroutine. """
+
+        with self._lock:
+            self.count += 1
+            self._event.set()
+            waiters, self._waiters = self._waiters, []
+
+        # asyncio events are not thread-safe and must be set by their event loop
+        for loop, event in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    def clear(self) -> None:
+        """ Clears the wake-up, e.g. before an execution which handles everything the wake-up was set for. """
+
+        self._event.clear()
+
+    def wait(self, timeout: float) -> bool:
+        """ Waits for the wake-up to be set.
+
+        Args:
+            timeout: Maximum number of seconds to wait.
+
+        Returns:
+            Boolean whether the wake-up has been set.
+        """
+
+        return self._event.wait(timeout)
+
+    async def wait_async(self, timeout: float) -> bool:
+        """ Waits for the wake-up to be set without blocking the running event loop.
+
+        Args:
+            timeout: Maximum number of seconds to wait.
+
+        Returns:
+            Boolean whether the wake-up has been set.
+        """
+
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+
+        with self._lock:
+            if self._event.is_set():
+                return True
+
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)